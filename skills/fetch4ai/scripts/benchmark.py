@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Strategy Throughput Benchmark
+
+Runs fetch4ai against a local fixture_server.py instance, so fetch and
+filter throughput can be measured (and regressions caught) without live
+websites. Each strategy runs in:
+
+    single  - one page per fetch, each launching its own browser, as
+              separate fetch4ai.py --url invocations do
+    batch   - all pages through one shared browser (--urls-file), once per
+              --concurrency level
+
+Each run reports pages per second, p50/p95 latency (from the page's HTTP
+request to its filtered result), peak RSS of this process and its browser
+processes, and the mean reduction percent. The page cache is bypassed.
+Results are printed and optionally written as JSON; --baseline adds the
+ratio to a previous results file for every matching run.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --strategies pruning composite --concurrency 1 4 8 --output bench.json
+    python benchmark.py --corpus saved-pages/ --baseline bench.json --output bench-new.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fetch4ai  # noqa: E402
+from fixture_server import FixtureServer, make_corpus  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+STRATEGIES = ["pruning", "bm25", "tags", "composite"]
+MODES = ["single", "batch"]
+DEFAULT_QUERY = "rate limits authentication"
+RSS_INTERVAL = 0.05
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def tree_rss(pid: int) -> int:
+    """Resident bytes of a process and all its descendants (psutil, else /proc, else 0)."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return 0
+
+    if not os.path.isdir("/proc"):
+        return 0
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status", encoding="utf-8") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+            parents[int(entry)] = int(fields["PPid"])
+            rss[int(entry)] = int(fields.get("VmRSS", "0 kB").split()[0]) * 1024
+        except (OSError, KeyError, ValueError):
+            continue
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(child for child, parent in parents.items() if parent == current)
+    return total
+
+
+class RssSampler:
+    """Peak resident memory of this process tree while active, sampled in a thread."""
+
+    def __init__(self, interval: float = RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, tree_rss(os.getpid()))
+        if not self.peak:
+            # No process tree view: fall back to this process's lifetime peak
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = peak if sys.platform == "darwin" else peak * 1024  # Bytes on macOS, KB elsewhere
+
+
+async def run_mode(
+    mode: str,
+    urls: List[str],
+    args: argparse.Namespace,
+    concurrency: int,
+    server: FixtureServer,
+) -> Dict[str, Any]:
+    """Fetch every URL in one mode and collect results with their latencies."""
+    results: List[dict] = []
+    latencies: List[float] = []
+
+    def emit(result: dict) -> None:
+        finished = time.perf_counter()
+        requested = server.requested.get(urlsplit(result.get("url", "")).path)
+        if requested is not None:
+            latencies.append(finished - requested)
+        results.append(result)
+
+    if mode == "single":
+        for url in urls:
+            emit(await fetch4ai.safe_fetch(url, args))
+    else:
+        await fetch4ai.fetch_batch(urls, args, emit, concurrency=concurrency)
+    return {"results": results, "latencies": latencies}
+
+
+def run_case(
+    strategy: str,
+    mode: str,
+    concurrency: int,
+    urls: List[str],
+    options: Dict[str, Any],
+    server: FixtureServer,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Time one strategy/mode/concurrency combination and summarize it."""
+    args = fetch4ai.options_namespace(dict(options, strategy=strategy))
+    with server.lock:
+        server.requested.clear()
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        if verbose:
+            outcome = asyncio.run(run_mode(mode, urls, args, concurrency, server))
+        else:
+            with fetch4ai.suppress_output():
+                outcome = asyncio.run(run_mode(mode, urls, args, concurrency, server))
+        elapsed = time.perf_counter() - start
+
+    results = outcome["results"]
+    succeeded = [r for r in results if r.get("success")]
+    latencies = outcome["latencies"]
+    report = {
+        "strategy": strategy,
+        "mode": mode,
+        "concurrency": concurrency,
+        "pages": len(urls),
+        "succeeded": len(succeeded),
+        "wall_seconds": round(elapsed, 3),
+        "pages_per_second": round(len(urls) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+            "p95": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+            "max": round(max(latencies) * 1000, 1) if latencies else None,
+        },
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "reduction_percent": round(
+            sum(r["stats"]["reduction_percent"] for r in succeeded) / len(succeeded), 1
+        ) if succeeded else None,
+    }
+    errors = sorted({r.get("error", "") for r in results if not r.get("success")})
+    if errors:
+        report["errors"] = errors[:5]
+    return report
+
+
+def case_key(report: Dict[str, Any]) -> tuple:
+    return report["strategy"], report["mode"], report["concurrency"]
+
+
+def compare(reports: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Add vs_baseline ratios (new / old) to every report with a matching baseline run."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {case_key(r): r for r in json.load(f).get("results", [])}
+    for report in reports:
+        old = baseline.get(case_key(report))
+        if old is None:
+            continue
+        ratios = {}
+        for name, new_value, old_value in (
+            ("pages_per_second", report["pages_per_second"], old.get("pages_per_second")),
+            ("p95_latency", report["latency_ms"]["p95"], (old.get("latency_ms") or {}).get("p95")),
+            ("peak_rss", report["peak_rss_mb"], old.get("peak_rss_mb")),
+        ):
+            if new_value is not None and old_value:
+                ratios[name] = round(new_value / old_value, 3)
+        report["vs_baseline"] = ratios
+
+
+def run_benchmark(args: argparse.Namespace, corpus: Path) -> List[Dict[str, Any]]:
+    options = {
+        "query": args.query,
+        "cache": "bypass",
+        "timeout": args.timeout,
+    }
+    reports = []
+
+    with FixtureServer(corpus, latency=args.latency) as server:
+        urls = server.page_urls()[:args.pages]
+        for strategy in args.strategies:
+            for mode in args.modes:
+                if mode == "single":
+                    cases = [(1, urls[:args.single_pages])]
+                else:
+                    cases = [(concurrency, urls) for concurrency in args.concurrency]
+                for concurrency, case_urls in cases:
+                    print(f"Running {strategy} {mode} (concurrency {concurrency}, {len(case_urls)} pages)...",
+                          file=sys.stderr)
+                    reports.append(run_case(strategy, mode, concurrency, case_urls, options, server, args.verbose))
+
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark fetch4ai strategies against a local fixture server"
+    )
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES,
+                        help="Strategies to run (default: all)")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES, help="Modes to run (default: all)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8],
+                        help="Batch concurrency levels (default: 1 4 8)")
+    parser.add_argument("--corpus", help="Directory of saved *.html pages (default: generated synthetic pages)")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per batch run (default: 40)")
+    parser.add_argument("--single-pages", type=int, default=5, help="Pages in single mode (default: 5)")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help=f"Query for bm25 and composite (default: {DEFAULT_QUERY!r})")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fixture server adds per response")
+    parser.add_argument("--timeout", type=int, default=30, help="Per-page timeout in seconds (default: 30)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for generated pages (default: 0)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--output", "-o", help="Write results JSON to this file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show crawl4ai output")
+
+    args = parser.parse_args()
+    if any(c < 1 for c in args.concurrency) or args.pages < 1 or args.single_pages < 1:
+        parser.error("--concurrency, --pages and --single-pages must be at least 1")
+
+    fetch4ai.load_crawl4ai()
+    if args.corpus:
+        reports = run_benchmark(args, Path(args.corpus))
+    else:
+        with tempfile.TemporaryDirectory(prefix="fetch4ai-bench-") as tmp:
+            reports = run_benchmark(args, make_corpus(Path(tmp), args.pages, args.seed))
+
+    if args.baseline:
+        compare(reports, args.baseline)
+
+    try:
+        from importlib.metadata import version
+        crawl4ai_version = version("crawl4ai")
+    except Exception:
+        crawl4ai_version = None
+
+    output = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "verbose", "baseline")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "crawl4ai": crawl4ai_version,
+            "cpus": os.cpu_count(),
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": reports,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+
+    print(json.dumps(output, indent=2))
+    sys.exit(0 if all(r["succeeded"] == r["pages"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+block_scoring.py - Block-level content scoring for fetch4ai
+
+Splits a page's markdown into blocks (headings, paragraphs, lists, tables,
+code, quotes) once and tokenizes every block once. The same block list and
+tokens feed both scores:
+
+- quality: a pruning-style score in [0, 1] from text density, link density,
+  block type and length, modelled on PruningContentFilter's metrics
+- relevance: Okapi BM25 of the block against a query, over the page's blocks
+
+The composite strategy combines them with a configurable weight. Everything is
+deterministic: the same markdown and settings always select the same blocks.
+
+Usage:
+    from block_scoring import parse_blocks, score_blocks, select_composite
+    selection = select_composite(raw_markdown, "rate limits", threshold=0.3)
+    print(selection["content"])
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    import snowballstemmer  # Installed with crawl4ai
+    _STEMMER = snowballstemmer.stemmer("english")
+except ImportError:
+    _STEMMER = None
+
+
+# Weights of the quality metrics (PruningContentFilter uses the same kinds,
+# measured on HTML nodes instead of markdown blocks)
+QUALITY_WEIGHTS = {"text_density": 0.4, "link_density": 0.3, "kind": 0.2, "length": 0.1}
+KIND_WEIGHTS = {
+    "heading": 1.0, "paragraph": 1.0, "quote": 0.8, "code": 0.8,
+    "table": 0.7, "list": 0.5, "other": 0.4,
+}
+LONG_BLOCK_WORDS = 100  # Length metric saturates here
+BM25_K1 = 1.5
+BM25_B = 0.75
+DEFAULT_BM25_WEIGHT = 0.5
+DEFAULT_COMPOSITE_THRESHOLD = 0.55
+QUALITY_FLOOR = 0.4  # Blocks below this (link lists, boilerplate) are never kept, however relevant
+CHARS_PER_TOKEN = 4  # Typical for English text with common LLM tokenizers
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its
+of on or our she so than that the their them then there these they this to was
+we were what when where which who will with you your
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+MARKUP_PATTERN = re.compile(r"<[^>]+>|[*_`#>|~]|^\s*(?:[-+]|\d+\.)\s", re.MULTILINE)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+LIST_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s")
+WIDE_CHAR_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+@dataclass
+class Block:
+    """One markdown block with the features both scores are computed from."""
+    index: int
+    kind: str
+    text: str
+    level: int = 0              # Heading level (1-6), 0 for other blocks
+    plain: str = ""             # Visible text, markup and link targets removed
+    link_chars: int = 0         # Visible characters inside links
+    tokens: List[str] = field(default_factory=list)
+    quality: float = 0.0
+    relevance: float = 0.0      # sqrt of BM25 relative to the page's best block
+    score: float = 0.0
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Snowball stem when available, else a light English suffix strip."""
+    if _STEMMER is not None:
+        return _STEMMER.stemWord(word)
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("edly", ""), ("ed", ""), ("es", ""), ("ly", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stopword-free, stemmed word tokens."""
+    return [stem(w) for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count of text, without a tokenizer.
+
+    About CHARS_PER_TOKEN characters per token for alphabetic text; CJK
+    characters, which tokenizers split roughly one per token, count as one
+    each.
+    """
+    wide = len(WIDE_CHAR_PATTERN.findall(text))
+    return wide + math.ceil((len(text) - wide) / CHARS_PER_TOKEN)
+
+
+def _classify(lines: List[str]) -> str:
+    first = lines[0].lstrip()
+    if first.startswith("|"):
+        return "table"
+    if first.startswith(">"):
+        return "quote"
+    if LIST_PATTERN.match(lines[0]):
+        return "list"
+    return "paragraph"
+
+
+def split_blocks(markdown: str) -> List[Block]:
+    """Split markdown into blocks at blank lines, headings and code fences."""
+    blocks: List[Block] = []
+    current: List[str] = []
+    fence: Optional[str] = None
+
+    def flush(kind: Optional[str] = None) -> None:
+        if current and any(line.strip() for line in current):
+            blocks.append(Block(len(blocks), kind or _classify(current), "\n".join(current).strip("\n")))
+        current.clear()
+
+    for line in markdown.splitlines():
+        if fence:
+            current.append(line)
+            if line.strip().startswith(fence):
+                fence = None
+                flush("code")
+            continue
+
+        match = FENCE_PATTERN.match(line)
+        if match:
+            flush()
+            fence = match.group(1)
+            current.append(line)
+        elif HEADING_PATTERN.match(line):
+            flush()
+            blocks.append(Block(len(blocks), "heading", line.strip(), level=len(HEADING_PATTERN.match(line).group(1))))
+        elif not line.strip():
+            flush()
+        else:
+            current.append(line)
+
+    flush("code" if fence else None)
+    return blocks
+
+
+def parse_blocks(markdown: str) -> List[Block]:
+    """Split markdown into blocks and compute their text features and tokens."""
+    blocks = split_blocks(markdown)
+    for block in blocks:
+        link_chars = 0
+
+        def keep_text(match: "re.Match") -> str:
+            nonlocal link_chars
+            link_chars += len(match.group(1))
+            return match.group(1)
+
+        plain = LINK_PATTERN.sub(keep_text, block.text) if block.kind != "code" else block.text
+        plain = MARKUP_PATTERN.sub(" ", plain) if block.kind != "code" else plain
+        block.plain = " ".join(plain.split())
+        block.link_chars = link_chars
+        block.tokens = tokenize(block.plain)
+    return blocks
+
+
+def quality_score(block: Block, min_words: int = 0) -> float:
+    """Pruning-style score in [0, 1]; blocks under min_words score 0 (headings exempt)."""
+    words = len(block.plain.split())
+    if not words or (block.kind != "heading" and words < min_words):
+        return 0.0
+
+    text_chars = len(block.plain)
+    metrics = {
+        "text_density": min(1.0, text_chars / max(1, len(block.text))),
+        "link_density": 1.0 - min(1.0, block.link_chars / max(1, text_chars)),
+        "kind": KIND_WEIGHTS.get(block.kind, KIND_WEIGHTS["other"]),
+        "length": min(1.0, math.log(words + 1) / math.log(LONG_BLOCK_WORDS + 1)),
+    }
+    return sum(QUALITY_WEIGHTS[name] * value for name, value in metrics.items())
+
+
+def section_tokens(blocks: List[Block]) -> List[List[str]]:
+    """Each block's tokens plus those of its nearest heading.
+
+    A table or code block under "## Rate limits" is about rate limits even
+    if it never says so.
+    """
+    heading: List[str] = []
+    result = []
+    for block in blocks:
+        if block.kind == "heading":
+            heading = block.tokens
+            result.append(block.tokens)
+        else:
+            result.append(heading + block.tokens)
+    return result
+
+
+def bm25_scores(documents: List[List[str]], query_tokens: List[str]) -> List[float]:
+    """Okapi BM25 of every token list against the query, with the lists as the corpus."""
+    if not documents or not query_tokens:
+        return [0.0] * len(documents)
+
+    n = len(documents)
+    avg_length = sum(len(d) for d in documents) / n or 1.0
+    frequencies = []
+    document_frequency: Dict[str, int] = {}
+    for tokens in documents:
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        frequencies.append(counts)
+        for token in counts:
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+
+    idf = {
+        token: math.log((n - document_frequency.get(token, 0) + 0.5) / (document_frequency.get(token, 0) + 0.5) + 1)
+        for token in set(query_tokens)
+    }
+
+    scores = []
+    for tokens, counts in zip(documents, frequencies):
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+        score = 0.0
+        for token in query_tokens:
+            tf = counts.get(token, 0)
+            if tf:
+                score += idf[token] * tf * (BM25_K1 + 1) / (tf + length_norm)
+        scores.append(score)
+    return scores
+
+
+def score_blocks(
+    blocks: List[Block],
+    query: Optional[str] = None,
+    bm25_weight: float = DEFAULT_BM25_WEIGHT,
+    min_words: int = 0
+) -> List[Block]:
+    """Set quality, relevance and their weighted combination on every block.
+
+    Without a query, score is the quality score alone.
+    """
+    raw = bm25_scores(section_tokens(blocks), tokenize(query)) if query else [0.0] * len(blocks)
+    best = max(raw, default=0.0)
+    weight = min(1.0, max(0.0, bm25_weight)) if query else 0.0
+
+    for block, relevance in zip(blocks, raw):
+        block.quality = quality_score(block, min_words)
+        # Square root so partially relevant blocks are not swamped by the best match
+        block.relevance = math.sqrt(relevance / best) if best > 0 else 0.0
+        block.score = (1 - weight) * block.quality + weight * block.relevance
+    return blocks
+
+
+def keep_section_headings(blocks: List[Block], kept: List[bool]) -> List[bool]:
+    """Also keep each heading whose section (up to the next heading of the same or higher level) keeps a block."""
+    kept = list(kept)
+    for i, block in enumerate(blocks):
+        if block.kind != "heading" or kept[i]:
+            continue
+        for later in blocks[i + 1:]:
+            if later.kind == "heading" and later.level <= block.level:
+                break
+            if later.kind != "heading" and kept[later.index]:
+                kept[i] = True
+                break
+    return kept
+
+
+def select_composite(
+    markdown: str,
+    query: str,
+    threshold: float = DEFAULT_COMPOSITE_THRESHOLD,
+    bm25_weight: float = DEFAULT_BM25_WEIGHT,
+    min_words: int = 0
+) -> dict:
+    """Keep the blocks whose combined quality/relevance score reaches threshold.
+
+    Blocks under QUALITY_FLOOR are dropped whatever their relevance, so
+    navigation that happens to mention the query stays out.
+
+    Returns:
+        {"content", "blocks_total", "blocks_kept"}; content keeps document
+        order and the headings of kept sections
+    """
+    blocks = score_blocks(parse_blocks(markdown), query, bm25_weight, min_words)
+    kept = [b.kind != "heading" and b.quality >= QUALITY_FLOOR and b.score >= threshold for b in blocks]
+    kept = keep_section_headings(blocks, kept)
+    selected = [b.text for b, keep in zip(blocks, kept) if keep]
+    return {
+        "content": "\n\n".join(selected),
+        "blocks_total": len(blocks),
+        "blocks_kept": sum(1 for b, keep in zip(blocks, kept) if keep and b.kind != "heading"),
+    }
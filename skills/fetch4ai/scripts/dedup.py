@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+dedup.py - Cross-page near-duplicate block elimination for fetch4ai
+
+Pages of one site repeat the same boilerplate (cookie notices, "related
+articles", footers pruning keeps) and mirror each other's articles. This
+module drops every markdown block of a fetched page that duplicates a block
+already emitted for another page, so each piece of text reaches the LLM once.
+Blocks are compared by their normalized word tokens, in three passes:
+
+  exact   a 64-bit hash of the tokens finds verbatim repeats in one lookup
+  short   blocks under SHORT_BLOCK_TOKENS tokens match on the Jaccard
+          similarity of their token sets, with MinHash LSH finding candidates
+  long    longer blocks match on a 64-bit SimHash within MAX_DISTANCE bits
+
+One changed word (a year in a footer, a name in a notice) moves a short block
+much further in SimHash bits than in token-set similarity, hence the split.
+
+Scopes (--dedup):
+  off    no deduplication (default)
+  batch  against blocks emitted earlier in this invocation
+  cache  also against blocks emitted by earlier invocations, kept in an
+         index file in the cache directory
+
+The index is a set of flat integer arrays, about 60 bytes per long block and
+120 per short one: ten thousand pages of 30 blocks take under 40 MB.
+
+Usage:
+  from dedup import Deduplicator
+  dedup = Deduplicator()
+  result = dedup.apply(result)   # result["content"] without repeated blocks
+"""
+
+import hashlib
+import os
+import struct
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from block_scoring import Block, estimate_tokens, parse_blocks
+
+
+DEDUP_SCOPES = ("off", "batch", "cache")
+INDEX_FILE = "dedup-index.bin"
+INDEX_MAGIC = b"F4AIDD2\n"
+MIN_TOKENS = 5         # Shorter blocks (headings, captions, list items) are never dropped
+SHORT_BLOCK_TOKENS = 40  # Blocks with fewer tokens are compared by token-set Jaccard, not SimHash
+MIN_JACCARD = 0.7      # Token-set similarity at or above which short blocks are duplicates
+MINHASH_BANDS = 6      # LSH bands; a pair at MIN_JACCARD shares one with probability 0.98
+MINHASH_ROWS = 2       # MinHash values per band
+MINHASH_BITS = 12      # Bucket table size per band
+MAX_DISTANCE = 6       # SimHash Hamming distance at or below which long blocks are duplicates
+BANDS = MAX_DISTANCE + 1  # Two fingerprints within MAX_DISTANCE agree on at least one band
+BAND_BITS = [64 // BANDS + (1 if band < 64 % BANDS else 0) for band in range(BANDS)]
+EXACT_BITS = 16        # Bucket table size for exact hashes
+MAX_STORED = 1_000_000  # Blocks kept per index in the persistent file; oldest dropped first
+
+MERSENNE_61 = (1 << 61) - 1
+
+
+def _hash_int(text: str, size: int) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=size).digest(), "big")
+
+
+# (a, b) of the universal hashes (a * x + b) mod 2^61-1 that stand in for MinHash permutations
+MINHASH_PARAMS = [
+    (_hash_int(f"minhash-a-{i}", 8) % MERSENNE_61 | 1, _hash_int(f"minhash-b-{i}", 8) % MERSENNE_61)
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+
+@lru_cache(maxsize=65536)
+def _feature_vector(token: str) -> Tuple[int, ...]:
+    """+1/-1 per bit of the token's 64-bit hash."""
+    h = _hash_int(token, 8)
+    return tuple(1 if h >> bit & 1 else -1 for bit in range(64))
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return _hash_int(token, 4)
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash of a token list, with word tokens as features.
+
+    Unigrams only: one changed word flips fewer bits than with shingles,
+    which matters for paragraph-sized inputs.
+    """
+    if not tokens:
+        return 0
+    weights = map(sum, zip(*map(_feature_vector, tokens)))
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def exact_hash(tokens: List[str]) -> int:
+    """64-bit hash of the normalized (lowercased, stemmed, stopword-free) tokens."""
+    return _hash_int(" ".join(tokens), 8)
+
+
+def shingles(tokens: List[str]) -> List[int]:
+    """Sorted 32-bit hashes of the distinct tokens: the one-word shingles of a block.
+
+    Single words rather than word n-grams: in a ten-word block one changed
+    word leaves 9 of 11 words shared, but only 7 of 11 bigrams.
+    """
+    return sorted({_token_hash(token) for token in tokens})
+
+
+def minhash_keys(members: Sequence[int]) -> List[int]:
+    """One LSH bucket key per band of the members' MinHash signature."""
+    mins = [min((a * x + b) % MERSENNE_61 for x in members) for a, b in MINHASH_PARAMS]
+    keys = []
+    for band in range(MINHASH_BANDS):
+        key = 0
+        for value in mins[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]:
+            key = (key * 0x9E3779B97F4A7C15 + value) % MERSENNE_61
+        keys.append(key)
+    return keys
+
+
+def page_id(url: str) -> int:
+    """32-bit id of a page, so a page re-fetched later never dedups against itself."""
+    return _hash_int(url, 4)
+
+
+class ChainedIndex:
+    """Entries in flat arrays, chained into one bucket table per key of an entry.
+
+    Per stored entry: 4 bytes of page id and 4 of chain link per table, plus
+    what subclasses keep in DATA; bucket heads are a fixed 4 bytes each.
+    """
+
+    TABLE_BITS: Sequence[int] = ()
+    DATA: Sequence[Tuple[str, str]] = ()  # (attribute, array typecode) of per-index data
+
+    def __init__(self):
+        self.pages = array("I")
+        self.heads = [array("i", [-1]) * (1 << bits) for bits in self.TABLE_BITS]
+        self.links = [array("i") for _ in self.TABLE_BITS]
+        for name, typecode in self.DATA:
+            setattr(self, name, array(typecode))
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def _push(self, keys: Sequence[int], page: int) -> int:
+        """Append an entry with one bucket key per table; its data must be appended already."""
+        position = len(self.pages)
+        self.pages.append(page)
+        for heads, links, key in zip(self.heads, self.links, keys):
+            key &= len(heads) - 1
+            links.append(heads[key])
+            heads[key] = position
+        return position
+
+    def _chain(self, table: int, key: int) -> Iterator[int]:
+        """Positions of the entries in one bucket, newest first."""
+        heads, links = self.heads[table], self.links[table]
+        position = heads[key & (len(heads) - 1)]
+        while position >= 0:
+            yield position
+            position = links[position]
+
+    def _entry(self, position: int) -> tuple:
+        """Arguments that add() the entry at position again."""
+        raise NotImplementedError
+
+    def add(self, *args) -> int:
+        raise NotImplementedError
+
+    def _arrays(self) -> List[array]:
+        return [self.pages, *(getattr(self, name) for name, _ in self.DATA), *self.heads, *self.links]
+
+    def newest(self, count: int) -> "ChainedIndex":
+        """This index, or a copy keeping only the newest count entries."""
+        if len(self) <= count:
+            return self
+        index = type(self)()
+        for position in range(len(self) - count, len(self)):
+            index.add(*self._entry(position))
+        return index
+
+    def write(self, f: BinaryIO) -> None:
+        for values in self._arrays():
+            f.write(struct.pack("<Q", len(values)))
+            values.tofile(f)
+
+    @classmethod
+    def read(cls, f: BinaryIO) -> "ChainedIndex":
+        index = cls()
+        for values in index._arrays():
+            (size,) = struct.unpack("<Q", f.read(8))
+            del values[:]
+            values.fromfile(f, size)
+        return index
+
+
+class ExactIndex(ChainedIndex):
+    """Exact token hashes: 8 bytes each plus one chain link."""
+
+    TABLE_BITS = (EXACT_BITS,)
+    DATA = (("digests", "Q"),)
+
+    def add(self, digest: int, page: int) -> int:
+        self.digests.append(digest)
+        return self._push([digest], page)
+
+    def _entry(self, position: int) -> tuple:
+        return self.digests[position], self.pages[position]
+
+    def find(self, digest: int, page: int) -> Optional[int]:
+        """Page id of another page with this exact hash, or None."""
+        for position in self._chain(0, digest):
+            if self.digests[position] == digest and self.pages[position] != page:
+                return self.pages[position]
+        return None
+
+    def contains(self, digest: int, page: int) -> bool:
+        """True if this exact hash is already stored for this page."""
+        return any(self.digests[position] == digest and self.pages[position] == page
+                   for position in self._chain(0, digest))
+
+
+class ShingleIndex(ChainedIndex):
+    """Token sets of short blocks, with MinHash LSH buckets to find candidates.
+
+    Candidates are confirmed by their exact Jaccard similarity, so a bucket
+    collision never drops a block.
+    """
+
+    TABLE_BITS = (MINHASH_BITS,) * MINHASH_BANDS
+    DATA = (("starts", "I"), ("members", "I"))
+
+    def add(self, members: Sequence[int], page: int) -> int:
+        self.starts.append(len(self.members))
+        self.members.extend(members)
+        return self._push(minhash_keys(members), page)
+
+    def _members(self, position: int) -> array:
+        end = self.starts[position + 1] if position + 1 < len(self.starts) else len(self.members)
+        return self.members[self.starts[position]:end]
+
+    def _entry(self, position: int) -> tuple:
+        return self._members(position), self.pages[position]
+
+    def find(self, members: Sequence[int], page: int) -> Optional[int]:
+        """Page id of another page's token set within MIN_JACCARD, or None."""
+        wanted = set(members)
+        checked = set()
+        for band, key in enumerate(minhash_keys(members)):
+            for position in self._chain(band, key):
+                if position in checked or self.pages[position] == page:
+                    continue
+                checked.add(position)
+                stored = self._members(position)
+                common = sum(1 for member in stored if member in wanted)
+                if common >= MIN_JACCARD * (len(stored) + len(wanted) - common):
+                    return self.pages[position]
+        return None
+
+
+class SimHashIndex(ChainedIndex):
+    """SimHash fingerprints of long blocks, chained into one bucket table per band."""
+
+    TABLE_BITS = tuple(BAND_BITS)
+    DATA = (("fingerprints", "Q"),)
+
+    @staticmethod
+    def _band_keys(fingerprint: int) -> List[int]:
+        keys, shift = [], 0
+        for bits in BAND_BITS:
+            keys.append((fingerprint >> shift) & ((1 << bits) - 1))
+            shift += bits
+        return keys
+
+    def add(self, fingerprint: int, page: int) -> int:
+        self.fingerprints.append(fingerprint)
+        return self._push(self._band_keys(fingerprint), page)
+
+    def _entry(self, position: int) -> tuple:
+        return self.fingerprints[position], self.pages[position]
+
+    def find(self, fingerprint: int, page: int) -> Optional[int]:
+        """Page id of another page's fingerprint within MAX_DISTANCE, or None."""
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for position in self._chain(band, key):
+                if self.pages[position] != page and bin(self.fingerprints[position] ^ fingerprint).count("1") <= MAX_DISTANCE:
+                    return self.pages[position]
+        return None
+
+
+class BlockIndex:
+    """The exact, short-block and long-block indexes, saved together in one file."""
+
+    def __init__(self):
+        self.exact = ExactIndex()
+        self.short = ShingleIndex()
+        self.long = SimHashIndex()
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def _parts(self) -> List[ChainedIndex]:
+        return [self.exact, self.short, self.long]
+
+    def find(self, tokens: List[str], page: int) -> Tuple[Optional[int], int]:
+        """Page id of another page with a duplicate of this block (or None), and its exact hash."""
+        digest = exact_hash(tokens)
+        source = self.exact.find(digest, page)
+        if source is None:
+            if len(tokens) < SHORT_BLOCK_TOKENS:
+                source = self.short.find(shingles(tokens), page)
+            else:
+                source = self.long.find(simhash(tokens), page)
+        return source, digest
+
+    def add(self, tokens: List[str], page: int, digest: int) -> None:
+        """Store a block unless this page already stored the same tokens."""
+        if self.exact.contains(digest, page):
+            return  # A re-fetched page matches only itself: keep one copy of its blocks
+        self.exact.add(digest, page)
+        if len(tokens) < SHORT_BLOCK_TOKENS:
+            self.short.add(shingles(tokens), page)
+        else:
+            self.long.add(simhash(tokens), page)
+
+    def save(self, path: Path) -> None:
+        """Write the newest MAX_STORED blocks of each index, with their bucket chains, atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC)
+            for part in self._parts():
+                part.newest(MAX_STORED).write(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BlockIndex":
+        """Read an index written by save(); a missing or unreadable file gives an empty index."""
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return index
+                loaded = cls()
+                loaded.exact, loaded.short, loaded.long = (type(part).read(f) for part in index._parts())
+        except (OSError, EOFError, struct.error):
+            return index
+        return loaded
+
+
+class Deduplicator:
+    """Drops blocks of each result that were already emitted for another page."""
+
+    def __init__(self, index_path: Optional[Union[str, Path]] = None, collapse: bool = False):
+        """
+        Args:
+            index_path: Persistent index to load and save (cache scope), or None
+            collapse: Replace each run of dropped blocks with a one-line note
+                instead of removing it silently
+        """
+        self.index_path = Path(index_path).expanduser() if index_path else None
+        self.index = BlockIndex.load(self.index_path) if self.index_path else BlockIndex()
+        self.collapse = collapse
+        self.urls: Dict[int, str] = {}  # Page ids emitted in this run, for notes
+        self.stats = {"pages": 0, "blocks_dropped": 0, "tokens_saved": 0}
+
+    def _filter(self, blocks: List[Block], page: int) -> Tuple[List[bool], List[Optional[int]]]:
+        """Keep flags and, for dropped blocks, the page id they duplicate."""
+        kept, sources = [], []
+        for block in blocks:
+            if block.kind == "heading" or len(block.tokens) < MIN_TOKENS:
+                kept.append(True)
+                sources.append(None)
+                continue
+            source, digest = self.index.find(block.tokens, page)
+            kept.append(source is None)
+            sources.append(source)
+            if source is None:
+                self.index.add(block.tokens, page, digest)
+        return kept, sources
+
+    @staticmethod
+    def _drop_empty_sections(blocks: List[Block], kept: List[bool], sources: List[Optional[int]]) -> None:
+        """Drop headings whose sections lost all their content to deduplication."""
+        for i, block in enumerate(blocks):
+            if block.kind != "heading":
+                continue
+            section = []
+            for later in blocks[i + 1:]:
+                if later.kind == "heading" and later.level <= block.level:
+                    break
+                if later.kind != "heading":
+                    section.append(later.index)
+            if section and all(sources[j] is not None for j in section):
+                kept[i] = False
+
+    def apply(self, result: dict) -> dict:
+        """Remove already-emitted blocks from a successful result's content, in place.
+
+        Adds stats.dedup {blocks, blocks_dropped, tokens_saved}, and
+        duplicate_of when every content block was seen on one other page.
+        """
+        content = result.get("content")
+        if not result.get("success") or not content:
+            return result
+
+        url = result.get("url", "")
+        page = page_id(url)
+        self.urls[page] = url
+        blocks = parse_blocks(content)
+        kept, sources = self._filter(blocks, page)
+        self._drop_empty_sections(blocks, kept, sources)
+
+        parts: List[str] = []
+        for block, keep, source in zip(blocks, kept, sources):
+            if keep:
+                parts.append(block.text)
+            elif self.collapse and source is not None:
+                note = f"[duplicate content omitted, see {self.urls[source]}]" if source in self.urls else "[duplicate content omitted]"
+                if not parts or parts[-1] != note:
+                    parts.append(note)
+        deduped = "\n\n".join(parts)
+
+        dropped = sum(1 for block, keep in zip(blocks, kept) if not keep and block.kind != "heading")
+        saved = max(0, estimate_tokens(content) - estimate_tokens(deduped))
+        self.stats["pages"] += 1
+        self.stats["blocks_dropped"] += dropped
+        self.stats["tokens_saved"] += saved
+
+        if dropped:
+            result["content"] = deduped
+            result.setdefault("metadata", {})["word_count"] = len(deduped.split())
+            content_sources = {source for block, source in zip(blocks, sources) if block.kind != "heading" and len(block.tokens) >= MIN_TOKENS}
+            if len(content_sources) == 1 and None not in content_sources:
+                source = content_sources.pop()
+                if source in self.urls:
+                    result["duplicate_of"] = self.urls[source]
+        result.setdefault("stats", {})["dedup"] = {
+            "blocks": len(blocks),
+            "blocks_dropped": dropped,
+            "tokens_saved": saved,
+        }
+        return result
+
+    def save(self) -> None:
+        if self.index_path:
+            self.index.save(self.index_path)
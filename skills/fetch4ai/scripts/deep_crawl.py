@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+deep_crawl.py - Bounded deep crawl for fetch4ai
+
+Starts from one or more seed URLs and follows the internal links of every
+fetched page, up to --depth link hops and --max-pages pages. Pages are
+filtered with the selected strategy and streamed as NDJSON as they complete.
+
+- Frontier: URLs are normalized (lowercase scheme and host, default port,
+  fragment and tracking parameters dropped, query sorted) and fetched once.
+- Scope: only the seeds' hosts, narrowed by --include and --exclude glob
+  patterns matched against the normalized URL.
+- Order: breadth-first; with --query, links whose text and URL score higher
+  on BM25 against the query are fetched first.
+- Politeness: at most --per-host pages of a host load at once, and requests
+  to a host start at least --delay seconds apart. Up to --concurrency pages
+  load at once overall, across hosts.
+
+Page fetching and the browser come from the caller (fetch4ai.safe_fetch and
+fetch4ai.SharedCrawler), so this module never imports fetch4ai: run as a
+script, that would load a second copy with its own crawl4ai and --timings
+state.
+
+Usage:
+  python fetch4ai.py --url "https://docs.example.com/" --depth 2 --max-pages 100
+  python fetch4ai.py --url "https://docs.example.com/" --depth 3 --query "authentication" \\
+    --include "https://docs.example.com/api/*" --exclude "*/changelog/*" -o docs.ndjson
+"""
+
+import argparse
+import asyncio
+import heapq
+import time
+from fnmatch import fnmatchcase
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from block_scoring import bm25_scores, tokenize
+
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_PAGES = 50
+DEFAULT_PER_HOST = 2
+DEFAULT_DELAY = 0.5
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Canonical form of an http(s) URL, resolved against base; None if not crawlable."""
+    try:
+        parts = urlsplit(urljoin(base, url.strip()) if base else url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname  # Lowercased, without user info
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port is None or port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+    path = "/".join(segment for i, segment in enumerate(parts.path.split("/")) if segment or i == 0) or "/"
+    if parts.path.endswith("/") and not path.endswith("/"):
+        path += "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+class Frontier:
+    """Deduplicating URL queue, one priority queue per host.
+
+    Entries are ordered by descending priority, then depth, then discovery
+    order, so without priorities the crawl is breadth-first.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None
+    ):
+        self.hosts = set(hosts)
+        self.include = include or []
+        self.exclude = exclude or []
+        self.seen = set()
+        self.queues: Dict[str, list] = {}
+        self._order = 0
+
+    def allows(self, url: str) -> bool:
+        """In scope: on a seed host, matching an --include pattern (if any) and no --exclude pattern."""
+        if host_of(url) not in self.hosts:
+            return False
+        if self.include and not any(fnmatchcase(url, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatchcase(url, pattern) for pattern in self.exclude)
+
+    def add(self, url: str, depth: int, priority: float = 0.0, parent: Optional[str] = None) -> bool:
+        """Queue a normalized URL unless it was seen before or is out of scope."""
+        if url in self.seen or not self.allows(url):
+            return False
+        self.seen.add(url)
+        self._order += 1
+        heapq.heappush(self.queues.setdefault(host_of(url), []), (-priority, depth, self._order, url, parent))
+        return True
+
+    def pending_hosts(self) -> List[str]:
+        return [host for host, queue in self.queues.items() if queue]
+
+    def pop(self, ready: Callable[[str], bool]) -> Optional[Tuple[float, int, int, str, Optional[str]]]:
+        """Remove and return the best entry among hosts for which ready(host) is true."""
+        best = None
+        for host in self.pending_hosts():
+            if ready(host) and (best is None or self.queues[host][0] < self.queues[best][0]):
+                best = host
+        return heapq.heappop(self.queues[best]) if best is not None else None
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+
+class HostLimiter:
+    """Per-host politeness: concurrent pages and minimum spacing of request starts."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, delay: float = DEFAULT_DELAY):
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self.active: Dict[str, int] = {}
+        self.last_start: Dict[str, float] = {}
+
+    def next_start(self, host: str) -> Optional[float]:
+        """Earliest time a request to host may start, or None while it is at its limit."""
+        if self.active.get(host, 0) >= self.per_host:
+            return None
+        return self.last_start.get(host, float("-inf")) + self.delay
+
+    def ready(self, host: str, now: float) -> bool:
+        start = self.next_start(host)
+        return start is not None and start <= now
+
+    def start(self, host: str, now: float) -> None:
+        self.active[host] = self.active.get(host, 0) + 1
+        self.last_start[host] = now
+
+    def finish(self, host: str) -> None:
+        self.active[host] -= 1
+
+
+def link_priorities(links: List[dict], query_tokens: List[str]) -> List[float]:
+    """BM25 of each link's text and URL path words against the query (all 0 without a query)."""
+    if not query_tokens:
+        return [0.0] * len(links)
+    documents = [tokenize(f"{link.get('text', '')} {urlsplit(link.get('href', '')).path}") for link in links]
+    return bm25_scores(documents, query_tokens)
+
+
+async def crawl_site(
+    seeds: List[str],
+    args: argparse.Namespace,
+    emit: Callable[[dict], None],
+    excluded_tags: Optional[list] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    *,
+    fetch_page: Callable[[str, argparse.Namespace, Optional[list], Any], Awaitable[dict]],
+    open_browser: Callable[[], AsyncContextManager[Any]],
+) -> dict:
+    """Crawl from seeds through one browser, emitting each page's result as it completes.
+
+    Args:
+        seeds: Start URLs; their hosts bound the crawl
+        args: Parsed command-line options (strategy, filter and crawl settings)
+        emit: Called with every result dict, in completion order; results
+            carry metadata.depth and metadata.parent
+        excluded_tags: Tags to exclude
+        concurrency: Maximum pages loading at once across all hosts
+        fetch_page: Fetches one page as fetch4ai.safe_fetch(url, args,
+            excluded_tags, crawler) does, reporting errors as results
+        open_browser: Returns an async context manager yielding the crawler
+            passed to fetch_page, e.g. fetch4ai.SharedCrawler
+
+    Returns:
+        Summary with counts of fetched, succeeded and failed pages and the
+        number of in-scope URLs left unfetched
+    """
+    normalized = [url for url in (normalize_url(seed) for seed in seeds) if url]
+    frontier = Frontier({host_of(url) for url in normalized}, args.include, args.exclude)
+    for url in normalized:
+        frontier.add(url, 0)
+
+    limiter = HostLimiter(args.per_host, args.delay)
+    query_tokens = tokenize(args.query) if args.query else []
+    max_pages = max(0, args.max_pages)
+    running: Dict[asyncio.Future, tuple] = {}
+    summary = {"total": 0, "succeeded": 0, "failed": 0, "unvisited": 0}
+
+    async with open_browser() as crawler:
+        while True:
+            now = time.monotonic()
+            while len(running) < max(1, concurrency) and summary["total"] < max_pages:
+                entry = frontier.pop(lambda host: limiter.ready(host, now))
+                if entry is None:
+                    break
+                url = entry[3]
+                limiter.start(host_of(url), now)
+                summary["total"] += 1
+                running[asyncio.ensure_future(fetch_page(url, args, excluded_tags, crawler))] = entry
+
+            if summary["total"] >= max_pages or not frontier or len(running) >= max(1, concurrency):
+                # Nothing more can start until a page finishes
+                if not running:
+                    break
+                timeout = None
+            else:
+                # Wake for the next host whose delay expires, or the next finished page
+                starts = [limiter.next_start(host) for host in frontier.pending_hosts()]
+                starts = [start for start in starts if start is not None]
+                timeout = max(0.0, min(starts) - time.monotonic()) if starts else None
+                if not running:
+                    if timeout is None:
+                        break
+                    await asyncio.sleep(timeout)
+                    continue
+
+            done, _ = await asyncio.wait(list(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                neg_priority, depth, _, url, parent = running.pop(task)
+                limiter.finish(host_of(url))
+                result = task.result()
+                metadata = result.setdefault("metadata", {})
+                metadata["depth"] = depth
+                metadata["parent"] = parent
+                if query_tokens:
+                    metadata["priority"] = round(-neg_priority, 3)
+
+                if result.get("success") and depth < args.depth:
+                    links = result.get("links") or []
+                    for link, priority in zip(links, link_priorities(links, query_tokens)):
+                        target = normalize_url(link.get("href", ""), base=url)
+                        if target:
+                            frontier.add(target, depth + 1, priority, url)
+
+                summary["succeeded" if result.get("success") else "failed"] += 1
+                emit(result)
+
+    summary["unvisited"] = len(frontier)
+    return summary
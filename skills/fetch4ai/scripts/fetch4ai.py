@@ -9,22 +9,40 @@ Strategies:
   - pruning: Threshold-based noise removal (default)
   - bm25: Query-relevant content extraction
   - tags: HTML tag exclusion with word count filtering
-  - composite: Pruning + BM25 for maximum precision
+  - composite: Block quality and BM25 relevance scored together for maximum precision
 
 Usage:
   python fetch4ai.py --url "https://example.com" --strategy pruning
   python fetch4ai.py --url "https://example.com" --strategy bm25 --query "machine learning"
   python fetch4ai.py --url "https://example.com" --strategy tags --excluded-tags "nav,footer"
+  python fetch4ai.py --urls-file urls.txt --concurrency 4 > results.ndjson
+  python fetch4ai.py --url "https://docs.example.com/" --depth 2 --max-pages 100 --query "auth"
+  python fetch4ai.py --urls-file urls.txt --dedup batch > results.ndjson
+  python fetch4ai.py --url "https://example.com" --strategy bm25 --query "pricing" --max-tokens 1500
+  python fetch4ai.py --serve -q &    # later invocations reuse its warm browser
+  python fetch4ai.py --url "https://example.com" --cache refresh
+  python fetch4ai.py --html-file page.html --sweep threshold=0.3,0.48,0.6
 """
 
+import time
+STARTED = time.perf_counter()  # Before the other imports, so --timings can report them
+
 import asyncio
 import argparse
 import json
 import sys
 import os
 from datetime import datetime
-from typing import Optional
-from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Tuple
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+
+from block_scoring import DEFAULT_BM25_WEIGHT, DEFAULT_COMPOSITE_THRESHOLD, select_composite
+from dedup import DEDUP_SCOPES, INDEX_FILE, Deduplicator
+from fetch_cache import CACHE_MODES, DEFAULT_CACHE_DIR, DEFAULT_TTL, PageCache, options_key
+from token_budget import chunk_markdown, pack_blocks
 
 
 @contextmanager
@@ -41,22 +59,197 @@ def suppress_output():
             sys.stdout = old_stdout
             sys.stderr = old_stderr
 
-try:
-    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-    from crawl4ai.content_filter_strategy import PruningContentFilter, BM25ContentFilter
-except ImportError:
-    print(json.dumps({
-        "success": False,
-        "error": "crawl4ai not installed. Run: pip install -U crawl4ai && crawl4ai-setup",
-        "error_type": "import_error"
-    }))
-    sys.exit(1)
+
+class Timings:
+    """Wall-clock time per startup and fetch phase, for --timings."""
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def report(self) -> dict:
+        """Milliseconds per phase, in the order first measured, plus the total since startup."""
+        report = {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()}
+        report["total"] = round((time.perf_counter() - STARTED) * 1000, 1)
+        return report
+
+
+TIMINGS = Timings()
+
+AsyncWebCrawler = BrowserConfig = CrawlerRunConfig = CacheMode = None
+DefaultMarkdownGenerator = PruningContentFilter = BM25ContentFilter = None
+
+
+def load_crawl4ai() -> None:
+    """Import crawl4ai on first use.
+
+    Deferred so that forwarding a request to a running fetch4ai server does
+    not pay for importing crawl4ai and its dependencies.
+    """
+    global AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+    global DefaultMarkdownGenerator, PruningContentFilter, BM25ContentFilter
+    if AsyncWebCrawler is not None:
+        return
+    try:
+        with TIMINGS.measure("import_crawl4ai"):
+            from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+            from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+            from crawl4ai.content_filter_strategy import PruningContentFilter, BM25ContentFilter
+    except ImportError:
+        print(json.dumps({
+            "success": False,
+            "error": "crawl4ai not installed. Run: pip install -U crawl4ai && crawl4ai-setup",
+            "error_type": "import_error"
+        }), file=sys.__stdout__)
+        sys.exit(1)
+
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PRUNING_THRESHOLD = 0.48
+MAX_LINKS = 50  # Internal links reported per page by default
+
+# Browser settings shared by every fetch; part of the page cache key
+RENDER_SETTINGS = {"headless": True, "java_script_enabled": True}
+
+
+def browser_config() -> "BrowserConfig":
+    """Browser settings shared by every fetch."""
+    return BrowserConfig(**RENDER_SETTINGS)
+
+
+class SharedCrawler:
+    """Browser launched on first use and shared by all fetches until closed.
+
+    Lets a batch skip the browser entirely when every page comes from the
+    page cache.
+    """
+
+    def __init__(self):
+        self._crawler = None
+        self._lock = asyncio.Lock()
+        self._stack = AsyncExitStack()
+
+    async def get(self) -> "AsyncWebCrawler":
+        async with self._lock:
+            if self._crawler is None:
+                load_crawl4ai()
+                with TIMINGS.measure("browser_launch"):
+                    self._crawler = await self._stack.enter_async_context(AsyncWebCrawler(config=browser_config()))
+        return self._crawler
+
+    async def close(self) -> None:
+        await self._stack.aclose()
+        self._crawler = None
+
+    async def __aenter__(self) -> "SharedCrawler":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+@asynccontextmanager
+async def open_crawler(crawler=None):
+    """Yield the given crawler (or SharedCrawler's browser), or launch a browser for this fetch only."""
+    load_crawl4ai()
+    if isinstance(crawler, SharedCrawler):
+        yield await crawler.get()
+        return
+    if crawler is not None:
+        yield crawler
+        return
+    async with AsyncExitStack() as stack:
+        with TIMINGS.measure("browser_launch"):
+            own_crawler = await stack.enter_async_context(AsyncWebCrawler(config=browser_config()))
+        yield own_crawler
+
+
+def render_html(url: str, html: str, run_config: "CrawlerRunConfig"):
+    """Run crawl4ai's scraping and markdown steps on already-rendered HTML.
+
+    Mirrors what AsyncWebCrawler.arun does after loading a page, without a
+    browser, and returns an object with the CrawlResult fields that
+    process_result reads.
+    """
+    load_crawl4ai()
+    from crawl4ai.content_scraping_strategy import WebScrapingStrategy
+
+    scraper = getattr(run_config, "scraping_strategy", None) or WebScrapingStrategy()
+    params = {k: v for k, v in vars(run_config).items() if k != "url"}
+    scraped = scraper.scrap(url, html, **params)
+    if not isinstance(scraped, dict):
+        scraped = {name: getattr(scraped, name, None) for name in ("cleaned_html", "links", "metadata")}
+
+    links = scraped.get("links") or {}
+    if hasattr(links, "model_dump"):
+        links = links.model_dump()
+    metadata = scraped.get("metadata") or {}
+    markdown = run_config.markdown_generator.generate_markdown(scraped.get("cleaned_html") or "", base_url=url)
+
+    return SimpleNamespace(
+        success=True,
+        url=url,
+        html=html,
+        markdown=markdown,
+        links=links,
+        metadata=metadata,
+        title=metadata.get("title") or "",
+        error_message=None,
+    )
+
+
+class OfflineCrawler:
+    """Crawler stand-in that filters saved HTML instead of loading pages."""
+
+    def __init__(self, pages: dict):
+        """
+        Args:
+            pages: {url: rendered HTML}
+        """
+        self.pages = pages
+
+    async def arun(self, url: str, config: "CrawlerRunConfig"):
+        return render_html(url, self.pages[url], config)
+
+
+async def crawl(
+    url: str,
+    run_config: "CrawlerRunConfig",
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
+):
+    """Load and filter a page, from the page cache when it holds a valid copy.
+
+    Cached HTML that is fresh, or that a conditional GET confirms unchanged,
+    is filtered with render_html; otherwise the page is rendered in the
+    browser and the HTML stored for next time.
+    """
+    if cache is not None and cache.reads:
+        entry = cache.lookup(url)
+        if entry and (cache.is_fresh(entry) or await asyncio.to_thread(cache.revalidate, entry)):
+            return render_html(url, cache.read_html(entry), run_config)
+
+    async with open_crawler(crawler) as crawler:
+        result = await crawler.arun(url=url, config=run_config)
+
+    if cache is not None and cache.writes and result.success and result.html:
+        cache.store(url, result.html, getattr(result, "response_headers", None), getattr(result, "status_code", None))
+    return result
 
 
 async def fetch_with_pruning(
     url: str,
-    threshold: float = 0.48,
+    threshold: float = DEFAULT_PRUNING_THRESHOLD,
     min_word_threshold: int = 5,
     word_count_threshold: int = 10,
     excluded_tags: Optional[list] = None,
@@ -65,8 +258,12 @@ async def fetch_with_pruning(
     exclude_external_links: bool = False,
     session_id: Optional[str] = None,
     timeout: int = 30,
+    max_links: int = MAX_LINKS,
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
 ) -> dict:
     """Fetch with PruningContentFilter for noise removal."""
+    load_crawl4ai()
 
     pruning_filter = PruningContentFilter(
         threshold=threshold,
@@ -83,8 +280,6 @@ async def fetch_with_pruning(
         }
     )
 
-    browser_config = BrowserConfig(headless=True, java_script_enabled=True)
-
     run_config = CrawlerRunConfig(
         cache_mode=CacheMode.BYPASS,
         markdown_generator=markdown_generator,
@@ -95,9 +290,8 @@ async def fetch_with_pruning(
         page_timeout=timeout * 1000  # Convert to milliseconds
     )
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        result = await crawler.arun(url=url, config=run_config)
-        return process_result(result, url, "pruning")
+    result = await crawl(url, run_config, crawler, cache)
+    return process_result(result, url, "pruning", max_links=max_links)
 
 
 async def fetch_with_bm25(
@@ -111,8 +305,12 @@ async def fetch_with_bm25(
     exclude_external_links: bool = False,
     session_id: Optional[str] = None,
     timeout: int = 30,
+    max_links: int = MAX_LINKS,
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
 ) -> dict:
     """Fetch with BM25ContentFilter for query-relevant extraction."""
+    load_crawl4ai()
 
     if not query:
         return {
@@ -137,8 +335,6 @@ async def fetch_with_bm25(
         }
     )
 
-    browser_config = BrowserConfig(headless=True, java_script_enabled=True)
-
     run_config = CrawlerRunConfig(
         cache_mode=CacheMode.BYPASS,
         markdown_generator=markdown_generator,
@@ -149,9 +345,8 @@ async def fetch_with_bm25(
         page_timeout=timeout * 1000
     )
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        result = await crawler.arun(url=url, config=run_config)
-        return process_result(result, url, "bm25", query=query)
+    result = await crawl(url, run_config, crawler, cache)
+    return process_result(result, url, "bm25", query=query, max_links=max_links)
 
 
 async def fetch_with_tags(
@@ -163,8 +358,12 @@ async def fetch_with_tags(
     exclude_external_links: bool = False,
     session_id: Optional[str] = None,
     timeout: int = 30,
+    max_links: int = MAX_LINKS,
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
 ) -> dict:
     """Fetch with tag exclusion and word count filtering."""
+    load_crawl4ai()
 
     default_excluded = ["nav", "footer", "header", "aside"]
     tags_to_exclude = excluded_tags if excluded_tags else default_excluded
@@ -177,8 +376,6 @@ async def fetch_with_tags(
         }
     )
 
-    browser_config = BrowserConfig(headless=True, java_script_enabled=True)
-
     run_config = CrawlerRunConfig(
         cache_mode=CacheMode.BYPASS,
         markdown_generator=markdown_generator,
@@ -189,16 +386,15 @@ async def fetch_with_tags(
         page_timeout=timeout * 1000
     )
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        result = await crawler.arun(url=url, config=run_config)
-        return process_result(result, url, "tags")
+    result = await crawl(url, run_config, crawler, cache)
+    return process_result(result, url, "tags", max_links=max_links)
 
 
 async def fetch_composite(
     url: str,
     query: str,
-    threshold: float = 0.4,
-    bm25_threshold: float = 1.2,
+    threshold: float = DEFAULT_COMPOSITE_THRESHOLD,
+    bm25_weight: float = DEFAULT_BM25_WEIGHT,
     min_word_threshold: int = 5,
     word_count_threshold: int = 10,
     excluded_tags: Optional[list] = None,
@@ -207,8 +403,18 @@ async def fetch_composite(
     exclude_external_links: bool = False,
     session_id: Optional[str] = None,
     timeout: int = 30,
+    max_links: int = MAX_LINKS,
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
 ) -> dict:
-    """Two-pass filtering: Pruning first, then BM25."""
+    """Quality and query relevance scored together on one block list.
+
+    The page is rendered once to raw markdown, split into blocks and
+    tokenized once; each block's pruning-style quality and BM25 relevance are
+    combined as (1 - bm25_weight) * quality + bm25_weight * relevance, and
+    blocks reaching threshold are kept in document order.
+    """
+    load_crawl4ai()
 
     if not query:
         return {
@@ -218,15 +424,8 @@ async def fetch_composite(
             "error_type": "missing_parameter"
         }
 
-    # First pass: Pruning
-    pruning_filter = PruningContentFilter(
-        threshold=threshold,
-        threshold_type="fixed",
-        min_word_threshold=min_word_threshold
-    )
-
+    # No content filter: block scoring replaces both filter passes
     markdown_generator = DefaultMarkdownGenerator(
-        content_filter=pruning_filter,
         options={
             "include_links": include_links,
             "include_images": include_images,
@@ -234,8 +433,6 @@ async def fetch_composite(
         }
     )
 
-    browser_config = BrowserConfig(headless=True, java_script_enabled=True)
-
     run_config = CrawlerRunConfig(
         cache_mode=CacheMode.BYPASS,
         markdown_generator=markdown_generator,
@@ -246,66 +443,57 @@ async def fetch_composite(
         page_timeout=timeout * 1000
     )
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        result = await crawler.arun(url=url, config=run_config)
-
-        if not result.success:
-            return {
-                "success": False,
-                "url": url,
-                "error": f"Crawl failed: {result.error_message}",
-                "error_type": "crawl_error"
-            }
-
-        # Get pruned content
-        pruned_content = result.markdown.fit_markdown if hasattr(result.markdown, 'fit_markdown') else result.markdown
-
-        if not pruned_content:
-            return {
-                "success": False,
-                "url": url,
-                "error": "No content after pruning pass",
-                "error_type": "empty_content"
-            }
-
-        # Second pass: BM25 on pruned content
-        bm25_filter = BM25ContentFilter(
-            user_query=query,
-            bm25_threshold=bm25_threshold,
-            language="english"
-        )
+    result = await crawl(url, run_config, crawler, cache)
 
-        try:
-            bm25_chunks = bm25_filter.filter_content(pruned_content)
-            final_content = "\n\n".join(bm25_chunks) if bm25_chunks else pruned_content
-        except Exception:
-            # If BM25 fails, use pruned content
-            final_content = pruned_content
+    if not result.success:
+        return {
+            "success": False,
+            "url": url,
+            "error": f"Crawl failed: {result.error_message}",
+            "error_type": "crawl_error"
+        }
 
-        raw_length = len(result.markdown.raw_markdown) if hasattr(result.markdown, 'raw_markdown') else len(str(result.markdown))
-        fit_length = len(final_content)
+    raw_markdown = result.markdown.raw_markdown if hasattr(result.markdown, 'raw_markdown') else str(result.markdown)
+    selection = select_composite(raw_markdown, query, threshold, bm25_weight, min_word_threshold)
+    final_content = selection["content"]
 
+    if not final_content:
         return {
-            "success": True,
+            "success": False,
             "url": url,
-            "title": getattr(result, 'title', ''),
-            "content": final_content,
-            "links": extract_links(result),
-            "stats": {
-                "raw_length": raw_length,
-                "fit_length": fit_length,
-                "reduction_percent": round((1 - fit_length / raw_length) * 100, 1) if raw_length > 0 else 0
-            },
-            "strategy": "composite",
-            "query": query,
-            "metadata": {
-                "fetch_time": datetime.now().isoformat(),
-                "word_count": len(final_content.split())
-            }
+            "error": (
+                f"No block of {selection['blocks_total']} reached composite threshold {threshold}; "
+                "lower --threshold or --bm25-weight"
+            ),
+            "error_type": "empty_content"
+        }
+
+    raw_length = len(raw_markdown)
+    fit_length = len(final_content)
+
+    return {
+        "success": True,
+        "url": url,
+        "title": getattr(result, 'title', ''),
+        "content": final_content,
+        "links": extract_links(result, max_links),
+        "stats": {
+            "raw_length": raw_length,
+            "fit_length": fit_length,
+            "reduction_percent": round((1 - fit_length / raw_length) * 100, 1) if raw_length > 0 else 0,
+            "blocks_total": selection["blocks_total"],
+            "blocks_kept": selection["blocks_kept"]
+        },
+        "strategy": "composite",
+        "query": query,
+        "metadata": {
+            "fetch_time": datetime.now().isoformat(),
+            "word_count": len(final_content.split())
         }
+    }
 
 
-def process_result(result, url: str, strategy: str, query: str = None) -> dict:
+def process_result(result, url: str, strategy: str, query: str = None, max_links: int = MAX_LINKS) -> dict:
     """Process crawl result into standardized output format."""
 
     if not result.success:
@@ -339,7 +527,7 @@ def process_result(result, url: str, strategy: str, query: str = None) -> dict:
         "url": url,
         "title": getattr(result, 'title', ''),
         "content": content,
-        "links": extract_links(result),
+        "links": extract_links(result, max_links),
         "stats": {
             "raw_length": raw_length,
             "fit_length": fit_length,
@@ -358,11 +546,11 @@ def process_result(result, url: str, strategy: str, query: str = None) -> dict:
     return output
 
 
-def extract_links(result) -> list:
-    """Extract links from crawl result."""
+def extract_links(result, limit: int = MAX_LINKS) -> list:
+    """Extract internal links from crawl result, at most limit of them (0 = all)."""
     links = []
     if hasattr(result, 'links') and result.links:
-        for link in result.links.get('internal', [])[:50]:  # Limit to 50
+        for link in result.links.get('internal', [])[:limit or None]:
             links.append({
                 "text": link.get('text', ''),
                 "href": link.get('href', '')
@@ -370,12 +558,440 @@ def extract_links(result) -> list:
     return links
 
 
-async def main():
+async def fetch_url(
+    url: str,
+    args: argparse.Namespace,
+    excluded_tags: Optional[list] = None,
+    crawler: Optional["AsyncWebCrawler"] = None,
+) -> dict:
+    """Fetch one URL with the strategy and options selected on the command line.
+
+    With the page cache enabled, a result stored for the same filter options
+    is returned directly (marked "cache": "hit" in its metadata).
+    """
+    cache = make_cache(args)
+    key = options_key({k: v for k, v in fetch_options(args).items() if k in FILTER_OPTIONS})
+    if cache is not None and cache.reads:
+        hit = cache.get_filtered(url, key)
+        if hit is not None:
+            hit.setdefault("metadata", {})["cache"] = "hit"
+            return hit
+
+    result = await fetch_strategy(url, args, excluded_tags, crawler, cache)
+    if cache is not None and result and result.get("success"):
+        cache.store_filtered(url, key, result)
+    return result
+
+
+async def fetch_strategy(
+    url: str,
+    args: argparse.Namespace,
+    excluded_tags: Optional[list] = None,
+    crawler: Optional["AsyncWebCrawler"] = None,
+    cache: Optional[PageCache] = None,
+) -> dict:
+    """Dispatch to the fetch_with_* function of args.strategy."""
+    if args.strategy == "pruning":
+        return await fetch_with_pruning(
+            url=url,
+            threshold=strategy_threshold(args),
+            min_word_threshold=args.min_words,
+            word_count_threshold=args.word_count_threshold,
+            excluded_tags=excluded_tags,
+            include_links=args.include_links,
+            include_images=args.include_images,
+            exclude_external_links=args.exclude_external_links,
+            session_id=args.session_id,
+            timeout=args.timeout,
+            max_links=MAX_LINKS if args.max_links is None else args.max_links,
+            crawler=crawler,
+            cache=cache
+        )
+    elif args.strategy == "bm25":
+        return await fetch_with_bm25(
+            url=url,
+            query=args.query,
+            bm25_threshold=args.bm25_threshold,
+            word_count_threshold=args.word_count_threshold,
+            excluded_tags=excluded_tags,
+            include_links=args.include_links,
+            include_images=args.include_images,
+            exclude_external_links=args.exclude_external_links,
+            session_id=args.session_id,
+            timeout=args.timeout,
+            max_links=MAX_LINKS if args.max_links is None else args.max_links,
+            crawler=crawler,
+            cache=cache
+        )
+    elif args.strategy == "tags":
+        return await fetch_with_tags(
+            url=url,
+            excluded_tags=excluded_tags,
+            word_count_threshold=args.word_count_threshold,
+            include_links=args.include_links,
+            include_images=args.include_images,
+            exclude_external_links=args.exclude_external_links,
+            session_id=args.session_id,
+            timeout=args.timeout,
+            max_links=MAX_LINKS if args.max_links is None else args.max_links,
+            crawler=crawler,
+            cache=cache
+        )
+    elif args.strategy == "composite":
+        return await fetch_composite(
+            url=url,
+            query=args.query,
+            threshold=strategy_threshold(args),
+            bm25_weight=args.bm25_weight,
+            min_word_threshold=args.min_words,
+            word_count_threshold=args.word_count_threshold,
+            excluded_tags=excluded_tags,
+            include_links=args.include_links,
+            include_images=args.include_images,
+            exclude_external_links=args.exclude_external_links,
+            session_id=args.session_id,
+            timeout=args.timeout,
+            max_links=MAX_LINKS if args.max_links is None else args.max_links,
+            crawler=crawler,
+            cache=cache
+        )
+
+
+async def safe_fetch(
+    url: str,
+    args: argparse.Namespace,
+    excluded_tags: Optional[list] = None,
+    crawler: Optional["AsyncWebCrawler"] = None,
+) -> dict:
+    """fetch_url that reports exceptions as an error result instead of raising."""
+    try:
+        return await fetch_url(url, args, excluded_tags, crawler)
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "url": url,
+            "error": "Request timed out",
+            "error_type": "timeout"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "url": url,
+            "error": str(e),
+            "error_type": "unknown"
+        }
+
+
+def read_urls(source: str) -> List[str]:
+    """Read URLs, one per line, from a file or "-" for stdin.
+
+    Blank lines and lines starting with # are skipped; duplicates are
+    fetched once.
+    """
+    if source == "-":
+        lines: Iterable[str] = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+    urls = []
+    seen = set()
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith("#") and url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+async def fetch_batch(
+    urls: List[str],
+    args: argparse.Namespace,
+    emit: Callable[[dict], None],
+    excluded_tags: Optional[list] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict:
+    """Fetch many URLs through one browser, emitting each result as it completes.
+
+    Args:
+        urls: URLs to fetch
+        args: Parsed command-line options (strategy and filter settings)
+        emit: Called with every result dict, in completion order
+        excluded_tags: Tags to exclude
+        concurrency: Maximum pages loading at once
+
+    Returns:
+        Summary with counts of succeeded and failed URLs
+    """
+    # Before any task starts: its SystemExit would be lost inside a task
+    load_crawl4ai()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    summary = {"total": len(urls), "succeeded": 0, "failed": 0}
+
+    async with SharedCrawler() as crawler:
+        async def fetch_one(url: str) -> dict:
+            async with semaphore:
+                return await safe_fetch(url, args, excluded_tags, crawler)
+
+        for task in asyncio.as_completed([fetch_one(url) for url in urls]):
+            result = await task
+            summary["succeeded" if result.get("success") else "failed"] += 1
+            emit(result)
+
+    return summary
+
+
+async def run_fetch(
+    urls: List[str],
+    args: argparse.Namespace,
+    emit: Callable[[dict], None],
+    excluded_tags: Optional[list] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict:
+    """Fetch through a running fetch4ai server if there is one, else in-process.
+
+    URLs a server did not answer (e.g. it stopped mid-batch) are fetched
+    in-process as well.
+    """
+    summary = {"total": len(urls), "succeeded": 0, "failed": 0}
+
+    def counted(result: dict) -> None:
+        summary["succeeded" if result.get("success") else "failed"] += 1
+        emit(result)
+
+    pending = urls
+    if not args.no_server:
+        from fetch4ai_server import fetch_via_server, socket_path
+
+        path = None if args.port is not None else socket_path(args.socket)
+        unanswered = await fetch_via_server(urls, fetch_options(args), counted, concurrency, path, args.port)
+        if unanswered is not None:
+            pending = unanswered
+
+    if pending:
+        await fetch_batch(pending, args, counted, excluded_tags, concurrency)
+    return summary
+
+
+def strategy_threshold(args: argparse.Namespace) -> float:
+    """--threshold, or the default of the selected strategy."""
+    if args.threshold is not None:
+        return args.threshold
+    return DEFAULT_COMPOSITE_THRESHOLD if args.strategy == "composite" else DEFAULT_PRUNING_THRESHOLD
+
+
+# Parameters --sweep can vary, with their types
+SWEEP_PARAMS = {
+    "threshold": float,
+    "bm25_threshold": float,
+    "bm25_weight": float,
+    "min_words": int,
+    "word_count_threshold": int,
+}
+
+
+def parse_sweep(specs: List[str]) -> List[dict]:
+    """Expand --sweep NAME=V1,V2,... specs into the grid of settings to try.
+
+    Raises:
+        ValueError: For unknown parameters or values of the wrong type
+    """
+    axes = []
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        if not sep or name not in SWEEP_PARAMS:
+            raise ValueError(f"Invalid --sweep '{spec}': expected NAME=V1,V2,... with NAME in {', '.join(SWEEP_PARAMS)}")
+        try:
+            axes.append([(name, SWEEP_PARAMS[name](v)) for v in values.split(",") if v.strip()])
+        except ValueError:
+            raise ValueError(f"Invalid --sweep '{spec}': {name} takes {SWEEP_PARAMS[name].__name__} values")
+
+    grid = [{}]
+    for axis in axes:
+        grid = [dict(settings, **{name: value}) for settings in grid for name, value in axis]
+    return grid
+
+
+async def load_page_html(args: argparse.Namespace) -> tuple:
+    """Rendered HTML for offline filtering: --html-file, else the page cache, else one browser render.
+
+    Returns:
+        (url, html, source) where source is "file", "cache" or "browser"
+
+    Raises:
+        ValueError: With --offline when the page is not cached, or if rendering fails
+    """
+    if args.html_file:
+        if args.html_file == "-":
+            html = sys.stdin.read()
+        else:
+            with open(args.html_file, 'r', encoding='utf-8', errors='replace') as f:
+                html = f.read()
+        url = args.base_url or (Path(args.html_file).resolve().as_uri() if args.html_file != "-" else "about:blank")
+        return url, html, "file"
+
+    # Any cached copy will do, however old: the point is to skip the network
+    stored = PageCache(mode="use", root=args.cache_dir, render=RENDER_SETTINGS)
+    entry = stored.lookup(args.url)
+    if entry is not None:
+        return args.url, stored.read_html(entry), "cache"
+    if args.offline:
+        raise ValueError(f"{args.url} is not in the page cache; fetch it once without --offline")
+
+    load_crawl4ai()
+    async with open_crawler() as crawler:
+        result = await crawler.arun(url=args.url, config=CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            markdown_generator=DefaultMarkdownGenerator(),
+            page_timeout=args.timeout * 1000
+        ))
+    if not result.success or not result.html:
+        raise ValueError(f"Crawl failed: {result.error_message}")
+    cache = make_cache(args)
+    if cache is not None:
+        cache.store(args.url, result.html, getattr(result, "response_headers", None), getattr(result, "status_code", None))
+    return args.url, result.html, "browser"
+
+
+async def refilter(args: argparse.Namespace, excluded_tags: Optional[list] = None) -> dict:
+    """Filter saved HTML with the selected strategy, or every --sweep setting, without a browser."""
+    url, html, source = await load_page_html(args)
+    crawler = OfflineCrawler({url: html})
+
+    if not args.sweep:
+        result = await fetch_strategy(url, args, excluded_tags, crawler)
+        result.setdefault("metadata", {})["source"] = source
+        return result
+
+    results = []
+    for settings in parse_sweep(args.sweep):
+        start = time.perf_counter()
+        result = await fetch_strategy(url, argparse.Namespace(**{**vars(args), **settings}), excluded_tags, crawler)
+        row = {"params": settings, "success": result.get("success", False)}
+        if result.get("success"):
+            row.update(result["stats"])
+            row["word_count"] = result["metadata"]["word_count"]
+        else:
+            row["error"] = result.get("error")
+        row["seconds"] = round(time.perf_counter() - start, 4)
+        results.append(row)
+
+    return {
+        "success": any(r["success"] for r in results),
+        "url": url,
+        "strategy": args.strategy,
+        "source": source,
+        "html_length": len(html),
+        "results": results,
+    }
+
+
+def parse_excluded_tags(value: Optional[str]) -> Optional[list]:
+    """Split a comma-separated --excluded-tags value."""
+    if not value:
+        return None
+    return [t.strip() for t in value.split(",")]
+
+
+# Options that change what a fetch returns, forwarded to a fetch4ai server
+FETCH_OPTIONS = (
+    "strategy", "threshold", "min_words", "query", "bm25_threshold", "bm25_weight", "excluded_tags",
+    "word_count_threshold", "include_links", "include_images", "exclude_external_links", "max_links",
+    "session_id", "timeout", "cache", "cache_ttl", "cache_dir",
+)
+
+# The subset that determines the filtered output of a given page
+FILTER_OPTIONS = (
+    "strategy", "threshold", "min_words", "query", "bm25_threshold", "bm25_weight", "excluded_tags",
+    "word_count_threshold", "include_links", "include_images", "exclude_external_links", "max_links",
+)
+
+
+def make_cache(args: argparse.Namespace) -> Optional[PageCache]:
+    """Page cache for the --cache mode, or None when bypassed."""
+    if args.cache == "bypass":
+        return None
+    return PageCache(mode=args.cache, ttl=args.cache_ttl, root=args.cache_dir, render=RENDER_SETTINGS)
+
+
+def fetch_options(args: argparse.Namespace) -> dict:
+    """The fetch-affecting subset of parsed arguments, as plain JSON values.
+
+    cache_dir is made absolute, since a server resolves paths against its own cwd.
+    """
+    options = {name: getattr(args, name) for name in FETCH_OPTIONS}
+    if options["cache_dir"]:
+        options["cache_dir"] = os.path.abspath(os.path.expanduser(options["cache_dir"]))
+    return options
+
+
+def options_namespace(options: dict) -> argparse.Namespace:
+    """Rebuild fetch arguments from fetch_options() output, defaulting missing ones."""
+    parser = build_parser()
+    values = {name: parser.get_default(name) for name in FETCH_OPTIONS}
+    values.update({k: v for k, v in options.items() if k in FETCH_OPTIONS})
+    return argparse.Namespace(**values)
+
+
+def request_args(options: dict) -> Tuple[argparse.Namespace, Optional[list]]:
+    """Arguments and excluded tags for a fetch4ai server request's options.
+
+    Options get the type, choice and range checks their command-line flags get.
+
+    Raises:
+        ValueError: If an option value would be rejected on the command line
+    """
+    parser = build_parser()
+    options = {name: value for name, value in options.items() if name in FETCH_OPTIONS}
+    for action in parser._actions:
+        value = options.get(action.dest)
+        if value is None:
+            continue
+        flag = action.option_strings[0]
+        if action.choices is not None and value not in action.choices:
+            raise ValueError(f"{flag} must be one of {', '.join(action.choices)}, got {value!r}")
+        if action.type is not None:
+            if isinstance(value, bool):
+                raise ValueError(f"{flag} must be a number, got {value!r}")
+            try:
+                options[action.dest] = action.type(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{flag} must be a number, got {value!r}") from None
+        elif action.nargs == 0:
+            if not isinstance(value, bool):
+                raise ValueError(f"{flag} must be true or false, got {value!r}")
+        elif not isinstance(value, str):
+            raise ValueError(f"{flag} must be a string, got {value!r}")
+
+    args = options_namespace(options)
+    defaults = vars(parser.parse_args(["--url", ""]))
+    error = validate_args(argparse.Namespace(**{**defaults, **vars(args)}))
+    if error is not None:
+        raise ValueError(error["error"])
+    return args, parse_excluded_tags(args.excluded_tags)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Fetch web content with customizable filtering strategies"
     )
 
-    parser.add_argument("--url", required=True, help="URL to fetch")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="URL to fetch")
+    source.add_argument(
+        "--urls-file",
+        help="File with one URL per line ('-' for stdin); fetched through one browser, output as NDJSON"
+    )
+    source.add_argument(
+        "--html-file",
+        help="Filter saved HTML ('-' for stdin) instead of fetching; no browser is launched"
+    )
+    source.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a fetch4ai server with a warm browser that later invocations forward to"
+    )
     parser.add_argument(
         "--strategy",
         choices=["pruning", "bm25", "tags", "composite"],
@@ -384,12 +1000,16 @@ async def main():
     )
 
     # Pruning options
-    parser.add_argument("--threshold", type=float, default=0.48, help="Pruning threshold (0.0-1.0)")
+    parser.add_argument("--threshold", type=float,
+                        help=f"Pruning threshold, or composite block score threshold (0.0-1.0; default: "
+                             f"{DEFAULT_PRUNING_THRESHOLD} pruning, {DEFAULT_COMPOSITE_THRESHOLD} composite)")
     parser.add_argument("--min-words", type=int, default=5, help="Minimum words per block")
 
     # BM25 options
     parser.add_argument("--query", help="Search query for BM25 strategy")
     parser.add_argument("--bm25-threshold", type=float, default=0.8, help="BM25 relevance threshold (lower=more results)")
+    parser.add_argument("--bm25-weight", type=float, default=DEFAULT_BM25_WEIGHT,
+                        help=f"Composite: weight of query relevance vs block quality (0.0-1.0, default: {DEFAULT_BM25_WEIGHT})")
 
     # Tag options
     parser.add_argument("--excluded-tags", help="Comma-separated tags to exclude")
@@ -399,9 +1019,13 @@ async def main():
     parser.add_argument("--include-links", action="store_true", default=True, help="Include links")
     parser.add_argument("--include-images", action="store_true", default=False, help="Include images")
     parser.add_argument("--exclude-external-links", action="store_true", default=False, help="Exclude external links")
+    parser.add_argument("--max-links", type=int,
+                        help=f"Internal links listed per page (0 = all; default: {MAX_LINKS}, all with --depth)")
 
     # Session
     parser.add_argument("--session-id", help="Session ID for multi-page crawling")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"With --urls-file: pages fetched at once (default: {DEFAULT_CONCURRENCY})")
 
     # Output options
     parser.add_argument("--output", "-o", help="Output file (default: stdout)")
@@ -410,93 +1034,257 @@ async def main():
     parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
     parser.add_argument("--quiet", "-q", action="store_true", default=False,
                         help="Suppress crawl4ai status output")
-
-    args = parser.parse_args()
-
-    # Parse excluded tags
-    excluded_tags = None
-    if args.excluded_tags:
-        excluded_tags = [t.strip() for t in args.excluded_tags.split(",")]
-
-    # Execute appropriate strategy
-    async def run_strategy():
-        if args.strategy == "pruning":
-            return await fetch_with_pruning(
-                url=args.url,
-                threshold=args.threshold,
-                min_word_threshold=args.min_words,
-                word_count_threshold=args.word_count_threshold,
-                excluded_tags=excluded_tags,
-                include_links=args.include_links,
-                include_images=args.include_images,
-                exclude_external_links=args.exclude_external_links,
-                session_id=args.session_id,
-                timeout=args.timeout
-            )
-        elif args.strategy == "bm25":
-            return await fetch_with_bm25(
-                url=args.url,
-                query=args.query,
-                bm25_threshold=args.bm25_threshold,
-                word_count_threshold=args.word_count_threshold,
-                excluded_tags=excluded_tags,
-                include_links=args.include_links,
-                include_images=args.include_images,
-                exclude_external_links=args.exclude_external_links,
-                session_id=args.session_id,
-                timeout=args.timeout
-            )
-        elif args.strategy == "tags":
-            return await fetch_with_tags(
-                url=args.url,
-                excluded_tags=excluded_tags,
-                word_count_threshold=args.word_count_threshold,
-                include_links=args.include_links,
-                include_images=args.include_images,
-                exclude_external_links=args.exclude_external_links,
-                session_id=args.session_id,
-                timeout=args.timeout
-            )
-        elif args.strategy == "composite":
-            return await fetch_composite(
-                url=args.url,
-                query=args.query,
-                threshold=args.threshold,
-                bm25_threshold=args.bm25_threshold,
-                min_word_threshold=args.min_words,
-                word_count_threshold=args.word_count_threshold,
-                excluded_tags=excluded_tags,
-                include_links=args.include_links,
-                include_images=args.include_images,
-                exclude_external_links=args.exclude_external_links,
-                session_id=args.session_id,
-                timeout=args.timeout
-            )
+    parser.add_argument("--timings", action="store_true",
+                        help="Print time spent per phase (imports, crawl4ai import, browser launch, fetch) to stderr")
+
+    # Offline filtering options
+    parser.add_argument("--base-url", help="With --html-file: URL the HTML came from, for links")
+    parser.add_argument("--offline", action="store_true",
+                        help="With --url: filter the cached copy of the page (any age), never fetch")
+    parser.add_argument("--sweep", action="append", metavar="NAME=V1,V2,...",
+                        help="Filter once per combination of these values and report lengths "
+                             f"(repeatable; NAME: {', '.join(SWEEP_PARAMS)}); needs --url or --html-file")
+
+    # Deep crawl options
+    parser.add_argument("--depth", type=int,
+                        help="Crawl mode: follow internal links this many hops from --url / --urls-file seeds, output as NDJSON")
+    parser.add_argument("--max-pages", type=int, default=50, help="With --depth: pages fetched at most (default: 50)")
+    parser.add_argument("--per-host", type=int, default=2, help="With --depth: pages of one host loading at once (default: 2)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="With --depth: seconds between request starts to one host (default: 0.5)")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="With --depth: only follow URLs matching this pattern (repeatable)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB",
+                        help="With --depth: never follow URLs matching this pattern (repeatable)")
+
+    # Token budget options
+    parser.add_argument("--max-tokens", type=int,
+                        help="Keep the best-scoring content blocks that fit in about this many tokens, in page order")
+    parser.add_argument("--chunk-tokens", type=int,
+                        help="Split content into chunks of at most this many tokens (output as \"chunks\")")
+
+    # Deduplication options
+    parser.add_argument("--dedup", choices=DEDUP_SCOPES, default="off",
+                        help="Drop content blocks already output for another page: in this run (batch), "
+                             "or also in earlier runs (cache) (default: off)")
+    parser.add_argument("--dedup-collapse", action="store_true",
+                        help="With --dedup: leave a one-line note where duplicate blocks were dropped")
+
+    # Cache options
+    parser.add_argument("--cache", choices=CACHE_MODES, default="use",
+                        help="Page cache: use stored pages, refresh them, or bypass the cache (default: use)")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help=f"Seconds a cached page is used before revalidation (default: {DEFAULT_TTL})")
+    parser.add_argument("--cache-dir", help="Page cache directory (default: ~/.cache/fetch4ai/pages)")
+
+    # Server options
+    parser.add_argument("--socket", help="Server Unix socket (default: $FETCH4AI_SOCKET or ~/.cache/fetch4ai/fetch4ai.sock)")
+    parser.add_argument("--port", type=int,
+                        help="Serve on / connect to this localhost TCP port instead of a socket "
+                             "(unauthenticated: any local user can connect)")
+    parser.add_argument("--no-server", action="store_true", help="Always fetch in-process, even if a server is running")
+    parser.add_argument("--pool-size", type=int, default=4, help="With --serve: pages loading at once across clients (default: 4)")
+    parser.add_argument("--idle-timeout", type=float, default=1800,
+                        help="With --serve: exit after this many idle seconds (default: 1800)")
+
+    return parser
+
+
+def validate_args(args: argparse.Namespace) -> Optional[dict]:
+    """Check option values and combinations before anything is imported or launched.
+
+    Returns:
+        An error result for the first problem found, or None
+    """
+    def invalid(message: str, error_type: str = "invalid_argument") -> dict:
+        return {"success": False, "url": args.url, "error": message, "error_type": error_type}
+
+    if args.strategy in ("bm25", "composite") and not args.query and not args.serve:
+        return invalid(f"{'BM25' if args.strategy == 'bm25' else 'Composite'} strategy requires --query parameter",
+                       "missing_parameter")
+
+    ranges = (
+        ("threshold", 0, 1), ("bm25_weight", 0, 1), ("bm25_threshold", 0, None),
+        ("min_words", 0, None), ("word_count_threshold", 0, None), ("max_links", 0, None),
+        ("concurrency", 1, None), ("timeout", 1, None), ("cache_ttl", 0, None),
+        ("depth", 0, None), ("max_pages", 1, None), ("per_host", 1, None), ("delay", 0, None),
+        ("max_tokens", 1, None), ("chunk_tokens", 1, None),
+        ("pool_size", 1, None), ("idle_timeout", 1, None), ("port", 1, 65535),
+    )
+    for name, low, high in ranges:
+        value = getattr(args, name)
+        if value is not None and (value < low or (high is not None and value > high)):
+            bound = f"between {low} and {high}" if high is not None else f"at least {low}"
+            return invalid(f"--{name.replace('_', '-')} must be {bound}, got {value}")
+
+    if args.html_file or args.offline or args.sweep:
+        if args.urls_file or args.depth is not None:
+            return invalid("--offline and --sweep take --url or --html-file, without --depth")
+    if args.offline and not args.url:
+        return invalid("--offline requires --url")
+    if args.sweep:
+        try:
+            parse_sweep(args.sweep)
+        except ValueError as e:
+            return invalid(str(e))
+
+    for name, needs, flag in (("base_url", "html_file", "--html-file"), ("include", "depth", "--depth"),
+                              ("exclude", "depth", "--depth"), ("dedup_collapse", "dedup", "--dedup")):
+        if getattr(args, name) and getattr(args, needs) in (None, "off"):
+            return invalid(f"--{name.replace('_', '-')} requires {flag}")
+
+    for name in ("html_file", "urls_file"):
+        path = getattr(args, name)
+        if path and path != "-" and not os.path.isfile(path):
+            return invalid(f"--{name.replace('_', '-')}: no such file: {path}")
+    return None
+
+
+def main() -> None:
+    """Parse and validate arguments, then run; invalid invocations exit before any heavy work."""
+    TIMINGS.add("startup", time.perf_counter() - STARTED)
+    with TIMINGS.measure("parse_args"):
+        args = build_parser().parse_args()
+    with TIMINGS.measure("validate"):
+        error = validate_args(args)
 
     try:
+        if error is not None:
+            print(json.dumps(error, ensure_ascii=False))
+            sys.exit(2)
+        asyncio.run(run(args))
+    finally:
+        if args.timings:
+            print(json.dumps({"timings_ms": TIMINGS.report()}), file=sys.stderr)
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Serve, filter offline, crawl or fetch, as the validated arguments ask."""
+    excluded_tags = parse_excluded_tags(args.excluded_tags)
+
+    if args.serve:
+        from fetch4ai_server import serve
+
+        serving = serve(safe_fetch, open_crawler, request_args, args.socket, args.port, args.pool_size, args.idle_timeout)
         if args.quiet:
             with suppress_output():
-                result = await run_strategy()
+                result = await serving
         else:
-            result = await run_strategy()
-    except asyncio.TimeoutError:
-        result = {
-            "success": False,
-            "url": args.url,
-            "error": "Request timed out",
-            "error_type": "timeout"
-        }
-    except Exception as e:
-        result = {
-            "success": False,
-            "url": args.url,
-            "error": str(e),
-            "error_type": "unknown"
-        }
+            result = await serving
+        print(json.dumps(result, ensure_ascii=False))
+        return
 
-    # Format output
+    if args.html_file or args.offline or args.sweep:
+        try:
+            with TIMINGS.measure("fetch"):
+                if args.quiet:
+                    with suppress_output():
+                        result = await refilter(args, excluded_tags)
+                else:
+                    result = await refilter(args, excluded_tags)
+        except (OSError, ValueError) as e:
+            result = {"success": False, "url": args.url, "error": str(e), "error_type": "invalid_argument"}
+        except Exception as e:
+            result = {"success": False, "url": args.url, "error": str(e), "error_type": "unknown"}
+        with TIMINGS.measure("output"):
+            if args.sweep:
+                # A sweep report has no single content to print as markdown
+                args.format = "json"
+            else:
+                result = budget_output(result, args)
+            write_output(result, args)
+        return
+
+    urls = read_urls(args.urls_file) if args.urls_file else [args.url]
+    # A session is a single browser tab, so its pages must load one at a time
+    concurrency = 1 if args.session_id else args.concurrency
+    crawling = args.depth is not None
+    if crawling and args.max_links is None:
+        args.max_links = 0  # Follow every internal link, not just the first 50
+    streaming = bool(args.urls_file) or crawling
+
+    if streaming:
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        results = None
+
+        def emit(result: dict) -> None:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    else:
+        results = []
+        emit = results.append
+
+    deduplicator = None
+    if args.dedup != "off":
+        index_path = Path(args.cache_dir or DEFAULT_CACHE_DIR).expanduser() / INDEX_FILE if args.dedup == "cache" else None
+        deduplicator = Deduplicator(index_path, collapse=args.dedup_collapse)
+    write = emit
+
+    def emit(result: dict) -> None:
+        if deduplicator is not None:
+            deduplicator.apply(result)
+        write(budget_output(result, args))
+
+    summary = {"total": len(urls), "succeeded": 0}
+    if crawling:
+        from deep_crawl import crawl_site
+        load_crawl4ai()  # Not inside crawl_site's tasks, where its SystemExit would be lost
+        fetch = partial(crawl_site, fetch_page=safe_fetch, open_browser=SharedCrawler)
+    else:
+        fetch = run_fetch
+    try:
+        with TIMINGS.measure("fetch"):
+            if args.quiet:
+                with suppress_output():
+                    summary = await fetch(urls, args, emit, excluded_tags, concurrency)
+            else:
+                summary = await fetch(urls, args, emit, excluded_tags, concurrency)
+    except Exception as e:
+        # Browser failed to launch or shut down
+        emit({"success": False, "url": args.url, "error": str(e), "error_type": "unknown"})
+    finally:
+        if streaming and args.output:
+            out.close()
+        if deduplicator is not None:
+            deduplicator.save()
+
+    if streaming:
+        if args.output:
+            saved = f", ~{deduplicator.stats['tokens_saved']} tokens saved by dedup" if deduplicator else ""
+            print(f"{summary['succeeded']} of {summary['total']} {'pages' if crawling else 'URLs'} saved to {args.output}{saved}")
+        return
+
+    with TIMINGS.measure("output"):
+        write_output(results[0], args)
+
+
+def budget_output(result: dict, args: argparse.Namespace) -> dict:
+    """Apply --max-tokens packing and --chunk-tokens splitting to a result's content."""
+    if not result.get("success") or not result.get("content"):
+        return result
+
+    if args.max_tokens:
+        # Rank blocks the way the strategy does: relevance for bm25, quality for pruning and tags
+        weight = {"bm25": 1.0, "composite": args.bm25_weight}.get(args.strategy, 0.0)
+        packed = pack_blocks(result["content"], args.max_tokens, args.query if weight else None, weight)
+        result["content"] = packed.pop("content")
+        result.setdefault("stats", {})["budget"] = {"max_tokens": args.max_tokens, **packed}
+        result.setdefault("metadata", {})["word_count"] = len(result["content"].split())
+
+    if args.chunk_tokens:
+        result["chunks"] = chunk_markdown(result.pop("content"), args.chunk_tokens)
+    return result
+
+
+def write_output(result: dict, args: argparse.Namespace) -> None:
+    """Print or save a single result in the requested --format."""
     if args.format in ("markdown", "md"):
-        if result.get("success"):
+        if result.get("success") and "chunks" in result:
+            count = len(result["chunks"])
+            output_text = "\n\n".join(
+                f"<!-- chunk {chunk['index'] + 1}/{count} -->\n\n{chunk['content']}" for chunk in result["chunks"]
+            )
+        elif result.get("success"):
             output_text = result.get("content", "")
         else:
             output_text = f"# Error\n\n{result.get('error', 'Unknown error')}"
@@ -512,4 +1300,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
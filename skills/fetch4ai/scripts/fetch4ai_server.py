@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+fetch4ai_server.py - Persistent fetch4ai daemon with a warm browser
+
+Keeps crawl4ai imported and one headless browser running, so fetches from
+many short-lived fetch4ai.py invocations skip the import and browser launch.
+Listens on a Unix socket (default) or a localhost TCP port and speaks
+newline-delimited JSON:
+
+  request:   {"op": "fetch", "urls": [...], "options": {...}, "concurrency": 4}
+  responses: one fetch4ai result per line in completion order, then
+             {"done": true, "total": N, "succeeded": N, "failed": N}
+
+  {"op": "ping"}      -> {"ok": true, "pid": ..., "uptime": ..., "fetched": ...}
+  {"op": "shutdown"}  -> {"ok": true}, then the server exits
+
+At most --pool-size pages load at once across all clients. The server exits
+after --idle-timeout seconds without requests.
+
+The Unix socket is only accessible to the user running the server. TCP mode
+(--port) has no authentication: any local user can send requests. There the
+server ignores a client's cache_dir and uses the default cache directory, so
+requests cannot make it write files elsewhere.
+
+Fetching, browser and option parsing are passed in by fetch4ai.py rather
+than imported from it, since importing fetch4ai from the running script
+would load a second copy of it.
+
+Usage:
+  python fetch4ai.py --serve -q &
+  python fetch4ai.py --url "https://example.com"          # forwarded to the server
+  python fetch4ai.py --serve --port 8765 --pool-size 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, AsyncContextManager, Awaitable, Callable, List, Optional, Tuple
+
+
+DEFAULT_SOCKET = Path.home() / ".cache" / "fetch4ai" / "fetch4ai.sock"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 1800
+CONNECT_TIMEOUT = 0.5
+STREAM_LIMIT = 16 * 1024 * 1024  # Longest request or response line
+
+
+def socket_path(path: Optional[str] = None) -> Path:
+    """Socket to serve on or connect to: explicit path, $FETCH4AI_SOCKET, or the default."""
+    return Path(path or os.environ.get("FETCH4AI_SOCKET") or DEFAULT_SOCKET).expanduser()
+
+
+# Fetches one page: (url, args, excluded_tags, crawler) -> result, as fetch4ai.safe_fetch
+FetchPage = Callable[[str, argparse.Namespace, Optional[list], Any], Awaitable[dict]]
+# Turns a request's options into (args, excluded_tags), as fetch4ai.request_args
+ParseOptions = Callable[[dict], Tuple[argparse.Namespace, Optional[list]]]
+
+
+class FetchServer:
+    """Serves fetch requests from one long-lived crawler."""
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        open_browser: Callable[[], AsyncContextManager[Any]],
+        parse_options: ParseOptions,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ):
+        """
+        Args:
+            fetch_page: Fetches one page, reporting errors as results
+            open_browser: Returns an async context manager yielding the crawler
+            parse_options: Turns request options into (args, excluded_tags)
+            pool_size: Pages loading at once across all clients
+            idle_timeout: Seconds without requests before the server exits
+        """
+        self.fetch_page = fetch_page
+        self.open_browser = open_browser
+        self.parse_options = parse_options
+        self.pool = asyncio.Semaphore(max(1, pool_size))
+        self.idle_timeout = idle_timeout
+        self.crawler = None
+        self.started_at = time.monotonic()
+        self.last_request = self.started_at
+        self.active = 0
+        self.fetched = 0
+        self.stopping = asyncio.Event()
+        self.client_cache_dirs = True  # Accept a client's cache_dir (Unix socket only)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        self.active += 1
+        self.last_request = time.monotonic()
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+            op = request.get("op", "fetch")
+
+            if op == "ping":
+                await self._send(writer, {
+                    "ok": True,
+                    "pid": os.getpid(),
+                    "uptime": round(time.monotonic() - self.started_at, 1),
+                    "fetched": self.fetched,
+                })
+            elif op == "shutdown":
+                await self._send(writer, {"ok": True})
+                self.stopping.set()
+            elif op == "fetch":
+                await self._fetch(request, writer)
+            else:
+                await self._send(writer, {"success": False, "error": f"Unknown op: {op}", "error_type": "request"})
+        except (json.JSONDecodeError, ValueError) as e:
+            await self._send(writer, {"success": False, "error": f"Bad request: {e}", "error_type": "request"})
+        except ConnectionError:
+            pass  # Client went away; its pages are abandoned
+        finally:
+            self.active -= 1
+            self.last_request = time.monotonic()
+            writer.close()
+
+    async def _fetch(self, request: dict, writer: asyncio.StreamWriter) -> None:
+        options = dict(request.get("options") or {})
+        cache_dir = options.get("cache_dir")
+        if cache_dir is not None and not (self.client_cache_dirs and os.path.isabs(str(cache_dir))):
+            # Unauthenticated TCP clients, and relative paths that would resolve
+            # against the server's cwd, get the server's own cache directory
+            options.pop("cache_dir")
+        args, excluded_tags = self.parse_options(options)
+        limit = asyncio.Semaphore(max(1, int(request.get("concurrency") or DEFAULT_POOL_SIZE)))
+        urls = request.get("urls") or []
+        summary = {"done": True, "total": len(urls), "succeeded": 0, "failed": 0}
+
+        async def fetch_one(url: str) -> dict:
+            async with limit, self.pool:
+                return await self.fetch_page(url, args, excluded_tags, self.crawler)
+
+        for task in asyncio.as_completed([fetch_one(url) for url in urls]):
+            result = await task
+            self.fetched += 1
+            summary["succeeded" if result.get("success") else "failed"] += 1
+            await self._send(writer, result)
+        await self._send(writer, summary)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+        writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def _watch_idle(self) -> None:
+        while not self.stopping.is_set():
+            await asyncio.sleep(min(30.0, self.idle_timeout))
+            if not self.active and time.monotonic() - self.last_request >= self.idle_timeout:
+                self.stopping.set()
+
+    async def run(self, path: Optional[Path] = None, port: Optional[int] = None) -> None:
+        """Launch the browser, then serve until shutdown or idle timeout."""
+        async with self.open_browser() as crawler:
+            self.crawler = crawler
+            self.client_cache_dirs = port is None
+            if port is not None:
+                server = await asyncio.start_server(self.handle, "127.0.0.1", port, limit=STREAM_LIMIT)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if path.exists():
+                    path.unlink()  # Stale socket; callers check that no server answers first
+                old_umask = os.umask(0o177)  # Socket readable by this user only
+                try:
+                    server = await asyncio.start_unix_server(self.handle, str(path), limit=STREAM_LIMIT)
+                finally:
+                    os.umask(old_umask)
+
+            watchdog = asyncio.ensure_future(self._watch_idle())
+            try:
+                async with server:
+                    await self.stopping.wait()
+            finally:
+                watchdog.cancel()
+                if port is None and path.exists():
+                    path.unlink()
+
+
+async def open_connection(path: Optional[Path] = None, port: Optional[int] = None):
+    """Connect to a running server, or return None if none is listening."""
+    try:
+        if port is not None:
+            connect = asyncio.open_connection("127.0.0.1", port, limit=STREAM_LIMIT)
+        else:
+            if not hasattr(socket, "AF_UNIX") or not path.exists():
+                return None
+            connect = asyncio.open_unix_connection(str(path), limit=STREAM_LIMIT)
+        return await asyncio.wait_for(connect, CONNECT_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+
+async def call(request: dict, path: Optional[Path] = None, port: Optional[int] = None) -> Optional[dict]:
+    """Send a single-response request (ping, shutdown); None if no server is running."""
+    connection = await open_connection(path, port)
+    if connection is None:
+        return None
+    reader, writer = connection
+    try:
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+        return json.loads(line) if line else None
+    finally:
+        writer.close()
+
+
+async def fetch_via_server(
+    urls: List[str],
+    options: dict,
+    emit: Callable[[dict], None],
+    concurrency: int,
+    path: Optional[Path] = None,
+    port: Optional[int] = None,
+) -> Optional[List[str]]:
+    """Forward a fetch to a running server, emitting results as they stream back.
+
+    Args:
+        options: Fetch options as JSON values (fetch4ai.fetch_options)
+
+    Returns:
+        URLs the server did not answer (empty when all were served; all of
+        them if the connection dropped early), or None if no server is running
+    """
+    connection = await open_connection(path, port)
+    if connection is None:
+        return None
+    reader, writer = connection
+    pending = list(urls)
+    try:
+        writer.write(json.dumps({
+            "op": "fetch",
+            "urls": urls,
+            "options": options,
+            "concurrency": concurrency,
+        }, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break  # Server went away; the caller fetches the rest itself
+            message = json.loads(line)
+            if message.get("done"):
+                break
+            if message.get("url") in pending:
+                pending.remove(message["url"])
+            emit(message)
+    except (OSError, ValueError):
+        pass
+    finally:
+        writer.close()
+    return pending
+
+
+async def serve(
+    fetch_page: FetchPage,
+    open_browser: Callable[[], AsyncContextManager[Any]],
+    parse_options: ParseOptions,
+    path: Optional[str] = None,
+    port: Optional[int] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> dict:
+    """Run a server in the foreground unless one is already listening.
+
+    fetch_page, open_browser and parse_options are passed to FetchServer.
+
+    Returns:
+        {"success", "fetched"} once the server stops, or an error if another
+        server already answers on the socket or port
+    """
+    resolved = None if port is not None else socket_path(path)
+    running = await call({"op": "ping"}, resolved, port)
+    if running:
+        return {
+            "success": False,
+            "error": f"A fetch4ai server is already running (pid {running.get('pid')})",
+            "error_type": "server_running",
+        }
+
+    server = FetchServer(fetch_page, open_browser, parse_options, pool_size=pool_size, idle_timeout=idle_timeout)
+    await server.run(resolved, port)
+    return {"success": True, "fetched": server.fetched}
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+fetch_cache.py - On-disk page cache for fetch4ai
+
+Stores the browser-rendered HTML of each fetched page, with its ETag and
+Last-Modified headers, plus the filtered results produced from it. Entries
+are keyed by URL and the browser settings that affect rendering, so a
+repeated fetch can:
+
+- return the stored result when the same filter options were used before
+- re-run a different strategy or threshold on the stored HTML, with no
+  network or browser work
+- after the TTL, revalidate with a conditional GET (If-None-Match /
+  If-Modified-Since) and keep using the stored HTML on 304 Not Modified
+
+Modes (--cache):
+  use      read and write the cache (default)
+  refresh  always fetch, then overwrite the entry
+  bypass   neither read nor write
+
+Usage:
+  from fetch_cache import PageCache
+  cache = PageCache(mode="use", ttl=600)
+  entry = cache.lookup(url)
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+CACHE_MODES = ("use", "refresh", "bypass")
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "fetch4ai" / "pages"
+DEFAULT_TTL = 600  # Short: the cache is on by default, so stale content must not linger
+MAX_FILTERED = 8  # Filtered results kept per page
+REVALIDATE_TIMEOUT = 10
+USER_AGENT = "fetch4ai-cache/1.0"
+
+
+def _atomic_write(path: Path, data: Union[str, bytes]) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(tmp, mode, **({} if isinstance(data, bytes) else {"encoding": "utf-8"})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _header(headers: Optional[Dict[str, Any]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup."""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def options_key(options: Dict[str, Any]) -> str:
+    """Stable key for a set of filter options."""
+    return hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class PageCache:
+    """Rendered-HTML and filtered-result cache in a directory of JSON/HTML files."""
+
+    def __init__(
+        self,
+        mode: str = "use",
+        ttl: float = DEFAULT_TTL,
+        root: Optional[Union[str, Path]] = None,
+        render: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            mode: One of CACHE_MODES
+            ttl: Seconds an entry is used without revalidation
+            root: Cache directory (default: ~/.cache/fetch4ai/pages)
+            render: Browser settings that affect the rendered HTML, part of the key
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode} (expected one of {', '.join(CACHE_MODES)})")
+        self.mode = mode
+        self.ttl = ttl
+        self.root = Path(root).expanduser() if root else DEFAULT_CACHE_DIR
+        self.render = render or {}
+
+    @property
+    def reads(self) -> bool:
+        return self.mode == "use"
+
+    @property
+    def writes(self) -> bool:
+        return self.mode != "bypass"
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(
+            json.dumps({"url": url, "render": self.render}, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        directory = self.root / key[:2]
+        return directory / f"{key}.json", directory / f"{key}.html"
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for url (without its HTML), or None."""
+        meta_path, html_path = self._paths(url)
+        if not self.reads or not meta_path.exists() or not html_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("validated_at", 0) < self.ttl
+
+    def read_html(self, entry: Dict[str, Any]) -> str:
+        _, html_path = self._paths(entry["url"])
+        with open(html_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def revalidate(self, entry: Dict[str, Any]) -> bool:
+        """Conditional GET for a stale entry; True (and re-stamped) on 304 Not Modified.
+
+        Blocking; entries without ETag or Last-Modified cannot be revalidated.
+        """
+        # Imported here: urllib.request (via http.client) is a noticeable share of fetch4ai's startup
+        import urllib.error
+        import urllib.request
+
+        headers = {"User-Agent": USER_AGENT}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if len(headers) == 1:
+            return False
+
+        request = urllib.request.Request(entry["url"], headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=REVALIDATE_TIMEOUT) as response:
+                if response.status != 304:
+                    return False
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                return False
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+        entry["validated_at"] = time.time()
+        self._write_meta(entry)
+        return True
+
+    def store(
+        self,
+        url: str,
+        html: str,
+        headers: Optional[Dict[str, Any]] = None,
+        status_code: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Save freshly rendered HTML, dropping filtered results of the old version."""
+        now = time.time()
+        entry = {
+            "url": url,
+            "fetched_at": now,
+            "validated_at": now,
+            "status_code": status_code,
+            "etag": _header(headers, "etag"),
+            "last_modified": _header(headers, "last-modified"),
+            "filtered": {},
+        }
+        if not self.writes:
+            return entry
+
+        meta_path, html_path = self._paths(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(html_path, html)
+        self._write_meta(entry)
+        return entry
+
+    def get_filtered(self, url: str, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result for these filter options if the page is still fresh."""
+        entry = self.lookup(url)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.get("filtered", {}).get(key)
+
+    def store_filtered(self, url: str, key: str, result: Dict[str, Any]) -> None:
+        """Remember a filtered result for the current version of the page."""
+        meta_path, _ = self._paths(url)
+        if not self.writes or not meta_path.exists():
+            return
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        filtered = entry.setdefault("filtered", {})
+        filtered.pop(key, None)
+        filtered[key] = result
+        while len(filtered) > MAX_FILTERED:
+            filtered.pop(next(iter(filtered)))
+        self._write_meta(entry)
+
+    def _write_meta(self, entry: Dict[str, Any]) -> None:
+        meta_path, _ = self._paths(entry["url"])
+        _atomic_write(meta_path, json.dumps(entry, ensure_ascii=False))
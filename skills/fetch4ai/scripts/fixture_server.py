@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Fixture HTTP Server
+
+Serves a corpus of saved HTML pages on localhost, so fetch4ai can be run and
+benchmarked without live websites. Every *.html file in the corpus directory
+is served at /<name>.html, and / lists them all as links. Responses carry
+ETag and Last-Modified headers and answer conditional requests with 304, so
+page cache revalidation can be exercised too.
+
+Without a corpus, make_corpus() writes deterministic synthetic pages: a
+navigation bar, a sidebar of links to other pages, an article of headed
+sections (paragraphs, a list, a table, a code block) on a few API topics,
+and the same cookie notice and footer on every page, like a documentation
+site.
+
+Usage:
+    python fixture_server.py --generate 50 --corpus /tmp/corpus --port 8766
+    python fetch4ai.py --url http://127.0.0.1:8766/page-001.html --no-server
+
+    # In-process (see benchmark.py)
+    from fixture_server import FixtureServer, make_corpus
+    with FixtureServer(make_corpus(Path("corpus"), 50)) as server:
+        urls = server.page_urls()
+"""
+
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+TOPICS = {
+    "Rate limits": "requests per minute are capped per organization and excess calls receive status 429 with a retry after header",
+    "Authentication": "every request sends an API key in the authorization header and keys can be rotated from the dashboard",
+    "Pagination": "list endpoints return a cursor and the next page is fetched by passing that cursor back until it is empty",
+    "Caching": "responses include an etag so clients can revalidate with if none match and skip unchanged payloads",
+    "Webhooks": "events are delivered with a signature header and failed deliveries are retried with exponential backoff",
+    "Errors": "error bodies contain a machine readable code a human readable message and the request id for support",
+}
+FILLER = (
+    "This section explains the behaviour in detail with examples for common client libraries. "
+    "Operators should review these settings when deploying to production environments. "
+    "The defaults are chosen to be safe for most workloads and can be tuned per project. "
+)
+COOKIE_NOTICE = "We use cookies to improve your experience on our documentation site. By continuing to browse you accept our cookie policy."
+FOOTER = "Copyright Example Corp. All rights reserved. Terms of service, privacy policy, status page, contact sales and support."
+
+
+def make_page(index: int, pages: int, rng: random.Random) -> str:
+    """One synthetic documentation page linking to its neighbours."""
+    topics = rng.sample(sorted(TOPICS), k=rng.randint(3, 5))
+    nav = "".join(f'<a href="/page-{rng.randrange(pages) + 1:03d}.html">Section {i + 1}</a> ' for i in range(8))
+    sidebar = "".join(
+        f'<li><a href="/page-{(index + step) % pages + 1:03d}.html">{topic} guide</a></li>'
+        for step, topic in enumerate(rng.sample(sorted(TOPICS), k=len(TOPICS)), start=1)
+    )
+
+    sections = []
+    for topic in topics:
+        paragraphs = "".join(
+            f"<p>{TOPICS[topic].capitalize()}. {FILLER * rng.randint(1, 3)}</p>" for _ in range(rng.randint(1, 3))
+        )
+        sections.append(
+            f"<h2>{topic}</h2>{paragraphs}"
+            f"<ul><li>Applies to version {index % 4 + 1}</li><li>Default: {rng.randint(10, 900)}</li></ul>"
+            f"<table><tr><th>Setting</th><th>Value</th></tr><tr><td>{topic.lower()}</td><td>{rng.randint(1, 99)}</td></tr></table>"
+            f"<pre><code>client.configure({topic.lower().replace(' ', '_')}={rng.randint(1, 60)})</code></pre>"
+        )
+
+    return (
+        f"<!DOCTYPE html><html><head><title>Guide {index + 1}: {topics[0]}</title></head><body>"
+        f"<header><nav>{nav}</nav></header>"
+        f'<div class="cookie-banner"><p>{COOKIE_NOTICE}</p></div>'
+        f"<aside><ul>{sidebar}</ul></aside>"
+        f"<main><article><h1>Guide {index + 1}: {' and '.join(topics[:2])}</h1>{''.join(sections)}</article></main>"
+        f"<footer><p>{FOOTER}</p></footer>"
+        "</body></html>"
+    )
+
+
+def make_corpus(directory: Path, pages: int = 50, seed: int = 0) -> Path:
+    """Write pages synthetic pages (page-001.html, ...) into directory."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for index in range(pages):
+        (directory / f"page-{index + 1:03d}.html").write_text(make_page(index, pages, rng), encoding="utf-8")
+    return directory
+
+
+class FixtureServer:
+    """Threaded static server for a corpus directory. Usable as a context manager."""
+
+    def __init__(self, corpus: Path, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        Args:
+            corpus: Directory of *.html pages
+            host, port: Bind address (port 0 picks a free port)
+            latency: Seconds added to every response
+        """
+        self.latency = latency
+        self.pages: Dict[str, bytes] = {
+            f"/{path.name}": path.read_bytes() for path in sorted(Path(corpus).glob("*.html"))
+        }
+        self.etags = {name: f'"{hashlib.sha1(body).hexdigest()[:16]}"' for name, body in self.pages.items()}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+        self.requested: Dict[str, float] = {}  # Path -> time.perf_counter() of its latest request
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_urls(self) -> List[str]:
+        return [f"{self.base_url}{name}" for name in self.pages]
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def index_page(self) -> bytes:
+        links = "".join(f'<li><a href="{name}">{name[1:]}</a></li>' for name in self.pages)
+        return f"<!DOCTYPE html><html><head><title>Corpus</title></head><body><ul>{links}</ul></body></html>".encode()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                path = self.path.split("?", 1)[0].split("#", 1)[0]
+                with server.lock:
+                    server.stats["requests"] += 1
+                    server.requested[path] = time.perf_counter()
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if path == "/":
+                    body, etag = server.index_page(), None
+                elif path in server.pages:
+                    body, etag = server.pages[path], server.etags[path]
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if etag and self.headers.get("If-None-Match") == etag:
+                    with server.lock:
+                        server.stats["not_modified"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Last-Modified", server.last_modified)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.stats["bytes"] += len(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a corpus of HTML pages on localhost")
+    parser.add_argument("--corpus", required=True, help="Directory of *.html pages")
+    parser.add_argument("--generate", type=int, metavar="N", help="First write N synthetic pages into --corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --generate (default: 0)")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8766, help="Bind port (default: 8766)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+
+    args = parser.parse_args()
+
+    if args.generate:
+        make_corpus(Path(args.corpus), args.generate, args.seed)
+    fixtures = FixtureServer(Path(args.corpus), host=args.host, port=args.port, latency=args.latency)
+    print(f"Serving {len(fixtures.pages)} pages on {fixtures.base_url}/")
+    try:
+        fixtures.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fixtures.httpd.server_close()
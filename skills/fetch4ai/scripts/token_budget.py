@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+token_budget.py - Token-budgeted and chunked output for fetch4ai
+
+Instead of truncating a page's markdown at N characters, which keeps the top
+of the page whatever it holds, --max-tokens ranks the page's blocks by the
+active strategy's score and packs the best ones that fit, then restores
+document order:
+
+- pruning, tags: block quality (text and link density, type, length)
+- bm25: BM25 relevance to --query, quality breaking ties
+- composite: quality and relevance weighted by --bm25-weight
+
+Kept blocks bring their section headings along, and the headings count
+against the budget. --chunk-tokens splits long content into chunks of at
+most N tokens at block boundaries, each labelled with its heading trail.
+Token counts come from block_scoring.estimate_tokens, a character-based
+estimate that needs no tokenizer.
+
+Usage:
+  from token_budget import pack_blocks, chunk_markdown
+  packed = pack_blocks(markdown, 2000, query="rate limits", bm25_weight=1.0)
+  chunks = chunk_markdown(markdown, 1000)
+"""
+
+from typing import Dict, List, Optional
+
+from block_scoring import QUALITY_FLOOR, Block, estimate_tokens, parse_blocks, score_blocks
+
+
+SEPARATOR_TOKENS = 1  # Blank line between blocks
+TRUNCATION_MARK = " …"
+
+
+def heading_trails(blocks: List[Block]) -> List[List[int]]:
+    """Indexes of the headings each block sits under, outermost first."""
+    trail: List[Block] = []
+    trails = []
+    for block in blocks:
+        if block.kind == "heading":
+            trail = [h for h in trail if h.level < block.level]
+            trails.append([h.index for h in trail])
+            trail.append(block)
+        else:
+            trails.append([h.index for h in trail])
+    return trails
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text, cut at a word boundary, within max_tokens (with the mark)."""
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARK)
+    if budget <= 0:
+        return ""
+    low, high = 0, len(text)
+    while low < high:  # Longest prefix whose estimate fits
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+    if low < len(text) and " " in prefix:
+        prefix = prefix.rsplit(" ", 1)[0]
+    return prefix.rstrip() + TRUNCATION_MARK if prefix.strip() else ""
+
+
+def pack_blocks(
+    markdown: str,
+    max_tokens: int,
+    query: Optional[str] = None,
+    bm25_weight: float = 0.0,
+) -> dict:
+    """Best-scoring blocks that fit in max_tokens, in document order.
+
+    Blocks are taken greedily by descending score (relevance with a query
+    and bm25_weight > 0, else quality), blocks under QUALITY_FLOOR last. A
+    block that does not fit, with its not yet included headings, is skipped
+    in favour of smaller ones. If not even one block fits, the best block is
+    cut at a word boundary.
+
+    Returns:
+        {"content", "tokens", "blocks_total", "blocks_kept", "truncated"}
+    """
+    blocks = score_blocks(parse_blocks(markdown), query, bm25_weight)
+    costs = [estimate_tokens(block.text) + SEPARATOR_TOKENS for block in blocks]
+    trails = heading_trails(blocks)
+    content_blocks = [block for block in blocks if block.kind != "heading"] or blocks
+    # Link lists and other low-quality blocks go last, however relevant
+    ranked = sorted(content_blocks, key=lambda b: (b.quality < QUALITY_FLOOR, -b.score, -b.quality, b.index))
+
+    kept = set()
+    used = 0
+    for block in ranked:
+        needed = [i for i in trails[block.index] + [block.index] if i not in kept]
+        cost = sum(costs[i] for i in needed)
+        if used + cost <= max_tokens:
+            kept.update(needed)
+            used += cost
+
+    truncated = False
+    if not kept and ranked:
+        best = ranked[0]
+        text = truncate_to_tokens(best.text, max_tokens)
+        truncated = bool(text)
+        content = text
+        blocks_kept = 1 if text else 0
+    else:
+        content = "\n\n".join(block.text for block in blocks if block.index in kept)
+        blocks_kept = sum(1 for block in blocks if block.index in kept and block.kind != "heading")
+
+    return {
+        "content": content,
+        "tokens": estimate_tokens(content),
+        "blocks_total": len(content_blocks) if blocks else 0,
+        "blocks_kept": blocks_kept,
+        "truncated": truncated,
+    }
+
+
+def chunk_markdown(markdown: str, chunk_tokens: int) -> List[Dict]:
+    """Split markdown into chunks of at most chunk_tokens, at block boundaries.
+
+    A heading starts a new chunk when the current one is over half full, so
+    sections stay together where they can. Blocks longer than a chunk are
+    split at line boundaries, and lines longer than a chunk at words.
+
+    Returns:
+        [{"index", "tokens", "headings", "content"}], where headings is the
+        heading trail in effect at the start of the chunk
+    """
+    blocks = parse_blocks(markdown)
+    trails = heading_trails(blocks)
+    chunks: List[Dict] = []
+    parts: List[str] = []
+    used = 0
+    start_trail: List[str] = []
+
+    def flush() -> None:
+        nonlocal parts, used
+        if parts:
+            content = "\n\n".join(parts)
+            chunks.append({
+                "index": len(chunks),
+                "tokens": estimate_tokens(content),
+                "headings": start_trail,
+                "content": content,
+            })
+        parts, used = [], 0
+
+    for block, trail in zip(blocks, trails):
+        trail_text = [blocks[i].text.lstrip("#").strip() for i in trail]
+        pieces = [block.text] if estimate_tokens(block.text) <= chunk_tokens else _split_block(block.text, chunk_tokens)
+        for piece in pieces:
+            cost = estimate_tokens(piece) + SEPARATOR_TOKENS
+            if parts and (used + cost > chunk_tokens or (block.kind == "heading" and used > chunk_tokens / 2)):
+                flush()
+            if not parts:
+                start_trail = trail_text
+            parts.append(piece)
+            used += cost
+    flush()
+    return chunks
+
+
+def _split_block(text: str, chunk_tokens: int) -> List[str]:
+    """Pieces of an oversized block, each within chunk_tokens."""
+    pieces: List[str] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        while estimate_tokens(line) > chunk_tokens:
+            head = truncate_to_tokens(line, chunk_tokens)[:-len(TRUNCATION_MARK)] or line[:chunk_tokens]
+            if current:
+                pieces.append("\n".join(current))
+                current = []
+            pieces.append(head)
+            line = line[len(head):].lstrip()
+        if current and estimate_tokens("\n".join(current + [line])) > chunk_tokens:
+            pieces.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
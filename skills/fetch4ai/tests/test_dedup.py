@@ -0,0 +1,106 @@
+"""Tests for dedup.py (run with: python -m pytest skills/fetch4ai/tests)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import dedup  # noqa: E402
+from dedup import BlockIndex, Deduplicator  # noqa: E402
+
+PARAGRAPH = (
+    "The scheduler keeps a frontier of pending links ordered by depth and score, launches up to "
+    "the configured number of fetches at once, waits politely between requests to the same host, "
+    "records every failure with its reason, follows redirects only within the allowed domains, "
+    "and stops when the page budget is spent or nothing is left to visit in the frontier."
+)
+
+
+def page(url: str, *blocks: str) -> dict:
+    return {"success": True, "url": url, "content": "\n\n".join(blocks)}
+
+
+def test_footer_with_one_changed_word_is_dropped():
+    dedup_ = Deduplicator()
+    dedup_.apply(page("https://a.test/1", "# One", "Widgets have many uses in modern industry.",
+                      "Copyright 2024 Example Corp. All rights reserved."))
+    result = dedup_.apply(page("https://a.test/2", "# Two", "Sprockets and gears are assorted machine parts.",
+                               "Copyright 2025 Example Corp. All rights reserved."))
+
+    assert "Copyright" not in result["content"]
+    assert "Sprockets" in result["content"]
+    assert result["stats"]["dedup"]["blocks_dropped"] == 1
+
+
+def test_long_block_with_one_changed_word_is_dropped():
+    dedup_ = Deduplicator()
+    dedup_.apply(page("https://a.test/1", PARAGRAPH))
+    result = dedup_.apply(page("https://a.test/2", PARAGRAPH.replace("politely", "briefly"), "Something else entirely."))
+
+    assert result["content"] == "Something else entirely."
+
+
+def test_unrelated_and_short_blocks_are_kept():
+    dedup_ = Deduplicator()
+    dedup_.apply(page("https://a.test/1", "# Install", "Read more", PARAGRAPH))
+    second = page("https://a.test/2", "# Install", "Read more",
+                  "Download the archive, unpack it next to the project and run the setup script once.")
+    content = second["content"]
+
+    assert dedup_.apply(second)["content"] == content
+
+
+def test_refetched_page_keeps_its_blocks_and_does_not_grow_the_index():
+    dedup_ = Deduplicator()
+    first = page("https://a.test/1", PARAGRAPH, "Copyright 2024 Example Corp. All rights reserved.")
+    content = first["content"]
+    dedup_.apply(first)
+    stored = len(dedup_.index)
+
+    for _ in range(3):
+        assert dedup_.apply(page("https://a.test/1", content))["content"] == content
+    assert len(dedup_.index) == stored
+
+
+def test_collapse_notes_the_source_page():
+    dedup_ = Deduplicator(collapse=True)
+    dedup_.apply(page("https://a.test/1", PARAGRAPH))
+    result = dedup_.apply(page("https://a.test/2", PARAGRAPH))
+
+    assert result["content"] == "[duplicate content omitted, see https://a.test/1]"
+    assert result["duplicate_of"] == "https://a.test/1"
+
+
+def test_cache_scope_persists_across_runs(tmp_path):
+    index_path = tmp_path / "dedup-index.bin"
+    first = Deduplicator(index_path)
+    first.apply(page("https://a.test/1", PARAGRAPH, "Copyright 2024 Example Corp. All rights reserved."))
+    first.save()
+
+    second = Deduplicator(index_path)
+    result = second.apply(page("https://a.test/2", PARAGRAPH, "Copyright 2026 Example Corp. All rights reserved."))
+
+    assert result["stats"]["dedup"]["blocks_dropped"] == 2
+    assert len(second.index) == len(first.index)
+
+
+def test_save_keeps_only_the_newest_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "MAX_STORED", 2)
+    index = BlockIndex()
+    blocks = [[f"word{n}x{i}" for i in range(8)] for n in range(4)]
+    for n, tokens in enumerate(blocks):
+        index.add(tokens, n, dedup.exact_hash(tokens))
+    index.save(tmp_path / "index.bin")
+
+    loaded = BlockIndex.load(tmp_path / "index.bin")
+
+    assert len(loaded) == 2
+    assert loaded.find(blocks[3], 99)[0] == 3
+    assert loaded.find(blocks[0], 99)[0] is None
+
+
+def test_unreadable_index_file_gives_an_empty_index(tmp_path):
+    path = tmp_path / "dedup-index.bin"
+    path.write_bytes(b"F4AIDD1\n" + b"\0" * 64)
+
+    assert len(BlockIndex.load(path)) == 0
@@ -0,0 +1,144 @@
+"""Tests for deep_crawl.py (run with: python -m pytest skills/fetch4ai/tests)."""
+
+import argparse
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from deep_crawl import Frontier, HostLimiter, crawl_site, normalize_url  # noqa: E402
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Docs.Example.COM:443/Guide/", "https://docs.example.com/Guide/"),
+    ("http://example.com:80", "http://example.com/"),
+    ("http://example.com:8080/a", "http://example.com:8080/a"),
+    ("https://example.com/a//b/#section", "https://example.com/a/b/"),
+    ("https://example.com/?b=2&utm_source=x&a=1&fbclid=y", "https://example.com/?a=1&b=2"),
+    ("https://user:pw@example.com/", "https://example.com/"),
+    ("https://[::1]:8443/x", "https://[::1]:8443/x"),
+    ("  https://example.com/page  ", "https://example.com/page"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url", ["mailto:someone@example.com", "javascript:void(0)", "ftp://example.com/",
+                                 "https://example.com:99999/", "/relative/without/base"])
+def test_normalize_url_rejects_uncrawlable(url):
+    assert normalize_url(url) is None
+
+
+def test_normalize_url_resolves_against_base():
+    assert normalize_url("../b?x=1#top", base="https://example.com/docs/a/") == "https://example.com/docs/b?x=1"
+
+
+def test_frontier_deduplicates_and_scopes():
+    frontier = Frontier(["example.com"], include=["https://example.com/docs/*"], exclude=["*/changelog/*"])
+
+    assert frontier.add("https://example.com/docs/a", 1)
+    assert not frontier.add("https://example.com/docs/a", 2)
+    assert not frontier.add("https://other.com/docs/a", 1)
+    assert not frontier.add("https://example.com/blog/a", 1)
+    assert not frontier.add("https://example.com/docs/changelog/1", 1)
+    assert len(frontier) == 1
+
+
+def test_frontier_pops_by_priority_then_depth_then_discovery():
+    frontier = Frontier(["a.test"])
+    frontier.add("https://a.test/deep", 2)
+    frontier.add("https://a.test/shallow-1", 1)
+    frontier.add("https://a.test/shallow-2", 1)
+    frontier.add("https://a.test/relevant", 3, priority=2.5)
+
+    order = [frontier.pop(lambda host: True)[3] for _ in range(4)]
+
+    assert order == ["https://a.test/relevant", "https://a.test/shallow-1", "https://a.test/shallow-2", "https://a.test/deep"]
+    assert frontier.pop(lambda host: True) is None
+
+
+def test_frontier_skips_hosts_that_are_not_ready():
+    frontier = Frontier(["a.test", "b.test"])
+    frontier.add("https://a.test/1", 0, priority=5)
+    frontier.add("https://b.test/1", 0)
+
+    assert frontier.pop(lambda host: host != "a.test")[3] == "https://b.test/1"
+    assert frontier.pop(lambda host: host != "a.test") is None
+    assert frontier.pending_hosts() == ["a.test"]
+
+
+def test_host_limiter_spacing_and_concurrency():
+    limiter = HostLimiter(per_host=2, delay=1.0)
+
+    assert limiter.ready("a.test", 0.0)
+    limiter.start("a.test", 0.0)
+    assert not limiter.ready("a.test", 0.5)
+    assert limiter.ready("a.test", 1.0)
+    limiter.start("a.test", 1.0)
+    assert limiter.next_start("a.test") is None  # Both slots busy
+    limiter.finish("a.test")
+    assert limiter.next_start("a.test") == 2.0
+
+
+SITE = {
+    "https://a.test/": ["/one", "/two", "https://elsewhere.test/x", "/one#again"],
+    "https://a.test/one": ["/three", "/"],
+    "https://a.test/two": ["/three", "/four"],
+    "https://a.test/three": ["/five"],
+    "https://a.test/four": [],
+    "https://a.test/five": [],
+}
+
+
+def crawl(seeds, **options):
+    values = {"include": None, "exclude": None, "per_host": 2, "delay": 0.0, "query": None,
+              "max_pages": 50, "depth": 1}
+    values.update(options)
+    args = argparse.Namespace(**values)
+    results = []
+    fetched = []
+
+    async def fetch_page(url, args, excluded_tags, crawler):
+        assert crawler == "browser"
+        fetched.append(url)
+        await asyncio.sleep(0)
+        if url not in SITE:
+            return {"success": False, "url": url, "error": "not found"}
+        return {"success": True, "url": url, "links": [{"text": "", "href": href} for href in SITE[url]]}
+
+    @asynccontextmanager
+    async def open_browser():
+        yield "browser"
+
+    summary = asyncio.run(crawl_site(seeds, args, results.append, fetch_page=fetch_page, open_browser=open_browser))
+    return summary, results, fetched
+
+
+def test_crawl_follows_internal_links_to_the_depth_limit():
+    summary, results, fetched = crawl(["https://a.test/"], depth=2)
+
+    assert sorted(fetched) == sorted(["https://a.test/", "https://a.test/one", "https://a.test/two",
+                                      "https://a.test/three", "https://a.test/four"])
+    depths = {result["url"]: result["metadata"]["depth"] for result in results}
+    assert depths["https://a.test/"] == 0
+    assert depths["https://a.test/three"] == 2
+    assert results[0]["metadata"]["parent"] is None
+    assert summary == {"total": 5, "succeeded": 5, "failed": 0, "unvisited": 0}  # /five is 3 hops away
+
+
+def test_crawl_stops_at_max_pages():
+    summary, results, _ = crawl(["https://a.test/"], depth=5, max_pages=3)
+
+    assert summary["total"] == len(results) == 3
+    assert summary["unvisited"] > 0
+
+
+def test_crawl_reports_failed_pages():
+    summary, results, _ = crawl(["https://a.test/missing"], depth=1)
+
+    assert summary == {"total": 1, "succeeded": 0, "failed": 1, "unvisited": 0}
+    assert results[0]["metadata"]["depth"] == 0
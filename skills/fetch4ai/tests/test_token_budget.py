@@ -0,0 +1,142 @@
+"""Tests for token_budget.py (run with: python -m pytest skills/fetch4ai/tests)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from block_scoring import estimate_tokens  # noqa: E402
+from token_budget import TRUNCATION_MARK, chunk_markdown, pack_blocks, truncate_to_tokens  # noqa: E402
+
+DOC = """# Guide
+
+Intro paragraph explaining the tool in a few plain words for new readers.
+
+## Install
+
+Run the installer, then restart your shell so the new PATH takes effect everywhere.
+
+```bash
+pip install example-package==1.2.3
+example --init
+```
+
+- first item with words
+- second item: https://example.com/a/very/long/path/without/any/spaces/that/keeps/going/and/going
+- third
+
+## 使用
+
+这是一个中文段落，用来测试宽字符的分块是否正确处理。
+
+### Deep
+
+Final words here, at the very end of the document."""
+
+
+def non_space(text: str) -> str:
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("chunk_tokens", [1, 2, 3, 5, 8, 17, 50, 200, 10_000])
+def test_chunks_fit_and_keep_all_content_in_order(chunk_tokens):
+    chunks = chunk_markdown(DOC, chunk_tokens)
+
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    for chunk in chunks:
+        assert chunk["content"]
+        assert chunk["tokens"] == estimate_tokens(chunk["content"]) <= chunk_tokens
+    # Splitting only ever happens at whitespace or inside over-long words
+    assert "".join(non_space(chunk["content"]) for chunk in chunks) == non_space(DOC)
+
+
+def test_large_budget_gives_one_chunk():
+    assert [chunk["content"] for chunk in chunk_markdown(DOC, 10_000)] == [DOC]
+
+
+def test_chunks_carry_their_heading_trail():
+    chunks = chunk_markdown(DOC, 20)
+    deep = next(chunk for chunk in chunks if chunk["content"].startswith("Final words"))
+
+    assert deep["headings"] == ["Guide", "使用", "Deep"]
+    assert chunks[0]["headings"] == []
+
+
+def test_oversized_line_is_split_at_words():
+    line = " ".join(f"word{i}" for i in range(200))
+    chunks = chunk_markdown(line, 10)
+
+    assert len(chunks) > 1
+    assert all(chunk["tokens"] <= 10 for chunk in chunks)
+    assert " ".join(chunk["content"] for chunk in chunks) == line
+
+
+def test_pack_keeps_everything_that_fits_in_document_order():
+    packed = pack_blocks(DOC, 10_000)
+
+    assert packed["content"] == DOC
+    assert packed["blocks_kept"] == packed["blocks_total"] == 6
+    assert not packed["truncated"]
+
+
+def test_pack_stays_within_budget_in_document_order():
+    for max_tokens in (25, 40, 60, 80):
+        packed = pack_blocks(DOC, max_tokens)
+        assert packed["tokens"] <= max_tokens
+        assert not packed["truncated"]
+        blocks = packed["content"].split("\n\n")
+        positions = [DOC.index(block) for block in blocks]
+        assert positions == sorted(positions)
+
+
+def test_pack_counts_heading_trail_against_the_budget():
+    markdown = "# Title\n\n## Section\n\n" + "alpha beta gamma delta " * 5
+    body = markdown.split("\n\n")[-1]
+    body_cost = estimate_tokens(body) + 1
+
+    packed = pack_blocks(markdown, body_cost)
+    assert packed["truncated"]  # The body alone would fit, but not with its headings
+
+    packed = pack_blocks(markdown, body_cost + estimate_tokens("# Title") + estimate_tokens("## Section") + 2)
+    assert packed["content"] == markdown
+    assert not packed["truncated"]
+
+
+def test_pack_prefers_query_relevant_blocks():
+    markdown = (
+        "Rate limits allow one hundred requests per minute for each API key.\n\n"
+        "Our office has a friendly team and plenty of plants by the window."
+    )
+    packed = pack_blocks(markdown, 20, query="rate limits", bm25_weight=1.0)
+
+    assert packed["content"].startswith("Rate limits")
+    assert packed["blocks_kept"] == 1
+
+
+def test_pack_truncates_the_best_block_when_nothing_fits():
+    packed = pack_blocks(DOC, 3)
+
+    assert packed["truncated"]
+    assert packed["content"].endswith(TRUNCATION_MARK)
+    assert packed["tokens"] <= 3
+    assert packed["blocks_kept"] == 1
+
+
+def test_pack_with_no_room_even_for_the_mark_is_empty():
+    packed = pack_blocks(DOC, 1)
+
+    assert packed["content"] == ""
+    assert packed["blocks_kept"] == 0
+    assert not packed["truncated"]
+
+
+def test_truncate_cuts_at_a_word_boundary():
+    text = "one two three four five six seven eight nine ten"
+    cut = truncate_to_tokens(text, 5)
+
+    assert cut.endswith(TRUNCATION_MARK)
+    assert text.startswith(cut[:-len(TRUNCATION_MARK)])
+    assert cut[:-len(TRUNCATION_MARK)].split()[-1] in text.split()
+    assert estimate_tokens(cut) <= 5
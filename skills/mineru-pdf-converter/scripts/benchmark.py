@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark
+
+Runs MinerUConverter against a local mock_server.py instance with synthetic
+PDFs, so upload, polling, download, extraction and merge throughput can be
+measured (and regressions caught) without an API token or network access.
+
+Scenarios:
+    single      - one small PDF, single upload
+    large-split - one PDF above MAX_PAGES_PER_TASK, split into chunks and merged
+    multi-file  - a folder of small PDFs converted through run_ingest
+
+Each scenario reports wall time, pages per second, API requests and bytes
+transferred. Results are printed and optionally written as JSON.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --scenarios large-split --large-pages 1500 --output bench.json
+    python benchmark.py --page-rate 200 --failure-rate 0.2 --max-rps 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    print("Error: PyMuPDF is required for generating benchmark PDFs. Install with: pip install PyMuPDF", file=sys.stderr)
+    sys.exit(1)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ingest import run_ingest  # noqa: E402
+from mineru_convert import MinerUConverter  # noqa: E402
+from mock_server import MockMinerUServer  # noqa: E402
+from rate_limiter import PageLedger, RateLimiter  # noqa: E402
+
+
+SCENARIOS = ["single", "large-split", "multi-file"]
+
+
+def make_pdf(path: Path, pages: int, chapter_every: int = 100) -> Path:
+    """Write a synthetic text PDF with a level-1 outline entry every chapter_every pages."""
+    doc = fitz.open()
+    toc = []
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Benchmark page {i + 1}", fontsize=14)
+        page.insert_text((72, 100), "Lorem ipsum dolor sit amet. " * 8, fontsize=9)
+        if i % chapter_every == 0:
+            toc.append([1, f"Chapter {i // chapter_every + 1}", i + 1])
+    doc.set_toc(toc)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def run_scenario(
+    name: str,
+    server: MockMinerUServer,
+    converter: MinerUConverter,
+    run: Callable[[], Dict[str, Any]],
+    pages: int
+) -> Dict[str, Any]:
+    """Time one scenario and report its throughput and mock server traffic."""
+    before = dict(server.stats)
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    traffic = {key: server.stats[key] - before[key] for key in server.stats}
+
+    report = {
+        "scenario": name,
+        "success": bool(result.get("success", False)),
+        "pages": pages,
+        "wall_seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2) if elapsed else None,
+        "api": traffic,
+    }
+    if result.get("error"):
+        report["error"] = result["error"]
+    if result.get("warnings"):
+        report["warnings"] = result["warnings"]
+    if result.get("timings"):
+        report["stages"] = result["timings"]["stages"]
+    return report
+
+
+def run_benchmark(args: argparse.Namespace, work_dir: Path) -> List[Dict[str, Any]]:
+    server = MockMinerUServer(
+        latency=args.latency,
+        queue_delay=args.queue_delay,
+        page_rate=args.page_rate,
+        failure_rate=args.failure_rate,
+        max_rps=args.max_rps,
+        images_per_page=args.images_per_page,
+        image_bytes=args.image_kb * 1024,
+        seed=args.seed
+    )
+
+    limiter = RateLimiter(
+        requests_per_second=args.client_rps,
+        ledger=PageLedger(work_dir / "quota.json")
+    )
+    converter = MinerUConverter("benchmark-token", limiter=limiter, api_base=server.api_base)
+    reports = []
+
+    with server:
+        for name in args.scenarios:
+            scenario_dir = work_dir / name
+            scenario_dir.mkdir()
+            print(f"Running {name}...", file=sys.stderr)
+
+            if name == "single":
+                pdf = make_pdf(scenario_dir / "single.pdf", args.single_pages)
+                reports.append(run_scenario(
+                    name, server, converter,
+                    lambda: converter.convert(input_path=str(pdf), timeout=args.timeout, verbose=args.verbose),
+                    args.single_pages
+                ))
+
+            elif name == "large-split":
+                pdf = make_pdf(scenario_dir / "large.pdf", args.large_pages)
+                reports.append(run_scenario(
+                    name, server, converter,
+                    lambda: converter.convert(input_path=str(pdf), timeout=args.timeout, verbose=args.verbose),
+                    args.large_pages
+                ))
+
+            elif name == "multi-file":
+                inbox = scenario_dir / "inbox"
+                inbox.mkdir()
+                for i in range(args.files):
+                    # Vary page counts so the files hash differently
+                    make_pdf(inbox / f"doc{i + 1:03d}.pdf", args.single_pages + i)
+                total = sum(args.single_pages + i for i in range(args.files))
+
+                def ingest() -> Dict[str, Any]:
+                    summary = run_ingest(
+                        converter,
+                        inbox,
+                        max_concurrent=args.max_concurrent,
+                        convert_options={"timeout": args.timeout},
+                        verbose=args.verbose
+                    )
+                    summary["success"] = summary["states"].get("done", 0) == args.files
+                    return summary
+
+                reports.append(run_scenario(name, server, converter, ingest, total))
+
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark MinerUConverter end to end against a local mock API"
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=SCENARIOS,
+        choices=SCENARIOS,
+        help="Scenarios to run (default: all)"
+    )
+    parser.add_argument("--single-pages", type=int, default=20, help="Pages in small PDFs (default: 20)")
+    parser.add_argument("--large-pages", type=int, default=1500, help="Pages in the large PDF (default: 1500)")
+    parser.add_argument("--files", type=int, default=8, help="Files in the multi-file scenario (default: 8)")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="Concurrent ingest conversions (default: 4)")
+    parser.add_argument("--timeout", type=int, default=600, help="Per-job polling timeout (default: 600)")
+
+    # Mock server behaviour
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added per API request (default: 0.02)")
+    parser.add_argument("--queue-delay", type=float, default=0.5, help="Seconds jobs stay pending (default: 0.5)")
+    parser.add_argument("--page-rate", type=float, default=100.0, help="Mock pages per second per job (default: 100)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability a mock job fails (default: 0)")
+    parser.add_argument("--max-rps", type=float, help="Mock server 429 threshold (default: none)")
+    parser.add_argument("--images-per-page", type=float, default=0.5, help="Images per page in results (default: 0.5)")
+    parser.add_argument("--image-kb", type=int, default=20, help="Size of each result image in KB (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+
+    parser.add_argument("--client-rps", type=float, default=20.0, help="Client-side request limit (default: 20)")
+    parser.add_argument("--work-dir", help="Keep inputs and outputs here (default: temporary directory)")
+    parser.add_argument("--output", "-o", help="Write results JSON to this file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print converter progress")
+
+    args = parser.parse_args()
+
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=False)
+        reports = run_benchmark(args, work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="mineru-bench-") as tmp:
+            reports = run_benchmark(args, Path(tmp))
+
+    output = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "verbose", "work_dir")},
+        "results": reports,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+
+    print(json.dumps(output, indent=2))
+    sys.exit(0 if all(r["success"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
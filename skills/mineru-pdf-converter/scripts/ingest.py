@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Folder Ingestion
+
+Convert every document dropped into a directory, once. Files are
+deduplicated by content hash and tracked in a persistent job queue
+(``.mineru_ingest.json`` in the watched directory), so an interrupted
+ingest picks up where it left off. Conversions run with bounded
+concurrency and results are written next to each source, exactly as a
+manual ``mineru_convert.py --input`` run would.
+
+Usage:
+    python mineru_convert.py --ingest-dir /shared/pdfs --token-file token.md
+    python mineru_convert.py --ingest-dir /shared/pdfs --token-file token.md --watch
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+QUEUE_NAME = ".mineru_ingest.json"
+SUPPORTED_SUFFIXES = {'.pdf', '.doc', '.docx', '.ppt', '.pptx', '.png', '.jpg', '.jpeg', '.html'}
+MAX_ATTEMPTS = 3
+HASH_CHUNK_SIZE = 1024 * 1024
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hash a file's content in 1 MB reads."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestQueue:
+    """Persistent, content-addressed job queue for one directory.
+
+    Jobs are keyed by SHA-256 of the file content. ``files`` caches
+    (size, mtime) -> hash per path so unchanged files are not re-hashed on
+    every scan.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.path = self.directory / QUEUE_NAME
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, List[Any]] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.jobs = data.get("jobs", {})
+            self.files = data.get("files", {})
+
+    def save(self) -> None:
+        """Write the queue atomically (temp file + rename). Caller holds the lock."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"jobs": self.jobs, "files": self.files}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def recover(self) -> None:
+        """Requeue jobs that were running when the previous process stopped."""
+        with self.lock:
+            for job in self.jobs.values():
+                if job["state"] == STATE_RUNNING:
+                    job["state"] = STATE_QUEUED
+                    job["resume"] = True
+            self.save()
+
+    def scan(self, settle_seconds: float = 0) -> int:
+        """Add new documents in the directory to the queue.
+
+        Args:
+            settle_seconds: Skip files modified more recently than this
+                (they may still be being copied in)
+
+        Returns:
+            Number of newly queued jobs
+        """
+        now = time.time()
+        added = 0
+
+        with self.lock:
+            for path in sorted(self.directory.iterdir()):
+                if not path.is_file() or path.suffix.lower() not in SUPPORTED_SUFFIXES:
+                    continue
+
+                stat = path.stat()
+                if now - stat.st_mtime < settle_seconds:
+                    continue
+
+                key = str(path)
+                cached = self.files.get(key)
+                if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+                    continue
+
+                digest = file_sha256(path)
+                self.files[key] = [stat.st_size, stat.st_mtime, digest]
+
+                job = self.jobs.get(digest)
+                if job is None:
+                    self.jobs[digest] = {
+                        "path": key,
+                        "duplicates": [],
+                        "state": STATE_QUEUED,
+                        "attempts": 0,
+                        "output_file": None,
+                        "error": None,
+                        "queued": datetime.now().isoformat(),
+                    }
+                    added += 1
+                elif key != job["path"] and key not in job["duplicates"]:
+                    # Same content under another name: converted once
+                    job["duplicates"].append(key)
+
+            self.save()
+
+        return added
+
+    def claim(self, limit: int) -> List[str]:
+        """Mark up to limit queued jobs as running and return their hashes."""
+        claimed = []
+        with self.lock:
+            for digest, job in self.jobs.items():
+                if len(claimed) >= limit:
+                    break
+                if job["state"] != STATE_QUEUED:
+                    continue
+
+                if not Path(job["path"]).exists():
+                    # Fall back to a duplicate copy, or give up on the job
+                    copies = [p for p in job["duplicates"] if Path(p).exists()]
+                    if not copies:
+                        job["state"] = STATE_FAILED
+                        job["error"] = "Source file no longer exists"
+                        continue
+                    job["path"] = copies[0]
+                    job["duplicates"].remove(copies[0])
+
+                job["state"] = STATE_RUNNING
+                job["attempts"] += 1
+                job["started"] = datetime.now().isoformat()
+                claimed.append(digest)
+            self.save()
+        return claimed
+
+    def finish(self, digest: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        """Record a job's outcome; failed jobs are requeued up to MAX_ATTEMPTS."""
+        with self.lock:
+            job = self.jobs[digest]
+            job["finished"] = datetime.now().isoformat()
+            job.pop("resume", None)
+
+            if result and result.get("success"):
+                job["state"] = STATE_DONE
+                job["output_file"] = result.get("output_file")
+                job["error"] = None
+                if result.get("warnings"):
+                    job["warnings"] = result["warnings"]
+            else:
+                job["error"] = error or (result or {}).get("error", "Unknown error")
+                job["state"] = STATE_QUEUED if job["attempts"] < MAX_ATTEMPTS else STATE_FAILED
+
+            self.save()
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job["state"] == STATE_QUEUED)
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            counts: Dict[str, int] = {}
+            for job in self.jobs.values():
+                counts[job["state"]] = counts.get(job["state"], 0) + 1
+            return {
+                "directory": str(self.directory),
+                "queue_file": str(self.path),
+                "jobs": len(self.jobs),
+                "states": counts,
+                "failed": [
+                    {"path": job["path"], "error": job["error"]}
+                    for job in self.jobs.values() if job["state"] == STATE_FAILED
+                ],
+            }
+
+
+def run_ingest(
+    converter: Any,
+    directory: Union[str, Path],
+    watch: bool = False,
+    poll_interval: float = 30,
+    settle_seconds: float = 10,
+    max_concurrent: int = 2,
+    convert_options: Optional[Dict[str, Any]] = None,
+    verbose: bool = False
+) -> Dict[str, Any]:
+    """Convert all documents in a directory, optionally watching for new ones.
+
+    Args:
+        converter: MinerUConverter instance (shared by all workers)
+        directory: Directory to ingest (top level only, not recursive)
+        watch: Keep running and poll the directory for new files
+        poll_interval: Seconds between directory scans in watch mode
+        settle_seconds: In watch mode, ignore files modified more recently than this
+        max_concurrent: Maximum conversions running at once
+        convert_options: Extra keyword arguments for converter.convert()
+        verbose: Print progress updates
+
+    Returns:
+        Queue summary dictionary
+    """
+    directory_path = Path(directory).resolve()
+    if not directory_path.is_dir():
+        raise NotADirectoryError(f"Ingest directory not found: {directory_path}")
+
+    queue = IngestQueue(directory_path)
+    queue.recover()
+    convert_options = convert_options or {}
+
+    def convert_one(digest: str) -> Dict[str, Any]:
+        job = queue.jobs[digest]
+        return converter.convert(
+            input_path=job["path"],
+            resume=job.get("resume", False),
+            **convert_options
+        )
+
+    running: Dict[Any, str] = {}
+
+    def record(future) -> None:
+        digest = running.pop(future)
+        try:
+            result, error = future.result(), None
+        except Exception as e:
+            result, error = None, str(e)
+        queue.finish(digest, result, error)
+
+        if verbose:
+            job = queue.jobs[digest]
+            print(f"{job['state']}: {job['path']}" + (f" ({job['error']})" if job["error"] else ""))
+
+    pool = ThreadPoolExecutor(max_workers=max_concurrent)
+    try:
+        while True:
+            added = queue.scan(settle_seconds if watch else 0)
+            if verbose and added:
+                print(f"Queued {added} new file(s) from {directory_path}")
+
+            for digest in queue.claim(max_concurrent - len(running)):
+                if verbose:
+                    print(f"Converting {queue.jobs[digest]['path']}...")
+                running[pool.submit(convert_one, digest)] = digest
+
+            if not running:
+                if not watch and queue.pending_count() == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(
+                list(running),
+                timeout=poll_interval if watch else None,
+                return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                record(future)
+
+    except KeyboardInterrupt:
+        # Let running conversions finish so their results are recorded; a second
+        # Ctrl+C leaves them "running" on disk and they are resumed on next start
+        if verbose:
+            print("Interrupted; waiting for running conversions (Ctrl+C again to abort)")
+        for future in list(running):
+            record(future)
+
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return queue.summary()
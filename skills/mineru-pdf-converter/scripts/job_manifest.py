@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Job Manifest Utility
+
+Checkpoint the state of a split (large PDF) conversion so that an interrupted
+or partially failed run can be resumed with ``--resume``.
+
+The manifest is a JSON file written to the output directory. It records each
+chunk's page range, batch_id, state and downloaded result path, and is
+rewritten atomically after every state change.
+
+Chunk states:
+    pending   - not uploaded yet
+    uploaded  - uploaded, batch_id known, result not downloaded yet
+    done      - result downloaded to output_file
+    failed    - last attempt failed (see error)
+
+Single-file conversions of extracted pages (--page-ranges) instead record
+which source page each result page came from in a small page map, so that
+--patch-pages can anchor their output at the right pages.
+
+Usage:
+    from job_manifest import JobManifest
+    manifest = JobManifest.load(output_dir) or JobManifest.create(...)
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+MANIFEST_NAME = "mineru_job.json"
+PAGE_MAP_NAME = "mineru_pages.json"
+
+STATE_PENDING = "pending"
+STATE_UPLOADED = "uploaded"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+class JobManifest:
+    """On-disk checkpoint for a chunked conversion."""
+
+    def __init__(self, path: Union[str, Path], data: Dict[str, Any]):
+        self.path = Path(path)
+        self.data = data
+
+    @classmethod
+    def create(
+        cls,
+        output_dir: Union[str, Path],
+        source: str,
+        total_pages: int,
+        chunk_ranges: List[Tuple[int, int]],
+        page_ranges: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> "JobManifest":
+        """Create a new manifest with every chunk in the pending state.
+
+        Args:
+            output_dir: Directory the manifest is written to
+            source: Original input file path
+            total_pages: Page count of the document being split
+            chunk_ranges: List of (start_page, end_page), 1-indexed inclusive
+            page_ranges: Page ranges extracted from the source, if any
+            options: Conversion options (model, language, ...)
+        """
+        data = {
+            "source": source,
+            "page_ranges": page_ranges,
+            "total_pages": total_pages,
+            "options": options or {},
+            "created": datetime.now().isoformat(),
+            "chunks": [
+                {
+                    "index": i + 1,
+                    "start_page": start,
+                    "end_page": end,
+                    "batch_id": None,
+                    "state": STATE_PENDING,
+                    "output_file": None,
+                    "error": None,
+                }
+                for i, (start, end) in enumerate(chunk_ranges)
+            ],
+        }
+        manifest = cls(Path(output_dir) / MANIFEST_NAME, data)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, output_dir: Union[str, Path]) -> Optional["JobManifest"]:
+        """Load the manifest from output_dir, or return None if absent."""
+        path = Path(output_dir) / MANIFEST_NAME
+        if not path.exists():
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        return cls(path, data)
+
+    @property
+    def chunks(self) -> List[Dict[str, Any]]:
+        return self.data["chunks"]
+
+    def matches(self, source: str, total_pages: int, page_ranges: Optional[str] = None) -> bool:
+        """Check whether this manifest belongs to the given conversion."""
+        return (
+            self.data.get("source") == source
+            and self.data.get("total_pages") == total_pages
+            and self.data.get("page_ranges") == page_ranges
+        )
+
+    def update(self, chunk: Dict[str, Any], **fields: Any) -> None:
+        """Update a chunk entry and checkpoint immediately."""
+        chunk.update(fields)
+        chunk["updated"] = datetime.now().isoformat()
+        self.save()
+
+    def is_complete(self) -> bool:
+        return all(c["state"] == STATE_DONE for c in self.chunks)
+
+    def save(self) -> None:
+        """Write the manifest atomically (temp file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        """Delete the manifest file."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def save_page_map(
+    output_dir: Union[str, Path],
+    source: str,
+    page_ranges: str,
+    source_pages: List[int]
+) -> None:
+    """Record the source page of each page of a single-file result."""
+    data = {"source": source, "page_ranges": page_ranges, "source_pages": source_pages}
+    path = Path(output_dir) / PAGE_MAP_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_page_map(output_dir: Union[str, Path]) -> Optional[List[int]]:
+    """Source page of each result page (page_idx order), or None if not recorded."""
+    try:
+        with open(Path(output_dir) / PAGE_MAP_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f).get("source_pages")
+    except (OSError, ValueError):
+        return None
+
+
+def remove_page_map(output_dir: Union[str, Path]) -> None:
+    """Delete a page map left by an earlier page-ranged conversion."""
+    try:
+        (Path(output_dir) / PAGE_MAP_NAME).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Job Poller
+
+Single-thread scheduler that watches many MinerU batch_ids and task_ids at
+once. Instead of one blocking sleep loop per job, jobs sit in a heap ordered
+by their next poll time and the poller only sleeps until the earliest one is
+due.
+
+Each job's interval adapts to its reported ``extract_progress``: once pages
+are being extracted, the pages-per-second rate gives an estimated time to
+completion and the next poll is scheduled for then (clamped to
+min_interval..max_interval). Jobs without progress information fall back to
+exponential backoff.
+
+A status request that raises (network error, timeout, API error) does not
+end the job: it is polled again with backoff and only fails after
+max_errors consecutive errors.
+
+Usage:
+    from job_poller import JobPoller
+    poller = JobPoller(converter)
+    poller.add_batch(batch_id_1, max_wait=600)
+    poller.add_batch(batch_id_2, max_wait=600)
+    for job in poller.iter_completed():
+        if job.error:
+            ...
+        else:
+            download(job.result["full_zip_url"])
+"""
+
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+JOB_BATCH = "batch"
+JOB_TASK = "task"
+QUEUED_STATES = ("pending", "waiting-file")  # Accepted but not yet converting
+
+
+class PollJob:
+    """State of one watched batch or task."""
+
+    def __init__(
+        self,
+        kind: str,
+        job_id: str,
+        max_wait: float,
+        callback: Optional[Callable[..., Any]],
+        started: float,
+        initial_interval: float
+    ):
+        self.kind = kind
+        self.job_id = job_id
+        self.callback = callback
+        self.started = started
+        self.deadline = started + max_wait
+        self.max_wait = max_wait
+        self.backoff = initial_interval
+        self.progress_start = None  # (time, extracted_pages) of first progress report
+        self.eta = None  # Estimated seconds to completion
+        self.state = None
+        self.running_at: Optional[float] = None  # First poll that saw the job past the queue
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+        self.polls = 0
+        self.errors = 0  # Consecutive failed status requests
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None or self.error is not None
+
+
+class JobPoller:
+    """Poll many MinerU jobs from one thread with adaptive intervals."""
+
+    def __init__(
+        self,
+        converter: Any,
+        initial_interval: float = 2.0,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        max_errors: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            converter: MinerUConverter (provides get_batch_status/get_task_status)
+            initial_interval: First poll delay and backoff start, in seconds
+            min_interval: Shortest delay between polls of one job
+            max_interval: Longest delay between polls of one job
+            max_errors: Consecutive status request errors after which a job fails
+            clock: Monotonic time source
+            sleep: Sleep function
+        """
+        self.converter = converter
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_errors = max_errors
+        self.clock = clock
+        self.sleep = sleep
+        self._heap: List = []
+        self._seq = itertools.count()
+
+    def add_batch(
+        self,
+        batch_id: str,
+        max_wait: float = 600,
+        callback: Optional[Callable[..., Any]] = None
+    ) -> PollJob:
+        """Watch a batch (local file upload). Polled immediately."""
+        return self._add(JOB_BATCH, batch_id, max_wait, callback)
+
+    def add_task(
+        self,
+        task_id: str,
+        max_wait: float = 600,
+        callback: Optional[Callable[..., Any]] = None
+    ) -> PollJob:
+        """Watch a task (URL submission). Polled immediately."""
+        return self._add(JOB_TASK, task_id, max_wait, callback)
+
+    def _add(self, kind, job_id, max_wait, callback) -> PollJob:
+        now = self.clock()
+        job = PollJob(kind, job_id, max_wait, callback, now, self.initial_interval)
+        heapq.heappush(self._heap, (now, next(self._seq), job))
+        return job
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def step(self, block: bool = True) -> List[PollJob]:
+        """Poll every job that is due and return the ones that finished.
+
+        Args:
+            block: Sleep until the earliest job is due if none is due yet
+
+        Returns:
+            Finished jobs (done, failed or timed out), possibly empty
+        """
+        if not self._heap:
+            return []
+
+        due = self._heap[0][0]
+        now = self.clock()
+        if due > now:
+            if not block:
+                return []
+            self.sleep(due - now)
+
+        finished = []
+        while self._heap and self._heap[0][0] <= self.clock():
+            _, _, job = heapq.heappop(self._heap)
+            self._poll(job)
+
+            if job.finished:
+                finished.append(job)
+            else:
+                now = self.clock()
+                next_due = min(now + self._next_interval(job, now), job.deadline)
+                heapq.heappush(self._heap, (next_due, next(self._seq), job))
+
+        return finished
+
+    def iter_completed(self) -> Iterator[PollJob]:
+        """Yield jobs as soon as each finishes, until no jobs are left."""
+        while self._heap:
+            for job in self.step(block=True):
+                yield job
+
+    def wait(self, job: PollJob) -> Dict[str, Any]:
+        """Block until one job finishes and return its result (or raise its error)."""
+        while not job.finished:
+            self.step(block=True)
+
+        if job.error:
+            raise job.error
+        return job.result  # type: ignore
+
+    def _poll(self, job: PollJob) -> None:
+        """Fetch a job's status once and record the outcome."""
+        job.polls += 1
+
+        try:
+            if job.kind == JOB_BATCH:
+                data = self.converter.get_batch_status(job.job_id)
+            else:
+                data = self.converter.get_task_status(job.job_id)
+        except Exception as e:
+            # Transient failures are retried with backoff; only a run of them fails the job
+            now = self.clock()
+            job.errors += 1
+            job.eta = None
+            if job.errors >= self.max_errors:
+                job.error = e
+                job.finished_at = now
+                return
+            data = None
+        else:
+            now = self.clock()
+            job.errors = 0
+
+        if data is not None:
+            job.state = data.get("state")
+
+            if job.callback:
+                job.callback(job.state, data)
+
+            if job.state not in QUEUED_STATES and job.running_at is None:
+                job.running_at = now
+
+            if job.state == "done":
+                job.result = data
+                job.finished_at = now
+                return
+            elif job.state == "failed":
+                job.finished_at = now
+                error_msg = data.get("err_msg", "Unknown error")
+                label = "Batch task" if job.kind == JOB_BATCH else "Task"
+                job.error = Exception(f"{label} failed: {error_msg}")
+                return
+
+            self._update_progress(job, data, now)
+
+        if now >= job.deadline:
+            label = "Batch" if job.kind == JOB_BATCH else "Task"
+            job.error = TimeoutError(f"{label} polling timed out after {job.max_wait} seconds")
+            job.finished_at = now
+
+    def _update_progress(self, job: PollJob, data: Dict[str, Any], now: float) -> None:
+        """Estimate time to completion from the extracted-pages rate."""
+        progress = data.get("extract_progress") or {}
+        extracted = progress.get("extracted_pages")
+        total = progress.get("total_pages")
+
+        job.eta = None
+        if extracted is None or not total:
+            return
+
+        if job.progress_start is None:
+            job.progress_start = (now, extracted)
+            return
+
+        start_time, start_pages = job.progress_start
+        remaining = total - extracted
+        if extracted > start_pages and now > start_time and remaining > 0:
+            rate = (extracted - start_pages) / (now - start_time)  # pages per second
+            job.eta = remaining / rate
+
+    def _next_interval(self, job: PollJob, now: float) -> float:
+        """Delay until the next poll of a job."""
+        if job.eta is not None:
+            # Poll around the estimated completion time; restart backoff afterwards
+            job.backoff = self.min_interval
+            return min(max(job.eta, self.min_interval), self.max_interval)
+
+        interval = job.backoff
+        job.backoff = min(job.backoff * 2, self.max_interval)
+        return min(max(interval, self.min_interval), self.max_interval)
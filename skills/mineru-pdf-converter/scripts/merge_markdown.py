@@ -5,15 +5,142 @@ Markdown Merger Utility
 Merge multiple Markdown files from chunked PDF conversion into a single file.
 Handles page markers, image references, and proper formatting.
 
+Image references are found in a single pass of one compiled tokenizer that
+covers both Markdown ``![alt](path)`` and HTML ``<img src="path">`` (as
+MinerU emits inside table cells); rewrites splice new paths into the recorded
+positions without rescanning.
+
+Chunks are streamed into the output one at a time. Images are deduplicated by
+content hash across chunks (identical figures in several chunks are stored
+once), and hashing and copying/linking run on a thread pool while the text is
+being written.
+
 Usage:
     from merge_markdown import merge_markdown_files
     merge_markdown_files(["/path/to/chunk1.md", "/path/to/chunk2.md"], "/path/to/output.md")
+
+    # Hardlink images instead of copying them (falls back to copy across filesystems)
+    merge_markdown_files(chunk_files, "book.md", image_mode="hardlink")
+
+    # Global page anchors and a heading index (book.index.json)
+    merge_markdown_files(chunk_files, "book.md",
+                         page_numbers=[list(range(1, 391)), list(range(391, 846))],
+                         index_path="book.index.json")
+
+Page anchors and index:
+    With page_numbers (the source page of each page in each chunk), the merge
+    inserts ``<a id="page-N"></a>`` where each source page starts. Page starts
+    are located from the chunk's MinerU ``*_content_list.json`` (blocks carry
+    a chunk-local page_idx, offset here to the global page); without one, only
+    the chunk's first page is anchored. The optional JSON index lists every
+    page anchor, heading and chunk with its byte offset and line in the merged
+    file, so consumers can seek straight to a page or section.
 """
 
+import bisect
+import hashlib
+import json
+import os
+import posixpath
 import re
 import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+IMAGE_MODES = ("copy", "hardlink", "move")
+IMAGE_WORKERS = 8  # Image hashing and copying is I/O-bound
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# One alternation for both reference forms; exactly one path group matches.
+# The src lookbehind skips lazy-load attributes such as data-src.
+IMAGE_REF_PATTERN = re.compile(
+    r'!\[[^\]]*\]\(\s*(?:<(?P<md_angle>[^>\n]+)>|(?P<md>[^)\s]+))[^)]*\)'
+    r'|<img\b[^>]*?(?<![\w-])src\s*=\s*(?:"(?P<dq>[^"]*)"|\'(?P<sq>[^\']*)\'|(?P<uq>[^\s>"\']+))',
+    re.IGNORECASE
+)
+PATH_GROUPS = ("md_angle", "md", "dq", "sq", "uq")
+
+PAGE_ANCHOR = '<a id="page-{page}"></a>'
+PAGE_ANCHOR_PATTERN = re.compile(r'^<a id="page-(\d+)"></a>$', re.MULTILINE)
+CHUNK_SEPARATOR_PATTERN = re.compile(r'\n*---\n\n<!-- Chunk \d+ -->\n*')
+# Page anchors, chunk markers, fences (headings inside code blocks are ignored) and ATX headings
+OUTLINE_PATTERN = re.compile(
+    r'^(?:<a id="page-(?P<page>\d+)"></a>'
+    r'|<!-- Chunk (?P<chunk>\d+) -->'
+    r'|(?P<fence>```|~~~)[^\n]*'
+    r'|(?P<hashes>#{1,6})[ \t]+(?P<title>[^\n]*?)[ \t#]*)$',
+    re.MULTILINE
+)
+PROBE_LENGTH = 40  # Characters of a content_list block searched for in the Markdown
+FENCE_PREFIXES = ("```", "~~~")
+MATH_DELIMITER = "$$"
+EXTERNAL_PREFIXES = ('http://', 'https://', 'data:', '//')
+
+
+class ImageRef(NamedTuple):
+    """An image path found in Markdown; start/end delimit the path itself."""
+    path: str
+    start: int
+    end: int
+    html: bool
+
+
+def find_image_refs(md_content: str) -> List[ImageRef]:
+    """Find every Markdown and HTML image reference in one pass.
+
+    Args:
+        md_content: Markdown content string
+
+    Returns:
+        References in document order, including URLs
+    """
+    refs = []
+    for match in IMAGE_REF_PATTERN.finditer(md_content):
+        for group in PATH_GROUPS:
+            path = match.group(group)
+            if path is not None:
+                refs.append(ImageRef(path, match.start(group), match.end(group), group not in ("md_angle", "md")))
+                break
+    return refs
+
+
+def is_local_ref(path: str) -> bool:
+    """True for references to files (not URLs, data URIs or empty paths)."""
+    return bool(path) and not path.lower().startswith(EXTERNAL_PREFIXES)
+
+
+def rewrite_image_refs(
+    md_content: str,
+    refs: List[ImageRef],
+    path_map: Dict[str, str]
+) -> str:
+    """Replace the paths of refs found in path_map, keeping everything else.
+
+    Args:
+        md_content: Content refs were found in
+        refs: Output of find_image_refs(md_content)
+        path_map: Old path -> new path
+
+    Returns:
+        Updated content
+    """
+    parts = []
+    position = 0
+    for ref in refs:
+        new_path = path_map.get(ref.path)
+        if new_path is None:
+            continue
+        parts.append(md_content[position:ref.start])
+        parts.append(new_path)
+        position = ref.end
+
+    if not parts:
+        return md_content
+    parts.append(md_content[position:])
+    return "".join(parts)
 
 
 def extract_images_from_markdown(md_content: str) -> List[str]:
@@ -23,63 +150,365 @@ def extract_images_from_markdown(md_content: str) -> List[str]:
         md_content: Markdown content string
 
     Returns:
-        List of image paths/URLs found in the content
+        List of image paths/URLs found in the content, in document order
     """
-    # Match both ![alt](path) and <img src="path"> formats
-    patterns = [
-        r'!\[([^\]]*)\]\(([^)]+)\)',  # ![alt](path)
-        r'<img[^>]+src=["\']([^"\']+)["\']',  # <img src="path">
-    ]
-
-    images = []
-    for pattern in patterns:
-        matches = re.findall(pattern, md_content)
-        if matches:
-            # Handle tuple matches from first pattern
-            if isinstance(matches[0], tuple):
-                images.extend([m[1] for m in matches])
-            else:
-                images.extend(matches)
-
-    return images
+    return [ref.path for ref in find_image_refs(md_content)]
 
 
 def update_image_paths(
     md_content: str,
     old_base: str,
     new_base: str,
-    chunk_num: int
+    chunk_num: int,
+    path_map: Optional[Dict[str, str]] = None
 ) -> str:
-    """Update image paths in Markdown content.
+    """Update image paths (Markdown and HTML) in Markdown content.
 
     Args:
         md_content: Markdown content string
         old_base: Original base path for images
         new_base: New base path for images
         chunk_num: Chunk number for unique naming
+        path_map: Explicit old path -> new path mapping; when given, only
+            references in the map are rewritten
 
     Returns:
         Updated Markdown content
     """
-    def replace_path(match):
-        alt_text = match.group(1)
-        old_path = match.group(2)
+    refs = find_image_refs(md_content)
 
-        # Skip URLs
-        if old_path.startswith(('http://', 'https://')):
-            return match.group(0)
+    if path_map is None:
+        # Add chunk prefix to avoid conflicts
+        path_map = {
+            ref.path: f"{new_base}/chunk{chunk_num}_{Path(ref.path).name}"
+            for ref in refs if is_local_ref(ref.path)
+        }
 
-        # Get just the filename
-        filename = Path(old_path).name
+    return rewrite_image_refs(md_content, refs, path_map)
 
-        # Add chunk prefix to avoid conflicts
-        new_filename = f"chunk{chunk_num}_{filename}"
-        new_path = f"{new_base}/{new_filename}"
 
-        return f"![{alt_text}]({new_path})"
+def file_digest(path: Union[str, Path]) -> Tuple[int, str]:
+    """Return (size, SHA-256) of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return os.path.getsize(path), digest.hexdigest()
+
+
+def place_image(src: Path, dest: Path, mode: str = "copy") -> None:
+    """Copy, hardlink or move an image to dest, replacing any existing file.
+
+    Hardlinks and moves fall back to copying when src and dest are on
+    different filesystems.
+    """
+    if mode == "copy":
+        shutil.copy2(src, dest)
+        return
+
+    try:
+        dest.unlink()
+    except FileNotFoundError:
+        pass
+
+    try:
+        if mode == "hardlink":
+            os.link(src, dest)
+        else:
+            os.replace(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+        if mode == "move":
+            src.unlink()
+
+
+def _resolve_image(input_dir: Path, img_ref: str) -> Optional[Path]:
+    """Find the file an image reference points to, relative to its chunk.
+
+    MinerU results keep images in images/ next to the Markdown file; other
+    layouts fall back to matching the file name one or two levels up.
+    """
+    img_path = input_dir / img_ref.split('#', 1)[0].split('?', 1)[0]
+    if img_path.is_file():
+        return img_path
+
+    # Try looking in parent directories
+    for parent in [input_dir.parent, input_dir.parent.parent]:
+        candidate = parent / Path(img_ref).name
+        if candidate.is_file():
+            return candidate
+
+    return None
+
+
+def load_content_list(md_path: Path) -> Optional[List[Dict[str, Any]]]:
+    """Load the MinerU *_content_list.json next to a chunk's Markdown, if any."""
+    for candidate in sorted(md_path.parent.glob("*content_list.json")):
+        try:
+            with open(candidate, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, list):
+            return data
+    return None
+
+
+def _block_probe(block: Dict[str, Any]) -> Optional[str]:
+    """A string from a content_list block that appears verbatim in full.md.
+
+    Display math is probed by its first LaTeX line: the bare ``$$`` opening
+    it would match the closing delimiter of the equation before.
+    """
+    if block.get("img_path"):
+        return posixpath.basename(block["img_path"])
+    lines = [line.strip() for line in (block.get("text") or "").strip().split("\n")]
+    for line in lines:
+        if line.startswith(MATH_DELIMITER):
+            line = line[len(MATH_DELIMITER):]
+        if line.endswith(MATH_DELIMITER):
+            line = line[:-len(MATH_DELIMITER)]
+        line = line.strip()
+        if line:
+            return line[:PROBE_LENGTH]
+    return None
+
+
+def _block_spans(content: str) -> List[Tuple[int, int]]:
+    """(start, end) of every fenced code block and ``$$`` display math block.
+
+    Both run from the start of their opening line to the end of their
+    closing line (or the end of content if unclosed). A page anchor inside
+    one would break it.
+    """
+    spans = []
+    opener: Optional[str] = None
+    span_start = 0
+    position = 0
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        line_end = position + len(line)
+        if opener is None:
+            if stripped.startswith(FENCE_PREFIXES):
+                opener, span_start = stripped[:3], position
+            elif stripped.startswith(MATH_DELIMITER) and not (
+                len(stripped) > 2 * len(MATH_DELIMITER) - 1 and stripped.endswith(MATH_DELIMITER)
+            ):
+                opener, span_start = MATH_DELIMITER, position
+        elif (stripped.startswith(opener) if opener != MATH_DELIMITER else stripped.endswith(MATH_DELIMITER)):
+            spans.append((span_start, line_end))
+            opener = None
+        position = line_end
+    if opener is not None:
+        spans.append((span_start, len(content)))
+    return spans
+
+
+def locate_page_starts(content: str, content_list: List[Dict[str, Any]]) -> Dict[int, int]:
+    """Find where each chunk-local page starts in a chunk's Markdown.
+
+    Blocks are matched in order, each search starting after the previous
+    match, and a page starts at the beginning of the line holding its first
+    matched block. A start inside a fenced code or ``$$`` math block moves
+    to the line opening that block. Pages whose blocks cannot be found get
+    no entry.
+
+    Returns:
+        {page_idx (0-based): character offset of the page's first line}
+    """
+    starts: Dict[int, int] = {}
+    cursor = 0
+    last_start = -1
+    spans = _block_spans(content)
+    span_starts = [start for start, _ in spans]
+
+    for block in content_list:
+        probe = _block_probe(block)
+        if not probe:
+            continue
+        found = content.find(probe, cursor)
+        if found < 0:
+            continue
+        cursor = found + len(probe)
+
+        page = block.get("page_idx")
+        if not isinstance(page, int) or page in starts:
+            continue
+        line_start = content.rfind("\n", 0, found) + 1
+        inside = bisect.bisect_right(span_starts, line_start) - 1
+        if inside >= 0 and line_start < spans[inside][1]:
+            line_start = spans[inside][0]
+        if line_start > last_start:
+            starts[page] = line_start
+            last_start = line_start
+
+    return starts
+
 
-    pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    return re.sub(pattern, replace_path, md_content)
+def page_anchor_edits(
+    content: str,
+    content_list: Optional[List[Dict[str, Any]]],
+    pages: List[int]
+) -> List[Tuple[int, int, str]]:
+    """Edits inserting a page anchor at each located page start.
+
+    Args:
+        content: A MinerU result's Markdown
+        content_list: Its content list (None: anchor only the first page)
+        pages: Source page number of each result page (page_idx -> pages[page_idx])
+
+    Returns:
+        (position, position, anchor) insertions for _splice()
+    """
+    page_starts = locate_page_starts(content, content_list) if content_list else {}
+    page_starts.setdefault(0, 0)
+    return [
+        (start, start, PAGE_ANCHOR.format(page=pages[page_idx]) + "\n\n")
+        for page_idx, start in page_starts.items()
+        if page_idx < len(pages)
+    ]
+
+
+def _splice(content: str, edits: List[Tuple[int, int, str]]) -> str:
+    """Apply (start, end, replacement) edits given in original positions."""
+    if not edits:
+        return content
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda e: (e[0], e[1])):
+        parts.append(content[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(content[position:])
+    return "".join(parts)
+
+
+class _IndexWriter:
+    """Collects page anchors and headings with byte offsets while writing."""
+
+    def __init__(self):
+        self.pages: List[Dict[str, Any]] = []
+        self.headings: List[Dict[str, Any]] = []
+        self.chunks: List[Dict[str, Any]] = []
+        self.byte_offset = 0
+        self.line = 1
+
+    def start_chunk(
+        self,
+        chunk_num: int,
+        page_range: Optional[Tuple[int, int]],
+        byte_offset: int,
+        line: int
+    ) -> None:
+        self.chunks.append({
+            "index": chunk_num,
+            "start_page": page_range[0] if page_range else None,
+            "end_page": page_range[1] if page_range else None,
+            "byte_offset": byte_offset,
+            "line": line,
+        })
+
+    def scan(
+        self,
+        text: str,
+        byte_offset: int,
+        line: int,
+        chunk_num: int,
+        current_page: Optional[int],
+        chunk_pages: Optional[Dict[int, Tuple[int, int]]] = None
+    ) -> None:
+        """Record the page anchors, headings and chunk markers of text.
+
+        Args:
+            text: Text that starts at byte_offset / line of the output
+            chunk_num: Chunk the text belongs to (until a chunk marker)
+            current_page: Page in effect at the start of text
+            chunk_pages: Page range of each chunk, for chunk markers met
+        """
+        in_fence = False
+        position = 0
+
+        for match in OUTLINE_PATTERN.finditer(text):
+            # Advance offsets incrementally so the text is encoded once overall
+            segment = text[position:match.start()]
+            byte_offset += len(segment.encode('utf-8'))
+            line += segment.count("\n")
+            position = match.start()
+
+            if match.group("fence"):
+                in_fence = not in_fence
+            elif in_fence:
+                continue
+            elif match.group("page"):
+                current_page = int(match.group("page"))
+                self.pages.append({"page": current_page, "byte_offset": byte_offset, "line": line})
+            elif match.group("chunk"):
+                # The chunk's content starts after the marker and its blank lines
+                chunk_num = int(match.group("chunk"))
+                end = match.end()
+                blank = len(text) - len(text[end:].lstrip("\n")) - end
+                page_range = (chunk_pages or {}).get(chunk_num)
+                self.start_chunk(
+                    chunk_num,
+                    page_range,
+                    byte_offset + len(match.group(0).encode('utf-8')) + blank,
+                    line + blank
+                )
+                if page_range:
+                    current_page = page_range[0]
+            else:
+                self.headings.append({
+                    "level": len(match.group("hashes")),
+                    "title": match.group("title"),
+                    "byte_offset": byte_offset,
+                    "line": line,
+                    "page": current_page,
+                    "chunk": chunk_num,
+                })
+
+    def write_chunk(self, out, text: str, chunk_num: int, pages: Optional[List[int]]) -> None:
+        """Write one chunk's text, recording its outline."""
+        self.start_chunk(chunk_num, (pages[0], pages[-1]) if pages else None, self.byte_offset, self.line)
+        self.scan(text, self.byte_offset, self.line, chunk_num, pages[0] if pages else None)
+        self.write(out, text)
+
+    def write(self, out, text: str) -> None:
+        data = text.encode('utf-8')
+        out.write(data)
+        self.byte_offset += len(data)
+        self.line += text.count("\n")
+
+    def to_dict(self, markdown_path: Path) -> Dict[str, Any]:
+        return {
+            "markdown": markdown_path.name,
+            "bytes": self.byte_offset,
+            "pages": self.pages,
+            "headings": self.headings,
+            "chunks": self.chunks,
+        }
+
+
+def build_index(
+    md_content: str,
+    markdown_path: Union[str, Path],
+    chunk_pages: Optional[Dict[int, Tuple[int, int]]] = None
+) -> Dict[str, Any]:
+    """Build the merge index (page anchors, headings, chunks) of existing Markdown.
+
+    Args:
+        md_content: Full Markdown content
+        markdown_path: Markdown file the index refers to
+        chunk_pages: Page range of each chunk number, if known
+
+    Returns:
+        Index dictionary in the merge_markdown_files(index_path=...) format
+    """
+    writer = _IndexWriter()
+    first_range = (chunk_pages or {}).get(1)
+    writer.start_chunk(1, first_range, 0, 1)
+    writer.scan(md_content, 0, 1, 1, first_range[0] if first_range else None, chunk_pages)
+    writer.byte_offset = len(md_content.encode('utf-8'))
+    return writer.to_dict(Path(markdown_path))
 
 
 def merge_markdown_files(
@@ -87,82 +516,134 @@ def merge_markdown_files(
     output_path: Union[str, Path],
     add_page_markers: bool = True,
     copy_images: bool = True,
-    images_subdir: str = "images"
+    images_subdir: str = "images",
+    image_mode: str = "copy",
+    page_numbers: Optional[List[List[int]]] = None,
+    index_path: Optional[Union[str, Path]] = None
 ) -> str:
     """Merge multiple Markdown files into one.
 
+    Chunks are read and written one at a time, so memory use is bounded by
+    the largest chunk. Referenced images are hashed on a thread pool (the
+    next chunk's images while the current chunk is written); each distinct
+    image is placed in images_subdir once and every reference to an
+    identical image, in any chunk, points at that one file.
+
     Args:
         input_files: List of paths to Markdown files to merge
         output_path: Path for the merged output file
         add_page_markers: Add chunk/page markers between sections
         copy_images: Copy referenced images to output directory
         images_subdir: Subdirectory name for images
+        image_mode: How images are placed: "copy", "hardlink" (no data copied,
+            sources kept) or "move" (sources removed)
+        page_numbers: Source page number of each page of each input file
+            (e.g. the chunk's page range); enables page anchors
+        index_path: Write a JSON index of page anchors, headings and chunks
+            with byte offsets to this file
 
     Returns:
         Path to the merged Markdown file
     """
+    if image_mode not in IMAGE_MODES:
+        raise ValueError(f"Unknown image mode: {image_mode}")
+
     output_path_obj = Path(output_path)
     output_dir = output_path_obj.parent
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Create images directory if copying images
+    images_dir = output_dir / images_subdir
     if copy_images:
-        images_dir = output_dir / images_subdir
         images_dir.mkdir(parents=True, exist_ok=True)
 
-    merged_content = []
-
-    for i, input_file in enumerate(input_files):
-        input_path = Path(input_file)
+    pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS)
+    placed: Dict[Tuple[int, str], str] = {}  # (size, sha256) -> merged image path
+    placements: List[Future] = []
 
-        if not input_path.exists():
-            continue
-
-        # Read content
+    def prepare(chunk_num: int, input_path: Path):
+        """Read a chunk and start hashing the images it references."""
         with open(input_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        # Add page marker
-        if add_page_markers and i > 0:
-            merged_content.append(f"\n\n---\n\n<!-- Chunk {i + 1} -->\n\n")
-
-        # Handle images
-        if copy_images:
-            # Find and copy images
-            images = extract_images_from_markdown(content)
-            input_dir = input_path.parent
-
-            for img_ref in images:
-                # Skip URLs
-                if img_ref.startswith(('http://', 'https://')):
-                    continue
-
-                # Find source image
-                img_path = input_dir / img_ref
-                if not img_path.exists():
-                    # Try looking in parent directories
-                    for parent in [input_dir.parent, input_dir.parent.parent]:
-                        candidate = parent / Path(img_ref).name
-                        if candidate.exists():
-                            img_path = candidate
-                            break
-
-                if img_path.exists():
-                    # Copy with unique name
-                    new_name = f"chunk{i + 1}_{img_path.name}"
-                    dest_path = images_dir / new_name
-                    shutil.copy2(img_path, dest_path)
-
-            # Update image references in content
-            content = update_image_paths(content, str(input_dir), images_subdir, i + 1)
-
-        merged_content.append(content.strip())
-
-    # Write merged file
-    final_content = "\n\n".join(merged_content)
-
-    with open(output_path_obj, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+        refs = find_image_refs(content) if copy_images else []
+        hashes: Dict[str, Tuple[Path, Future]] = {}
+        input_dir = input_path.parent
+        for ref in refs:
+            # Skip URLs
+            if not is_local_ref(ref.path) or ref.path in hashes:
+                continue
+            img_path = _resolve_image(input_dir, ref.path)
+            if img_path is not None:
+                hashes[ref.path] = (img_path, pool.submit(file_digest, img_path))
+
+        anchors = []
+        if page_numbers is not None:
+            anchors = page_anchor_edits(content, load_content_list(input_path), page_numbers[chunk_num - 1])
+
+        return chunk_num, content, refs, hashes, anchors
+
+    if page_numbers is not None and len(page_numbers) != len(input_files):
+        raise ValueError("page_numbers needs one entry per input file")
+
+    chunks = [
+        (i + 1, Path(input_file))
+        for i, input_file in enumerate(input_files)
+        if Path(input_file).exists()
+    ]
+    pending: Deque = deque()
+    index = _IndexWriter()
+
+    try:
+        with open(output_path_obj, 'wb') as out:
+            first = True
+            for position in range(len(chunks)):
+                # Keep one chunk of look-ahead so its images hash while this one is written
+                while len(pending) < 2 and position + len(pending) < len(chunks):
+                    pending.append(prepare(*chunks[position + len(pending)]))
+                chunk_num, content, refs, hashes, anchors = pending.popleft()
+                pages = page_numbers[chunk_num - 1] if page_numbers is not None else None
+
+                # Add page marker
+                if not first:
+                    index.write(out, "\n\n")
+                    if add_page_markers:
+                        index.write(out, f"\n\n---\n\n<!-- Chunk {chunk_num} -->\n\n")
+                        index.write(out, "\n\n")
+
+                # Page anchors (chunk-local page_idx -> global page number)
+                edits = list(anchors)
+
+                if copy_images:
+                    path_map = {}
+                    for img_ref, (img_path, digest_future) in hashes.items():
+                        key = digest_future.result()
+                        if key not in placed:
+                            # First occurrence keeps a chunk-prefixed name
+                            new_name = f"chunk{chunk_num}_{img_path.name}"
+                            placed[key] = f"{images_subdir}/{new_name}"
+                            placements.append(
+                                pool.submit(place_image, img_path, images_dir / new_name, image_mode)
+                            )
+                        path_map[img_ref] = placed[key]
+
+                    # Rewrite image references at the positions found by the same scan
+                    edits.extend(
+                        (ref.start, ref.end, path_map[ref.path])
+                        for ref in refs if ref.path in path_map
+                    )
+
+                index.write_chunk(out, _splice(content, edits).strip(), chunk_num, pages)
+                first = False
+
+        for future in placements:
+            future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    if index_path:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index.to_dict(output_path_obj), f, indent=2, ensure_ascii=False)
 
     return str(output_path_obj)
 
@@ -210,7 +691,6 @@ def merge_with_metadata(
 
 if __name__ == "__main__":
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(description="Merge Markdown files")
     parser.add_argument(
@@ -233,6 +713,22 @@ if __name__ == "__main__":
         action="store_true",
         help="Don't copy images to output directory"
     )
+    parser.add_argument(
+        "--image-mode",
+        default="copy",
+        choices=IMAGE_MODES,
+        help="Copy, hardlink or move images into the output (default: copy)"
+    )
+    parser.add_argument(
+        "--chunk-pages",
+        nargs="+",
+        metavar="START-END",
+        help="Source page range of each input file (e.g. 1-390 391-845); adds page anchors"
+    )
+    parser.add_argument(
+        "--index",
+        help="Write a JSON index of page anchors and headings with byte offsets"
+    )
     parser.add_argument(
         "--with-metadata",
         action="store_true",
@@ -256,7 +752,13 @@ if __name__ == "__main__":
             args.input_files,
             args.output,
             add_page_markers=not args.no_page_markers,
-            copy_images=not args.no_copy_images
+            copy_images=not args.no_copy_images,
+            image_mode=args.image_mode,
+            page_numbers=[
+                list(range(int(start), int(end or start) + 1))
+                for start, _, end in (r.partition("-") for r in args.chunk_pages)
+            ] if args.chunk_pages else None,
+            index_path=args.index
         )
 
     output = {
@@ -264,4 +766,6 @@ if __name__ == "__main__":
         "output_file": result,
         "input_count": len(args.input_files)
     }
+    if args.index and not args.with_metadata:
+        output["index_file"] = args.index
     print(json.dumps(output, indent=2))
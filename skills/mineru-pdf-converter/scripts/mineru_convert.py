@@ -13,18 +13,31 @@ Usage:
 import argparse
 import json
 import os
+import posixpath
 import re
 import sys
-import time
+import tempfile
+import threading
 import zipfile
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Callable, Union
+from typing import Optional, List, Dict, Any, Callable, Tuple, Union
 
 import requests
 
+# Sibling helper modules
+sys.path.insert(0, str(Path(__file__).parent))
+from job_manifest import remove_page_map, save_page_map  # noqa: E402
+from job_poller import JobPoller, PollJob  # noqa: E402
+from merge_markdown import find_image_refs, is_local_ref  # noqa: E402
+from rate_limiter import (  # noqa: E402
+    MinerUError, RateLimitError, RateLimiter, configure_shared_limiter, get_shared_limiter
+)
+from tracing import NULL_TRACER, Tracer  # noqa: E402
+
 # Optional: For large PDF handling
 try:
     import fitz  # PyMuPDF
+    from pdf_splitter import PDFInspection
     HAS_PYMUPDF = True
 except ImportError:
     HAS_PYMUPDF = False
@@ -33,7 +46,17 @@ except ImportError:
 # API Configuration
 API_BASE = "https://mineru.net/api/v4"
 MAX_PAGES_PER_TASK = 600
-SPLIT_CHUNK_SIZE = 500
+API_MAX_RETRIES = 3  # Retries after a 429 response
+API_RETRY_BACKOFF = 5  # Seconds, doubled per retry when no Retry-After header
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024  # API file size limit
+SPLIT_CHUNK_SIZE = 500  # Max pages per chunk
+SPLIT_CHUNK_BYTES = 150 * 1024 * 1024  # Target max chunk size (headroom below the upload limit)
+
+# Result download
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB reads from the response stream
+SPOOL_MAX_SIZE = 64 * 1024 * 1024  # Keep result ZIPs up to 64 MB in memory
+EXTRA_FORMAT_SUFFIXES = ('.tex', '.docx', '.html')
+CONTENT_LIST_SUFFIX = 'content_list.json'
 
 
 def load_token(token_file: str) -> str:
@@ -56,15 +79,100 @@ def load_token(token_file: str) -> str:
     return content.strip()
 
 
+def coalesce_pages(pages: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted page numbers into contiguous (first, last) runs.
+
+    Examples:
+        [0, 1, 2, 5, 7, 8] -> [(0, 2), (5, 5), (7, 8)]
+    """
+    runs: List[Tuple[int, int]] = []
+    for page in pages:
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def parse_page_ranges(page_ranges: str) -> List[int]:
+    """Parse page ranges string into list of page numbers.
+
+    Examples:
+        "1-5" -> [1, 2, 3, 4, 5]
+        "1,3,5-7" -> [1, 3, 5, 6, 7]
+        "10-5" -> [5, 6, 7, 8, 9, 10] (handles reversed ranges)
+    """
+    pages = []
+    for part in page_ranges.split(','):
+        part = part.strip()
+        if '-' in part:
+            # Handle range
+            start, end = part.split('-', 1)
+            start = int(start.strip())
+            end = int(end.strip())
+            if start > end:
+                start, end = end, start
+            pages.extend(range(start, end + 1))
+        else:
+            # Single page
+            pages.append(int(part))
+    return sorted(set(pages))
+
+
 class MinerUConverter:
     """MinerU API converter client."""
 
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        limiter: Optional[RateLimiter] = None,
+        api_base: str = API_BASE
+    ):
         self.token = token
+        self.api_base = api_base.rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        # Shared by all converters in the process unless one is given
+        self.limiter = limiter or get_shared_limiter()
+        # Tracer of the convert() call running on each thread
+        self._local = threading.local()
+        # Pages reserved for batch_ids/task_ids submitted by this converter
+        self._reserved: Dict[str, int] = {}
+
+    @property
+    def tracer(self) -> Tracer:
+        """Tracer for the current thread's convert() call (a no-op outside one)."""
+        return getattr(self._local, "tracer", None) or NULL_TRACER
+
+    def _api_request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        """Make a rate-limited MinerU API request and return the JSON body.
+
+        Waits for the shared rate limiter before every request. A 429 response
+        pauses the limiter for all callers (honouring Retry-After) and the
+        request is retried up to API_MAX_RETRIES times.
+
+        Raises:
+            RateLimitError: If the API still throttles after all retries
+        """
+        for attempt in range(API_MAX_RETRIES + 1):
+            self.limiter.acquire()
+            self.tracer.count("api_requests")
+            response = requests.request(method, f"{self.api_base}{path}", headers=self.headers, **kwargs)
+
+            if response.status_code != 429:
+                response.raise_for_status()
+                return response.json()
+
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                retry_after = API_RETRY_BACKOFF * (2 ** attempt)
+            self.tracer.count("api_retries")
+            self.limiter.throttled(retry_after)
+
+        raise RateLimitError(f"MinerU API rate limit exceeded for {path} after {API_MAX_RETRIES} retries")
 
     def upload_file(
         self,
@@ -74,13 +182,20 @@ class MinerUConverter:
         language: str = "ch",
         enable_formula: bool = True,
         enable_table: bool = True,
-        is_ocr: bool = False
+        is_ocr: bool = False,
+        content: Optional[bytes] = None,
+        pages: Optional[int] = None
     ) -> str:
         """Upload local file and return batch_id.
 
         Uses the batch upload API to get a presigned URL,
         uploads the file, then returns the batch_id for polling results.
 
+        If content is given, it is uploaded as-is and file_path only supplies
+        the file name (used for in-memory chunks). If pages is given, it is
+        charged to the daily page quota before anything is sent, and refunded
+        if the upload fails or the batch later fails (see _settle_job).
+
         Note: For local file uploads, tasks are auto-created by the system.
         Use poll_batch_result() to get the conversion results.
         """
@@ -103,50 +218,81 @@ class MinerUConverter:
         if is_ocr:
             payload["is_ocr"] = True
 
-        response = requests.post(
-            f"{API_BASE}/file-urls/batch",
-            headers=self.headers,
-            json=payload
-        )
-        response.raise_for_status()
-        result = response.json()
+        if pages:
+            with self.tracer.span("quota", pages=pages):
+                self.limiter.reserve_pages(pages)
 
-        if result.get("code") != 0:
-            raise Exception(f"Failed to get upload URL: {result.get('msg')}")
+        try:
+            with self.tracer.span("upload_url", file=file_name):
+                result = self._api_request("POST", "/file-urls/batch", json=payload)
 
-        batch_id = result["data"]["batch_id"]
-        file_urls = result["data"]["file_urls"]
+            if result.get("code") != 0:
+                raise MinerUError(f"Failed to get upload URL: {result.get('msg')}")
 
-        # file_urls is a list of presigned URLs (strings)
-        if not file_urls:
-            raise Exception("No upload URLs returned from API")
+            batch_id = result["data"]["batch_id"]
+            file_urls = result["data"]["file_urls"]
 
-        upload_url = file_urls[0]
+            # file_urls is a list of presigned URLs (strings)
+            if not file_urls:
+                raise MinerUError("No upload URLs returned from API")
 
-        # Step 2: Upload file content
-        # IMPORTANT: Do NOT set Content-Type header - it breaks the OSS signature
-        with open(file_path_obj, 'rb') as f:
-            file_content = f.read()
+            upload_url = file_urls[0]
 
-        upload_response = requests.put(
-            upload_url,
-            data=file_content,
-            timeout=120
-        )
-        upload_response.raise_for_status()
+            # Step 2: Upload file content
+            # IMPORTANT: Do NOT set Content-Type header - it breaks the OSS signature
+            with self.tracer.span("upload", file=file_name, batch_id=batch_id, pages=pages) as span:
+                if content is None:
+                    with open(file_path_obj, 'rb') as f:
+                        content = f.read()
+                span["bytes"] = len(content)
 
+                upload_response = requests.put(
+                    upload_url,
+                    data=content,
+                    timeout=120
+                )
+                upload_response.raise_for_status()
+        except Exception:
+            # Nothing was converted: give the pages back
+            if pages:
+                self.limiter.release_pages(pages)
+            raise
+
+        if pages:
+            self._reserved[batch_id] = pages
         return batch_id
 
+    def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch the current state of a batch once.
+
+        Returns:
+            The first file's extract result (state, extract_progress,
+            full_zip_url, ...), or None if no result is listed yet
+        """
+        result = self._api_request("GET", f"/extract-results/batch/{batch_id}")
+
+        if result.get("code") != 0:
+            raise MinerUError(f"Failed to get batch status: {result.get('msg')}")
+
+        data = result.get("data", {})
+        extract_results = data.get("extract_result", [])
+
+        # Get the first result (we upload one file at a time)
+        return extract_results[0] if extract_results else None
+
     def poll_batch_result(
         self,
         batch_id: str,
         max_wait: int = 600,
         callback: Optional[Callable[..., Any]] = None
     ) -> Dict[str, Any]:
-        """Poll batch result status with exponential backoff.
+        """Poll batch result status until done.
 
         For local file uploads, tasks are auto-created by the system.
         This method polls the batch result endpoint to get conversion results.
+        Polling uses JobPoller, so the interval follows the reported
+        extraction rate (see job_poller.py); use JobPoller directly to watch
+        several batches at once.
 
         Args:
             batch_id: The batch ID from upload_file()
@@ -160,43 +306,15 @@ class MinerUConverter:
             TimeoutError: If polling exceeds max_wait
             Exception: If task fails
         """
-        start = time.time()
-        interval = 2  # Start with 2 seconds
-        max_interval = 30
-
-        while time.time() - start < max_wait:
-            response = requests.get(
-                f"{API_BASE}/extract-results/batch/{batch_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if result.get("code") != 0:
-                raise Exception(f"Failed to get batch status: {result.get('msg')}")
-
-            data = result.get("data", {})
-            extract_results = data.get("extract_result", [])
-
-            if extract_results:
-                # Get the first result (we upload one file at a time)
-                file_result = extract_results[0]
-                state = file_result.get("state")
-
-                if callback:
-                    callback(state, file_result)
-
-                if state == "done":
-                    return file_result
-                elif state == "failed":
-                    error_msg = file_result.get("err_msg", "Unknown error")
-                    raise Exception(f"Batch task failed: {error_msg}")
-
-            # States: pending, running, converting
-            time.sleep(interval)
-            interval = min(interval * 2, max_interval)
-
-        raise TimeoutError(f"Batch polling timed out after {max_wait} seconds")
+        poller = JobPoller(self)
+        job = poller.add_batch(batch_id, max_wait=max_wait, callback=callback)
+        with self.tracer.span("poll", batch_id=batch_id) as span:
+            try:
+                return poller.wait(job)
+            finally:
+                span["polls"] = job.polls
+                self._trace_job(job, f"batch {batch_id}", batch_id=batch_id)
+                self._settle_job(job)
 
     def submit_task(
         self,
@@ -207,9 +325,14 @@ class MinerUConverter:
         enable_formula: bool = True,
         enable_table: bool = True,
         is_ocr: bool = False,
-        page_ranges: Optional[str] = None
+        page_ranges: Optional[str] = None,
+        pages: Optional[int] = None
     ) -> str:
-        """Submit conversion task, return task_id."""
+        """Submit conversion task, return task_id.
+
+        If pages is given, it is charged to the daily page quota first, and
+        refunded if the submission fails or the task later fails.
+        """
 
         payload = {
             "url": url,
@@ -228,18 +351,34 @@ class MinerUConverter:
         if page_ranges:
             payload["page_ranges"] = page_ranges
 
-        response = requests.post(
-            f"{API_BASE}/extract/task",
-            headers=self.headers,
-            json=payload
-        )
-        response.raise_for_status()
-        result = response.json()
+        if pages:
+            with self.tracer.span("quota", pages=pages):
+                self.limiter.reserve_pages(pages)
+
+        try:
+            with self.tracer.span("submit", url=url, pages=pages):
+                result = self._api_request("POST", "/extract/task", json=payload)
+
+            if result.get("code") != 0:
+                raise MinerUError(f"Failed to submit task: {result.get('msg')}")
+        except Exception:
+            if pages:
+                self.limiter.release_pages(pages)
+            raise
+
+        task_id = result["data"]["task_id"]
+        if pages:
+            self._reserved[task_id] = pages
+        return task_id
+
+    def get_task_status(self, task_id: str) -> Dict[str, Any]:
+        """Fetch the current state of a task once."""
+        result = self._api_request("GET", f"/extract/task/{task_id}")
 
         if result.get("code") != 0:
-            raise Exception(f"Failed to submit task: {result.get('msg')}")
+            raise MinerUError(f"Failed to get task status: {result.get('msg')}")
 
-        return result["data"]["task_id"]
+        return result.get("data", {})
 
     def poll_task(
         self,
@@ -247,7 +386,7 @@ class MinerUConverter:
         max_wait: int = 600,
         callback: Optional[Callable[..., Any]] = None
     ) -> Dict[str, Any]:
-        """Poll task status with exponential backoff.
+        """Poll task status until done (adaptive interval, see JobPoller).
 
         Args:
             task_id: The task ID to poll
@@ -261,51 +400,65 @@ class MinerUConverter:
             TimeoutError: If polling exceeds max_wait
             Exception: If task fails
         """
-        start = time.time()
-        interval = 2  # Start with 2 seconds
-        max_interval = 30
-
-        while time.time() - start < max_wait:
-            response = requests.get(
-                f"{API_BASE}/extract/task/{task_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if result.get("code") != 0:
-                raise Exception(f"Failed to get task status: {result.get('msg')}")
-
-            data = result.get("data", {})
-            state = data.get("state")
-
-            if callback:
-                callback(state, data)
+        poller = JobPoller(self)
+        job = poller.add_task(task_id, max_wait=max_wait, callback=callback)
+        with self.tracer.span("poll", task_id=task_id) as span:
+            try:
+                return poller.wait(job)
+            finally:
+                span["polls"] = job.polls
+                self._trace_job(job, f"task {task_id}", task_id=task_id)
+                self._settle_job(job)
 
-            if state == "done":
-                return data
-            elif state == "failed":
-                error_msg = data.get("err_msg", "Unknown error")
-                raise Exception(f"Task failed: {error_msg}")
+    def _settle_job(self, job: PollJob) -> None:
+        """Refund the pages reserved for a job the server reported as failed.
 
-            # States: pending, running, converting
-            time.sleep(interval)
-            interval = min(interval * 2, max_interval)
+        Jobs that timed out or could not be polled keep their pages, since
+        the server may still convert them.
+        """
+        if not job.finished:
+            return
+        pages = self._reserved.pop(job.job_id, 0)
+        if job.state == "failed":
+            self.limiter.release_pages(pages)
+
+    def _trace_job(self, job: PollJob, lane: str, **args: Any) -> None:
+        """Record a finished job's server-side time on its own trace lane.
+
+        "server" covers submission to completion. When a poll saw the job
+        running, it is split into "server_queued" and "server_converting";
+        both boundaries are only as precise as the poll interval.
+        """
+        if job.finished_at is None:
+            return
 
-        raise TimeoutError(f"Task polling timed out after {max_wait} seconds")
+        self.tracer.record("server", job.started, job.finished_at, lane=lane, state=job.state, **args)
+        if job.running_at is not None:
+            self.tracer.record("server_queued", job.started, job.running_at, lane=lane, **args)
+            self.tracer.record("server_converting", job.running_at, job.finished_at, lane=lane, **args)
 
     def download_result(
         self,
         result_url: str,
         output_dir: Union[str, Path],
-        extract: bool = True
+        extract: bool = True,
+        extract_all: bool = False
     ) -> str:
         """Download and extract result ZIP.
 
+        The ZIP is streamed into a spooled buffer (kept in memory up to
+        SPOOL_MAX_SIZE, then rolled over to an anonymous temp file) and
+        extracted from there, so no intermediate result.zip is written.
+        By default only the main Markdown file, the assets it references, the
+        content list (per-block page indices) and any extra-format outputs
+        (LaTeX, DOCX, HTML) are extracted; layout JSON and the origin PDF are
+        skipped.
+
         Args:
             result_url: URL to download the result ZIP
             output_dir: Directory to save/extract results
             extract: Whether to extract the ZIP file
+            extract_all: Extract every member of the ZIP
 
         Returns:
             Path to the main .md file (if extracted) or ZIP file
@@ -317,41 +470,85 @@ class MinerUConverter:
         response = requests.get(result_url, stream=True)
         response.raise_for_status()
 
-        zip_path = output_dir_path / "result.zip"
-        with open(zip_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
         if not extract:
+            zip_path = output_dir_path / "result.zip"
+            with self.tracer.span("download", bytes=0) as span, open(zip_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    span["bytes"] += len(chunk)
             return str(zip_path)
 
-        # Extract ZIP
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(output_dir_path)
-
-        # Remove ZIP after extraction
-        zip_path.unlink()
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            with self.tracer.span("download", bytes=0) as span:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    buffer.write(chunk)
+                    span["bytes"] += len(chunk)
+            buffer.seek(0)
 
-        # Find the main .md file
-        md_files = list(output_dir_path.glob("*.md"))
-        if md_files:
-            return str(md_files[0])
+            with self.tracer.span("unzip", output_dir=str(output_dir_path)) as span, \
+                    zipfile.ZipFile(buffer, 'r') as zip_ref:
+                main_md, members = self._select_result_members(zip_ref, extract_all)
+                for member in members:
+                    zip_ref.extract(member, output_dir_path)
+                span["members"] = len(members)
+                span["bytes"] = sum(zip_ref.getinfo(m).file_size for m in members)
 
-        # Check subdirectories
-        md_files = list(output_dir_path.glob("**/*.md"))
-        if md_files:
-            return str(md_files[0])
+        if main_md:
+            return str(output_dir_path / main_md)
 
         return str(output_dir_path)
 
+    def _select_result_members(
+        self,
+        zip_ref: zipfile.ZipFile,
+        extract_all: bool = False
+    ) -> Tuple[Optional[str], List[str]]:
+        """Pick the main Markdown file and the members to extract from a result ZIP.
+
+        Returns:
+            Tuple of (main markdown member name or None, member names to extract)
+        """
+        names = [n for n in zip_ref.namelist() if not n.endswith('/')]
+        md_names = [n for n in names if n.lower().endswith('.md')]
+
+        # Prefer full.md, then the shallowest .md file
+        main_md = None
+        if md_names:
+            full = [n for n in md_names if posixpath.basename(n) == "full.md"]
+            main_md = min(full or md_names, key=lambda n: (n.count('/'), n))
+
+        if extract_all:
+            return main_md, names
+
+        wanted = set(md_names)
+        wanted.update(n for n in names if n.lower().endswith(EXTRA_FORMAT_SUFFIXES))
+        # Block-level page indices, used for page anchors when merging chunks
+        wanted.update(n for n in names if n.endswith(CONTENT_LIST_SUFFIX))
+
+        # Assets referenced by the markdown, resolved relative to its directory
+        name_set = set(names)
+        for md_name in md_names:
+            content = zip_ref.read(md_name).decode('utf-8', errors='replace')
+            md_dir = posixpath.dirname(md_name)
+            for ref in find_image_refs(content):
+                if not is_local_ref(ref.path):
+                    continue
+                member = posixpath.normpath(posixpath.join(md_dir, ref.path))
+                if member in name_set:
+                    wanted.add(member)
+
+        return main_md, [n for n in names if n in wanted]
+
     def get_page_count(self, pdf_path: str) -> int:
         """Get page count of a PDF file using PyMuPDF."""
         if not HAS_PYMUPDF:
             raise ImportError("PyMuPDF (fitz) is required for page counting. Install with: pip install pymupdf")
 
-        doc = fitz.open(pdf_path)
-        page_count = len(doc)
-        doc.close()
+        with self.tracer.span("inspect", file=str(pdf_path)) as span:
+            doc = fitz.open(pdf_path)
+            page_count = len(doc)
+            doc.close()
+            span["pages"] = page_count
         return page_count
 
     def extract_pages(self, pdf_path: str, page_ranges: str, output_path: Optional[str] = None) -> str:
@@ -365,63 +562,72 @@ class MinerUConverter:
         Returns:
             Path to the extracted PDF file
         """
-        if not HAS_PYMUPDF:
-            raise ImportError("PyMuPDF (fitz) is required for page extraction. Install with: pip install pymupdf")
-
-        # Parse page ranges
-        pages_to_extract = self._parse_page_ranges(page_ranges)
-
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
-
-        # Filter valid page numbers (0-indexed internally, 1-indexed for user)
-        valid_pages = [p - 1 for p in pages_to_extract if 1 <= p <= total_pages]
-
-        if not valid_pages:
-            doc.close()
-            raise ValueError(f"No valid pages in range '{page_ranges}' (document has {total_pages} pages)")
-
-        # Create new document with selected pages
-        new_doc = fitz.open()
-        for page_num in sorted(valid_pages):
-            new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-
-        doc.close()
+        new_doc = self._extract_document(pdf_path, page_ranges)
 
         # Save to output path
         if output_path is None:
-            import tempfile
             fd, output_path = tempfile.mkstemp(suffix='.pdf')
             os.close(fd)
 
-        new_doc.save(output_path)
+        new_doc.save(output_path, garbage=3, deflate=True)
         new_doc.close()
 
         return output_path
 
-    def _parse_page_ranges(self, page_ranges: str) -> List[int]:
-        """Parse page ranges string into list of page numbers.
+    def extract_pages_bytes(self, pdf_path: str, page_ranges: str) -> bytes:
+        """Extract specific pages from a PDF file into memory.
 
-        Examples:
-            "1-5" -> [1, 2, 3, 4, 5]
-            "1,3,5-7" -> [1, 3, 5, 6, 7]
-            "10-5" -> [5, 6, 7, 8, 9, 10] (handles reversed ranges)
+        Same as extract_pages(), but returns the PDF bytes so they can be
+        passed straight to upload_file(content=...) without a temp file.
         """
-        pages = []
-        for part in page_ranges.split(','):
-            part = part.strip()
-            if '-' in part:
-                # Handle range
-                start, end = part.split('-', 1)
-                start = int(start.strip())
-                end = int(end.strip())
-                if start > end:
-                    start, end = end, start
-                pages.extend(range(start, end + 1))
-            else:
-                # Single page
-                pages.append(int(part))
-        return sorted(set(pages))
+        new_doc = self._extract_document(pdf_path, page_ranges)
+        try:
+            return new_doc.tobytes(garbage=3, deflate=True)
+        finally:
+            new_doc.close()
+
+    def _extract_document(
+        self,
+        pdf_path: Union[str, "fitz.Document"],
+        page_ranges: str
+    ) -> "fitz.Document":
+        """Build a new in-memory document with the selected pages.
+
+        Contiguous pages are copied with a single insert_pdf() call per run,
+        which is much faster than page-by-page copying and lets PyMuPDF share
+        resources (fonts, images) within each run.
+
+        Args:
+            pdf_path: Path to the source PDF, or an already open document
+                (left open)
+            page_ranges: Page ranges string (e.g., "1-10,15,20-25")
+        """
+        if not HAS_PYMUPDF:
+            raise ImportError("PyMuPDF (fitz) is required for page extraction. Install with: pip install pymupdf")
+
+        # Parse page ranges
+        pages_to_extract = parse_page_ranges(page_ranges)
+
+        owns_doc = isinstance(pdf_path, (str, Path))
+        doc = fitz.open(pdf_path) if owns_doc else pdf_path
+        try:
+            total_pages = len(doc)
+
+            # Filter valid page numbers (0-indexed internally, 1-indexed for user)
+            valid_pages = [p - 1 for p in pages_to_extract if 1 <= p <= total_pages]
+
+            if not valid_pages:
+                raise ValueError(f"No valid pages in range '{page_ranges}' (document has {total_pages} pages)")
+
+            # Create new document with selected pages, one insert per contiguous run
+            new_doc = fitz.open()
+            for first, last in coalesce_pages(valid_pages):
+                new_doc.insert_pdf(doc, from_page=first, to_page=last)
+        finally:
+            if owns_doc:
+                doc.close()
+
+        return new_doc
 
     def convert(
         self,
@@ -436,7 +642,10 @@ class MinerUConverter:
         is_ocr: bool = False,
         page_ranges: Optional[str] = None,
         timeout: int = 600,
-        verbose: bool = False
+        verbose: bool = False,
+        resume: bool = False,
+        extract_all: bool = False,
+        trace_path: Optional[str] = None
     ) -> Dict[str, Any]:
         """Main conversion entry point.
 
@@ -453,10 +662,62 @@ class MinerUConverter:
             page_ranges: Page ranges to convert
             timeout: Max wait time in seconds
             verbose: Print progress updates
+            resume: Resume an interrupted large-PDF conversion from its job manifest
+            extract_all: Extract every member of the result ZIP (layout JSON, origin PDF)
+            trace_path: Write a Chrome trace-event JSON of all stages to this file
 
         Returns:
-            Dictionary with status, output_file, and any warnings
+            Dictionary with status, output_file, any warnings, and a "timings"
+            summary of time spent per stage (see tracing.py)
         """
+        tracer = Tracer()
+        self._local.tracer = tracer
+        try:
+            with tracer.span("convert", source=input_path or url):
+                result = self._convert(
+                    input_path=input_path,
+                    url=url,
+                    output_dir=output_dir,
+                    model=model,
+                    language=language,
+                    extra_formats=extra_formats,
+                    enable_formula=enable_formula,
+                    enable_table=enable_table,
+                    is_ocr=is_ocr,
+                    page_ranges=page_ranges,
+                    timeout=timeout,
+                    verbose=verbose,
+                    resume=resume,
+                    extract_all=extract_all
+                )
+        finally:
+            self._local.tracer = None
+            if trace_path:
+                tracer.write(trace_path)
+
+        result["timings"] = tracer.summary()
+        if trace_path:
+            result["trace_file"] = str(trace_path)
+        return result
+
+    def _convert(
+        self,
+        input_path: Optional[str] = None,
+        url: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        model: str = "vlm",
+        language: str = "ch",
+        extra_formats: Optional[List[str]] = None,
+        enable_formula: bool = True,
+        enable_table: bool = True,
+        is_ocr: bool = False,
+        page_ranges: Optional[str] = None,
+        timeout: int = 600,
+        verbose: bool = False,
+        resume: bool = False,
+        extract_all: bool = False
+    ) -> Dict[str, Any]:
+        """Run one conversion (see convert()); traced by the caller."""
         result = {
             "success": False,
             "output_file": None,
@@ -496,28 +757,54 @@ class MinerUConverter:
             # Track if we created a temp file for page extraction
             temp_file_path = None
             file_to_upload = str(input_path_resolved)
-
-            # Handle page_ranges for local PDF files (client-side extraction)
-            if page_ranges and input_path_resolved.suffix.lower() == '.pdf' and HAS_PYMUPDF:
-                if verbose:
-                    print(f"Extracting pages {page_ranges} from PDF...")
-                temp_file_path = self.extract_pages(str(input_path_resolved), page_ranges)
-                file_to_upload = temp_file_path
-                if verbose:
-                    extracted_count = self.get_page_count(temp_file_path)
-                    print(f"Extracted {extracted_count} pages to temporary file")
+            upload_content = None
+            page_count = 1 if input_path_resolved.suffix.lower() in ('.png', '.jpg', '.jpeg') else None
+            inspection = None
+            source_pages = None  # Source page of each uploaded page, if extracted
 
             try:
-                # Check for large PDF (after page extraction if applicable)
-                if Path(file_to_upload).suffix.lower() == '.pdf' and HAS_PYMUPDF:
-                    page_count = self.get_page_count(file_to_upload)
+                if input_path_resolved.suffix.lower() == '.pdf' and HAS_PYMUPDF:
+                    # Open the PDF once; extraction, size checks and splitting reuse it
+                    with self.tracer.span("inspect", file=file_to_upload) as span:
+                        inspection = PDFInspection.open(input_path_resolved)
+                        span.update(pages=inspection.page_count, bytes=inspection.file_size)
+                    if inspection.needs_pass:
+                        raise ValueError(f"PDF is password-protected: {input_path_resolved}")
+
+                    # Handle page_ranges (client-side extraction, in memory)
+                    if page_ranges:
+                        if verbose:
+                            print(f"Extracting pages {page_ranges} from PDF...")
+                        source_pages = [
+                            p for p in parse_page_ranges(page_ranges) if 1 <= p <= inspection.page_count
+                        ]
+                        with self.tracer.span("extract_pages", page_ranges=page_ranges) as span:
+                            extracted_doc = self._extract_document(inspection.doc, page_ranges)
+                            upload_content = extracted_doc.tobytes(garbage=3, deflate=True)
+                            inspection.close()
+                            inspection = PDFInspection(extracted_doc, file_size=len(upload_content))
+                            span.update(pages=inspection.page_count, bytes=len(upload_content))
+                        if verbose:
+                            print(f"Extracted {inspection.page_count} pages ({len(upload_content) / (1024 * 1024):.1f} MB)")
+
+                    # Check for large PDF (after page extraction if applicable)
+                    page_count = inspection.page_count
+                    file_size = inspection.file_size
 
-                    if page_count > MAX_PAGES_PER_TASK:
+                    if page_count > MAX_PAGES_PER_TASK or file_size > MAX_UPLOAD_BYTES:
                         if verbose:
-                            print(f"Large PDF detected ({page_count} pages). Splitting into chunks...")
+                            print(f"Large PDF detected ({page_count} pages, {file_size / (1024 * 1024):.1f} MB). Splitting into chunks...")
+
+                        if upload_content is not None:
+                            # Splitter workers open the document by path
+                            fd, temp_file_path = tempfile.mkstemp(suffix='.pdf')
+                            with os.fdopen(fd, 'wb') as f:
+                                f.write(upload_content)
+                            upload_content = None
+                            inspection.path = temp_file_path
 
                         return self._handle_large_pdf(
-                            file_to_upload,
+                            inspection.path,
                             str(output_dir_path),
                             model=model,
                             language=language,
@@ -526,9 +813,17 @@ class MinerUConverter:
                             enable_table=enable_table,
                             is_ocr=is_ocr,
                             timeout=timeout,
-                            verbose=verbose
+                            verbose=verbose,
+                            source=str(input_path_resolved),
+                            page_ranges=page_ranges if temp_file_path else None,
+                            resume=resume,
+                            extract_all=extract_all,
+                            inspection=inspection
                         )
 
+                    # Not needed for a single upload
+                    inspection.close()
+
                 # Upload file and get batch_id (tasks are auto-created)
                 if verbose:
                     print(f"Uploading file: {file_to_upload}")
@@ -540,7 +835,9 @@ class MinerUConverter:
                     language=language,
                     enable_formula=enable_formula,
                     enable_table=enable_table,
-                    is_ocr=is_ocr
+                    is_ocr=is_ocr,
+                    content=upload_content,
+                    pages=page_count
                 )
 
                 if verbose:
@@ -566,6 +863,9 @@ class MinerUConverter:
                 )
 
             finally:
+                if inspection is not None:
+                    inspection.close()
+
                 # Clean up temp file if we created one
                 if temp_file_path and os.path.exists(temp_file_path):
                     try:
@@ -576,12 +876,20 @@ class MinerUConverter:
             # Download result
             result_url = batch_result.get("full_zip_url")
             if not result_url:
-                raise Exception("No result URL in batch response")
+                raise MinerUError("No result URL in batch response")
 
             if verbose:
                 print(f"Downloading result...")
 
-            output_file = self.download_result(result_url, str(output_dir_path))
+            output_file = self.download_result(
+                result_url, str(output_dir_path), extract_all=extract_all
+            )
+
+            # Let --patch-pages map result pages back to source pages
+            if source_pages:
+                save_page_map(output_dir_path, str(input_path_resolved), page_ranges, source_pages)
+            else:
+                remove_page_map(output_dir_path)
 
             result["success"] = True
             result["output_file"] = output_file
@@ -602,7 +910,8 @@ class MinerUConverter:
             enable_formula=enable_formula,
             enable_table=enable_table,
             is_ocr=is_ocr,
-            page_ranges=page_ranges
+            page_ranges=page_ranges,
+            pages=len(parse_page_ranges(page_ranges)) if page_ranges else None
         )
 
         if verbose:
@@ -629,12 +938,14 @@ class MinerUConverter:
         # Download result
         result_url = task_result.get("full_zip_url")
         if not result_url:
-            raise Exception("No result URL in task response")
+            raise MinerUError("No result URL in task response")
 
         if verbose:
             print(f"Downloading result...")
 
-        output_file = self.download_result(result_url, str(output_dir_path))
+        output_file = self.download_result(
+            result_url, str(output_dir_path), extract_all=extract_all
+        )
 
         result["success"] = True
         result["output_file"] = output_file
@@ -653,80 +964,247 @@ class MinerUConverter:
         enable_table: bool,
         is_ocr: bool,
         timeout: int,
-        verbose: bool
+        verbose: bool,
+        source: Optional[str] = None,
+        page_ranges: Optional[str] = None,
+        resume: bool = False,
+        extract_all: bool = False,
+        inspection: Optional["PDFInspection"] = None
     ) -> Dict[str, Any]:
-        """Handle PDFs over 600 pages by splitting and merging.
+        """Handle PDFs over 600 pages or 200 MB by splitting and merging.
+
+        Progress is checkpointed to a job manifest in output_dir after every
+        chunk state change. With resume=True, an existing manifest for the same
+        source is reused: finished chunks are skipped, in-flight batch_ids are
+        re-polled and only failed or pending chunks are uploaded again.
+
+        All chunks are uploaded as soon as they are built and convert
+        server-side concurrently; a single JobPoller watches them and each
+        result is downloaded as soon as its chunk finishes.
 
         Note: output_dir is already resolved by convert() - it will be a subfolder
-        named after the input file when --output-dir is not specified.
+        named after the input file when --output-dir is not specified. Pass the
+        PDFInspection convert() already opened to avoid reopening pdf_path.
         """
 
-        # Import splitter and merger
+        # Import splitter, merger and manifest helpers
         script_dir = Path(__file__).parent
         sys.path.insert(0, str(script_dir))
 
-        from pdf_splitter import split_pdf
+        from pdf_splitter import plan_chunks_for_pdf, iter_chunks, build_chunk
         from merge_markdown import merge_markdown_files
+        from job_manifest import (
+            JobManifest, STATE_UPLOADED, STATE_DONE, STATE_FAILED
+        )
 
         # Ensure output directory exists
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        # Split PDF
-        if verbose:
-            print(f"Splitting PDF into {SPLIT_CHUNK_SIZE}-page chunks...")
+        source = source or pdf_path
+        total_pages = inspection.page_count if inspection else self.get_page_count(pdf_path)
 
-        chunks = split_pdf(pdf_path, SPLIT_CHUNK_SIZE)
+        manifest = JobManifest.load(output_dir) if resume else None
+        if manifest is not None and not manifest.matches(source, total_pages, page_ranges):
+            raise ValueError(
+                f"Job manifest in {output_dir} belongs to a different conversion; "
+                "run without --resume to start over"
+            )
 
-        if verbose:
-            print(f"Created {len(chunks)} chunks")
+        if manifest is None:
+            # Balance chunks by estimated size and conversion cost, cutting at chapters
+            with self.tracer.span("plan_chunks", pages=total_pages) as span:
+                chunk_ranges = plan_chunks_for_pdf(
+                    pdf_path,
+                    max_pages=SPLIT_CHUNK_SIZE,
+                    max_bytes=SPLIT_CHUNK_BYTES,
+                    inspection=inspection
+                )
+                span["chunks"] = len(chunk_ranges)
+            manifest = JobManifest.create(
+                output_dir,
+                source=source,
+                total_pages=total_pages,
+                chunk_ranges=chunk_ranges,
+                page_ranges=page_ranges,
+                options={
+                    "model": model,
+                    "language": language,
+                    "extra_formats": extra_formats,
+                    "enable_formula": enable_formula,
+                    "enable_table": enable_table,
+                    "is_ocr": is_ocr,
+                }
+            )
+            if verbose:
+                ranges_text = ", ".join(f"{start}-{end}" for start, end in chunk_ranges)
+                print(f"Planned {len(chunk_ranges)} chunks (pages {ranges_text})")
+        elif verbose:
+            done = sum(1 for c in manifest.chunks if c["state"] == STATE_DONE)
+            print(f"Resuming from {manifest.path} ({done}/{len(manifest.chunks)} chunks done)")
+
+        if inspection is not None:
+            # Planned; chunk builders reopen the file by path
+            inspection.close()
 
-        # Convert each chunk
-        output_files = []
+        chunks = manifest.chunks
         warnings = []
 
-        for i, chunk_path in enumerate(chunks):
-            if verbose:
-                print(f"Converting chunk {i+1}/{len(chunks)}...")
+        def is_finished(chunk):
+            return (
+                chunk["state"] == STATE_DONE
+                and chunk.get("output_file")
+                and Path(chunk["output_file"]).exists()
+            )
 
-            try:
-                # Create chunk-specific output directory
-                chunk_output_dir = Path(output_dir) / f"chunk_{i+1}"
-                chunk_output_dir.mkdir(parents=True, exist_ok=True)
+        # Build the chunks that need uploading in worker processes, in memory,
+        # so that uploading chunk N overlaps with splitting chunks N+1...
+        to_build = [
+            c for c in chunks
+            if not is_finished(c) and not (c["state"] == STATE_UPLOADED and c.get("batch_id"))
+        ]
+        chunk_stream = iter_chunks(
+            pdf_path,
+            [(c["start_page"], c["end_page"]) for c in to_build],
+            in_memory=True
+        )
+        chunk_name_prefix = Path(source).stem
 
-                # Upload chunk and get batch_id with all parameters
-                batch_id = self.upload_file(
-                    chunk_path,
-                    model=model,
-                    extra_formats=extra_formats,
-                    language=language,
-                    enable_formula=enable_formula,
-                    enable_table=enable_table,
-                    is_ocr=is_ocr
-                )
+        # Pre-flight quota check before anything is uploaded
+        self.limiter.check_pages(sum(c["end_page"] - c["start_page"] + 1 for c in to_build))
 
-                if verbose:
-                    print(f"  Chunk {i+1} uploaded, batch_id: {batch_id}")
+        # All uploaded chunks convert server-side concurrently; one poller watches them
+        poller = JobPoller(self)
+        watched = {}  # PollJob -> chunk
+        repolled = set()  # Chunk indices resumed from an earlier run's batch_id
+
+        def watch(chunk):
+            def progress_callback(state, data):
+                progress = data.get("extract_progress", {})
+                extracted = progress.get("extracted_pages")
+                total = progress.get("total_pages")
+                if extracted is not None and total:
+                    print(f"  Chunk {chunk['index']}: {state} ({extracted}/{total} pages)")
+                else:
+                    print(f"  Chunk {chunk['index']}: {state}")
+
+            job = poller.add_batch(
+                chunk["batch_id"],
+                max_wait=timeout,
+                callback=progress_callback if verbose else None
+            )
+            watched[job] = chunk
+
+        def build(chunk, from_stream=False):
+            # With from_stream, this is the wait for a chunk built ahead by the workers
+            pages = chunk["end_page"] - chunk["start_page"] + 1
+            with self.tracer.span("split", chunk=chunk["index"], pages=pages) as span:
+                content = next(chunk_stream, (None, None))[1] if from_stream else None
+                if content is None:
+                    content = build_chunk(pdf_path, chunk["start_page"], chunk["end_page"])
+                span["bytes"] = len(content)
+            return content
+
+        def upload_chunk(chunk, content=None):
+            i = chunk["index"]
+            if content is None:
+                content = build(chunk)
+
+            batch_id = self.upload_file(
+                f"{chunk_name_prefix}_chunk_{i:03d}.pdf",
+                model=model,
+                extra_formats=extra_formats,
+                language=language,
+                enable_formula=enable_formula,
+                enable_table=enable_table,
+                is_ocr=is_ocr,
+                content=content,
+                pages=chunk["end_page"] - chunk["start_page"] + 1
+            )
+            manifest.update(chunk, batch_id=batch_id, state=STATE_UPLOADED, error=None)
+
+            if verbose:
+                print(f"  Chunk {i} uploaded, batch_id: {batch_id}")
+
+            watch(chunk)
 
-                # Poll batch result for completion
-                batch_result = self.poll_batch_result(batch_id, max_wait=timeout)
+        def finish(job):
+            chunk = watched.pop(job)
+            i = chunk["index"]
+            self._trace_job(job, f"chunk {i}", chunk=i, batch_id=chunk["batch_id"])
+            self._settle_job(job)
+
+            try:
+                if isinstance(job.error, TimeoutError):
+                    # Keep the batch_id so that --resume re-polls instead of re-uploading
+                    manifest.update(chunk, error=str(job.error))
+                    warnings.append(f"Chunk {i} failed: {str(job.error)}")
+                    return
+
+                if job.error is not None:
+                    if i in repolled:
+                        # Server-side failure of a resumed batch: upload it again
+                        repolled.discard(i)
+                        manifest.update(chunk, state=STATE_FAILED, error=str(job.error))
+                        upload_chunk(chunk)
+                        return
+                    raise job.error
 
                 # Download result
-                result_url = batch_result.get("full_zip_url")
+                result_url = job.result.get("full_zip_url")
                 if result_url:
-                    output_file = self.download_result(result_url, str(chunk_output_dir))
-                    output_files.append(output_file)
+                    if verbose:
+                        print(f"Downloading chunk {i}/{len(chunks)}...")
+                    output_file = self.download_result(
+                        result_url, str(Path(output_dir) / f"chunk_{i}"), extract_all=extract_all
+                    )
+                    manifest.update(chunk, state=STATE_DONE, output_file=output_file, error=None)
                 else:
-                    warnings.append(f"Chunk {i+1}: No result URL")
+                    manifest.update(chunk, state=STATE_FAILED, error="No result URL")
+                    warnings.append(f"Chunk {i}: No result URL")
 
             except Exception as e:
-                warnings.append(f"Chunk {i+1} failed: {str(e)}")
+                manifest.update(chunk, state=STATE_FAILED, error=str(e))
+                warnings.append(f"Chunk {i} failed: {str(e)}")
+
+        try:
+            for chunk in chunks:
+                if is_finished(chunk):
+                    if verbose:
+                        print(f"Chunk {chunk['index']}/{len(chunks)} already converted, skipping")
+                elif chunk["state"] == STATE_UPLOADED and chunk.get("batch_id"):
+                    # Re-poll a chunk that was uploaded by an earlier run
+                    if verbose:
+                        print(f"Chunk {chunk['index']}/{len(chunks)}: re-polling batch_id {chunk['batch_id']}")
+                    repolled.add(chunk["index"])
+                    watch(chunk)
+
+            for chunk in to_build:
+                i = chunk["index"]
+                if verbose:
+                    print(f"Uploading chunk {i}/{len(chunks)} (pages {chunk['start_page']}-{chunk['end_page']})...")
 
-            finally:
-                # Clean up chunk file
                 try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
+                    # A failed build ends the stream; later chunks are built directly
+                    upload_chunk(chunk, build(chunk, from_stream=True))
+                except Exception as e:
+                    manifest.update(chunk, state=STATE_FAILED, error=str(e))
+                    warnings.append(f"Chunk {i} failed: {str(e)}")
+
+                # Download chunks that finished while we were uploading
+                for job in poller.step(block=False):
+                    finish(job)
+
+            if verbose and len(poller):
+                print(f"Waiting for {len(poller)} chunk conversions...")
+
+            with self.tracer.span("poll", chunks=len(poller)):
+                for job in poller.iter_completed():
+                    finish(job)
+        finally:
+            chunk_stream.close()
+
+        done_chunks = [c for c in chunks if c["state"] == STATE_DONE]
+        output_files = [c["output_file"] for c in done_chunks]
 
         # Merge outputs
         if output_files:
@@ -734,28 +1212,58 @@ class MinerUConverter:
                 print("Merging output files...")
 
             # Get original filename without extension
-            original_name = Path(pdf_path).stem
+            original_name = Path(source).stem
             final_output = Path(output_dir) / f"{original_name}.md"
 
-            merge_markdown_files(output_files, str(final_output))
+            index_file = Path(output_dir) / f"{original_name}.index.json"
 
-            # Clean up chunk directories
-            for chunk_dir in Path(output_dir).glob("chunk_*"):
-                if chunk_dir.is_dir():
-                    import shutil
-                    shutil.rmtree(chunk_dir)
+            # Page numbers in the original document (pages were renumbered if
+            # --page-ranges were extracted before splitting)
+            if page_ranges:
+                source_pages = [p for p in parse_page_ranges(page_ranges) if p >= 1]
+            else:
+                source_pages = list(range(1, total_pages + 1))
+
+            with self.tracer.span("merge", files=len(output_files)):
+                # Chunk outputs are kept until the job completes (for --resume), so link, don't move
+                merge_markdown_files(
+                    output_files,
+                    str(final_output),
+                    image_mode="hardlink",
+                    page_numbers=[source_pages[c["start_page"] - 1:c["end_page"]] for c in done_chunks],
+                    index_path=str(index_file)
+                )
 
-            return {
+            result = {
                 "success": True,
                 "output_file": str(final_output),
+                "index_file": str(index_file),
                 "warnings": warnings,
                 "chunks_processed": len(output_files)
             }
+
+            if manifest.is_complete():
+                # Clean up chunk directories and the manifest
+                import shutil
+                for chunk_dir in Path(output_dir).glob("chunk_*"):
+                    if chunk_dir.is_dir():
+                        shutil.rmtree(chunk_dir)
+                manifest.remove()
+            else:
+                # Keep chunk outputs so that --resume only redoes the missing chunks
+                warnings.append(
+                    f"{len(chunks) - len(output_files)} of {len(chunks)} chunks incomplete; "
+                    "re-run with --resume to retry them"
+                )
+                result["manifest"] = str(manifest.path)
+
+            return result
         else:
             return {
                 "success": False,
                 "output_file": None,
                 "warnings": warnings,
+                "manifest": str(manifest.path),
                 "error": "All chunks failed"
             }
 
@@ -775,6 +1283,10 @@ def main():
         "--url", "-u",
         help="Remote file URL to convert"
     )
+    input_group.add_argument(
+        "--ingest-dir",
+        help="Convert every document in a directory (results next to each source)"
+    )
 
     # Required options
     parser.add_argument(
@@ -801,6 +1313,11 @@ def main():
         "--output-dir", "-o",
         help="Output directory (default: same as source)"
     )
+    parser.add_argument(
+        "--extract-all",
+        action="store_true",
+        help="Extract every file from the result ZIP (default: markdown, referenced images and extra formats only)"
+    )
     parser.add_argument(
         "--extra-formats",
         nargs="+",
@@ -830,6 +1347,10 @@ def main():
         "--page-ranges",
         help="Page ranges to convert (e.g., '1-100,150-200')"
     )
+    parser.add_argument(
+        "--patch-pages",
+        help="With --input: re-convert these pages (e.g., '212-215,480') and splice them into the existing output"
+    )
 
     # Processing options
     parser.add_argument(
@@ -838,20 +1359,134 @@ def main():
         default=600,
         help="Max wait time in seconds (default: 600)"
     )
+    parser.add_argument(
+        "--api-base",
+        default=API_BASE,
+        help=f"MinerU API base URL, e.g. a local mock_server.py (default: {API_BASE})"
+    )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
         help="Print progress updates"
     )
+    parser.add_argument(
+        "--trace",
+        help="Write a Chrome trace-event JSON of per-stage timings to this file"
+    )
+    # Rate limiting options
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=5.0,
+        help="Maximum MinerU API requests per second (default: 5)"
+    )
+    parser.add_argument(
+        "--daily-pages",
+        type=int,
+        help="Daily page quota to enforce locally (default: account only)"
+    )
+    parser.add_argument(
+        "--quota-policy",
+        default="reject",
+        choices=["reject", "wait"],
+        help="When a job would exceed --daily-pages: reject it or wait for the reset (default: reject)"
+    )
+
+    # Ingest options
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="With --ingest-dir: keep running and convert new files as they appear"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=30,
+        help="With --watch: seconds between directory scans (default: 30)"
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=2,
+        help="With --ingest-dir: maximum conversions at once (default: 2)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted large-PDF conversion from its job manifest"
+    )
 
     args = parser.parse_args()
 
+    if args.max_rps <= 0:
+        parser.error(f"--max-rps must be greater than 0, got {args.max_rps}")
+    if args.max_concurrent < 1:
+        parser.error(f"--max-concurrent must be at least 1, got {args.max_concurrent}")
+    if args.poll_interval <= 0:
+        parser.error(f"--poll-interval must be greater than 0, got {args.poll_interval}")
+
     try:
         # Load token
         token = load_token(args.token_file)
 
-        # Create converter
-        converter = MinerUConverter(token)
+        # Configure the shared rate limiter, then create converter
+        configure_shared_limiter(
+            requests_per_second=args.max_rps,
+            pages_per_day=args.daily_pages,
+            policy=args.quota_policy
+        )
+        converter = MinerUConverter(token, api_base=args.api_base)
+
+        if args.ingest_dir:
+            from ingest import run_ingest
+
+            summary = run_ingest(
+                converter,
+                args.ingest_dir,
+                watch=args.watch,
+                poll_interval=args.poll_interval,
+                max_concurrent=args.max_concurrent,
+                convert_options={
+                    "model": args.model,
+                    "language": args.language,
+                    "extra_formats": args.extra_formats,
+                    "enable_formula": args.enable_formula,
+                    "enable_table": args.enable_table,
+                    "is_ocr": args.is_ocr,
+                    "timeout": args.timeout,
+                    "extract_all": args.extract_all,
+                },
+                verbose=args.verbose
+            )
+            summary["success"] = not summary["failed"]
+            summary["quota"] = converter.limiter.quota_status()
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+            sys.exit(0 if summary["success"] else 1)
+
+        if args.patch_pages:
+            from patch_pages import patch_pages
+
+            if not args.input:
+                raise ValueError("--patch-pages requires --input")
+            result = patch_pages(
+                converter,
+                args.input,
+                args.patch_pages,
+                output_dir=args.output_dir,
+                convert_options={
+                    "model": args.model,
+                    "language": args.language,
+                    "enable_formula": args.enable_formula,
+                    "enable_table": args.enable_table,
+                    "is_ocr": args.is_ocr,
+                    "timeout": args.timeout,
+                    "trace_path": args.trace,
+                },
+                verbose=args.verbose
+            )
+            result["quota"] = converter.limiter.quota_status()
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(0 if result["success"] else 1)
 
         # Run conversion
         result = converter.convert(
@@ -866,10 +1501,14 @@ def main():
             is_ocr=args.is_ocr,
             page_ranges=args.page_ranges,
             timeout=args.timeout,
-            verbose=args.verbose
+            verbose=args.verbose,
+            resume=args.resume,
+            extract_all=args.extract_all,
+            trace_path=args.trace
         )
 
         # Output result as JSON
+        result["quota"] = converter.limiter.quota_status()
         print(json.dumps(result, indent=2, ensure_ascii=False))
 
         if result["success"]:
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+MinerU API Mock Server
+
+Local stand-in for the MinerU cloud API, for testing and benchmarking
+MinerUConverter offline. Implements:
+
+    POST /api/v4/file-urls/batch              -> batch_id + presigned PUT URL
+    PUT  /upload/{batch_id}/{index}           -> presigned upload target
+    GET  /api/v4/extract-results/batch/{id}   -> batch status
+    POST /api/v4/extract/task                 -> task_id
+    GET  /api/v4/extract/task/{id}            -> task status
+    GET  /results/{job_id}.zip                -> generated result ZIP
+
+Jobs move pending -> running -> done after a configurable queue delay,
+converting at a fixed page rate while reporting extract_progress. Latency,
+failure injection, request throttling (429 with Retry-After) and the size of
+the generated ZIP (pages, images per page, image bytes) are configurable.
+
+Usage:
+    python mock_server.py --port 8765 --page-rate 20 --failure-rate 0.1
+    python mineru_convert.py --input doc.pdf --token-file token.md \\
+        --api-base http://127.0.0.1:8765/api/v4
+
+    # In-process (see benchmark.py)
+    from mock_server import MockMinerUServer
+    with MockMinerUServer(page_rate=50) as server:
+        converter = MinerUConverter("token", api_base=server.api_base)
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+
+PAGE_OBJECT_PATTERN = re.compile(rb'/Type\s*/Page(?![s\w])')
+
+
+def count_pdf_pages(data: bytes) -> int:
+    """Count pages of an uploaded PDF (PyMuPDF if available, else a byte scan)."""
+    if HAS_PYMUPDF:
+        try:
+            doc = fitz.open(stream=data, filetype="pdf")
+            count = len(doc)
+            doc.close()
+            return count
+        except Exception:
+            pass
+    return max(1, len(PAGE_OBJECT_PATTERN.findall(data)))
+
+
+class MockJob:
+    """A simulated conversion job (batch file or URL task)."""
+
+    def __init__(self, job_id: str, file_name: str, server: "MockMinerUServer"):
+        self.job_id = job_id
+        self.file_name = file_name
+        self.server = server
+        self.total_pages: Optional[int] = None
+        self.submitted: Optional[float] = None
+        self.fails = server.rng.random() < server.failure_rate
+
+    def start(self, total_pages: int) -> None:
+        self.total_pages = total_pages
+        self.submitted = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        server = self.server
+        data: Dict[str, Any] = {"file_name": self.file_name}
+
+        if self.submitted is None:
+            data["state"] = "waiting-file"
+            return data
+
+        elapsed = time.monotonic() - self.submitted - server.queue_delay
+        if elapsed < 0:
+            data["state"] = "pending"
+            return data
+
+        extracted = min(self.total_pages, int(elapsed * server.page_rate))
+        if self.fails and extracted >= self.total_pages // 2:
+            data["state"] = "failed"
+            data["err_msg"] = "Injected failure"
+            return data
+
+        if extracted >= self.total_pages:
+            data["state"] = "done"
+            data["full_zip_url"] = f"{server.base_url}/results/{self.job_id}.zip"
+            return data
+
+        data["state"] = "running"
+        data["extract_progress"] = {
+            "extracted_pages": extracted,
+            "total_pages": self.total_pages,
+            "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return data
+
+
+class MockMinerUServer:
+    """Threaded mock of the MinerU API. Usable as a context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        queue_delay: float = 1.0,
+        page_rate: float = 50.0,
+        failure_rate: float = 0.0,
+        max_rps: Optional[float] = None,
+        url_task_pages: int = 20,
+        images_per_page: float = 0.5,
+        image_bytes: int = 20_000,
+        seed: int = 0
+    ):
+        """
+        Args:
+            host, port: Bind address (port 0 picks a free port)
+            latency: Seconds added to every API request
+            queue_delay: Seconds a job stays pending before converting
+            page_rate: Pages converted per second per job
+            failure_rate: Probability that a job fails halfway
+            max_rps: Throttle API requests above this rate with 429 (None: never)
+            url_task_pages: Page count assumed for URL tasks without page_ranges
+            images_per_page: Average images per page in generated results
+            image_bytes: Size of each generated image
+            seed: Random seed for failures and payloads
+        """
+        self.latency = latency
+        self.queue_delay = queue_delay
+        self.page_rate = page_rate
+        self.failure_rate = failure_rate
+        self.max_rps = max_rps
+        self.url_task_pages = url_task_pages
+        self.images_per_page = images_per_page
+        self.image_bytes = image_bytes
+        self.rng = random.Random(seed)
+
+        self.jobs: Dict[str, MockJob] = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "uploads": 0, "upload_bytes": 0,
+                      "downloads": 0, "download_bytes": 0, "pages": 0}
+        self._request_times: list = []
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.base_url}/api/v4"
+
+    def start(self) -> "MockMinerUServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockMinerUServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _throttled(self) -> bool:
+        """Sliding one-second window request limiter."""
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self._request_times = [t for t in self._request_times if now - t < 1.0]
+            if len(self._request_times) >= self.max_rps:
+                self.stats["throttled"] += 1
+                return True
+            self._request_times.append(now)
+            return False
+
+    def build_result_zip(self, job: MockJob) -> bytes:
+        """Generate a MinerU-style result ZIP for a finished job."""
+        rng = random.Random(job.job_id)
+        buffer = io.BytesIO()
+        lines = []
+        content_list = []
+        image_count = 0
+
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+            for page in range(1, (job.total_pages or 0) + 1):
+                text = f"Mock content for page {page} of {job.file_name}."
+                lines.append(f"## Page {page}\n\n{text}\n")
+                content_list.append({"type": "text", "text": f"Page {page}", "text_level": 1, "page_idx": page - 1})
+                content_list.append({"type": "text", "text": text, "page_idx": page - 1})
+                images = int(self.images_per_page) + (rng.random() < self.images_per_page % 1)
+                for _ in range(images):
+                    image_count += 1
+                    name = f"images/{uuid.UUID(int=rng.getrandbits(128)).hex}.jpg"
+                    zf.writestr(name, rng.randbytes(self.image_bytes))
+                    lines.append(f"![]({name})\n")
+                    content_list.append({"type": "image", "img_path": name, "page_idx": page - 1})
+
+            zf.writestr("full.md", "\n".join(lines))
+            zf.writestr("layout.json", json.dumps({"pages": job.total_pages, "images": image_count}))
+            zf.writestr(f"{job.job_id}_content_list.json", json.dumps(content_list))
+
+        return buffer.getvalue()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length", 0))
+                return self.rfile.read(length) if length else b""
+
+            def _api_gate(self) -> bool:
+                """Apply latency and throttling to API requests; False if rejected."""
+                with server.lock:
+                    server.stats["requests"] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._throttled():
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return False
+                return True
+
+            def do_POST(self) -> None:
+                body = self._read_body()
+                if not self._api_gate():
+                    return
+                payload = json.loads(body or b"{}")
+
+                if self.path == "/api/v4/file-urls/batch":
+                    batch_id = uuid.uuid4().hex
+                    urls = []
+                    for i, f in enumerate(payload.get("files", [])):
+                        job = MockJob(f"{batch_id}-{i}", f.get("name", f"file{i}.pdf"), server)
+                        with server.lock:
+                            server.jobs[job.job_id] = job
+                        urls.append(f"{server.base_url}/upload/{batch_id}/{i}")
+                    self._send_json({"code": 0, "data": {"batch_id": batch_id, "file_urls": urls}})
+
+                elif self.path == "/api/v4/extract/task":
+                    task_id = uuid.uuid4().hex
+                    job = MockJob(task_id, payload.get("url", "").rsplit("/", 1)[-1] or "remote.pdf", server)
+                    page_ranges = payload.get("page_ranges")
+                    pages = server.url_task_pages
+                    if page_ranges:
+                        pages = 0
+                        for part in page_ranges.split(","):
+                            start, _, end = part.strip().partition("-")
+                            pages += abs(int(end or start) - int(start)) + 1
+                    job.start(pages)
+                    with server.lock:
+                        server.jobs[task_id] = job
+                        server.stats["pages"] += pages
+                    self._send_json({"code": 0, "data": {"task_id": task_id}})
+
+                else:
+                    self._send_json({"code": 404, "msg": f"Unknown endpoint {self.path}"}, 404)
+
+            def do_PUT(self) -> None:
+                match = re.fullmatch(r"/upload/(\w+)/(\d+)", self.path)
+                body = self._read_body()
+                job = server.jobs.get(f"{match.group(1)}-{match.group(2)}") if match else None
+                if job is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                pages = count_pdf_pages(body) if body[:4] == b"%PDF" else 1
+                job.start(pages)
+                with server.lock:
+                    server.stats["uploads"] += 1
+                    server.stats["upload_bytes"] += len(body)
+                    server.stats["pages"] += pages
+
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self) -> None:
+                match = re.fullmatch(r"/results/([\w-]+)\.zip", self.path)
+                if match:
+                    job = server.jobs.get(match.group(1))
+                    if job is None:
+                        self.send_response(404)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    data = server.build_result_zip(job)
+                    with server.lock:
+                        server.stats["downloads"] += 1
+                        server.stats["download_bytes"] += len(data)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/zip")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+
+                if not self._api_gate():
+                    return
+
+                match = re.fullmatch(r"/api/v4/extract-results/batch/(\w+)", self.path)
+                if match:
+                    batch_id = match.group(1)
+                    with server.lock:
+                        jobs = [j for k, j in server.jobs.items() if k.startswith(batch_id + "-")]
+                    self._send_json({"code": 0, "data": {
+                        "batch_id": batch_id,
+                        "extract_result": [j.status() for j in jobs],
+                    }})
+                    return
+
+                match = re.fullmatch(r"/api/v4/extract/task/(\w+)", self.path)
+                if match and match.group(1) in server.jobs:
+                    data = server.jobs[match.group(1)].status()
+                    data["task_id"] = match.group(1)
+                    self._send_json({"code": 0, "data": data})
+                    return
+
+                self._send_json({"code": 404, "msg": f"Unknown endpoint {self.path}"}, 404)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local MinerU API mock server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API request")
+    parser.add_argument("--queue-delay", type=float, default=1.0, help="Seconds a job stays pending")
+    parser.add_argument("--page-rate", type=float, default=50.0, help="Pages converted per second per job")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability a job fails (0-1)")
+    parser.add_argument("--max-rps", type=float, help="Return 429 above this many API requests per second")
+    parser.add_argument("--images-per-page", type=float, default=0.5, help="Average images per page in results")
+    parser.add_argument("--image-kb", type=int, default=20, help="Size of each generated image in KB")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+
+    mock = MockMinerUServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        queue_delay=args.queue_delay,
+        page_rate=args.page_rate,
+        failure_rate=args.failure_rate,
+        max_rps=args.max_rps,
+        images_per_page=args.images_per_page,
+        image_bytes=args.image_kb * 1024,
+        seed=args.seed
+    )
+    print(f"MinerU mock API listening on {mock.api_base}")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.httpd.server_close()
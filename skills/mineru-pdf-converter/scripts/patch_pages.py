@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Page Patching
+
+Re-convert selected pages of a document and splice the new Markdown into an
+existing conversion, instead of converting the whole document again. Only
+the requested pages are extracted client-side and uploaded, so fixing 10
+pages of a 900-page book costs 10 pages of conversion time and quota.
+
+Splice points come from the ``<a id="page-N"></a>`` anchors that split
+conversions write into the merged Markdown. Single-file conversions are
+anchored on first patch from the ``*_content_list.json`` next to full.md,
+with source page numbers from the page map a --page-ranges conversion
+records (job_manifest.PAGE_MAP_NAME); without one, full.md is taken to start
+at page 1.
+Images of the replaced pages that are no longer referenced are removed,
+new ones are moved into images/, and the ``.index.json`` sidecar (if any)
+is rebuilt.
+
+Usage:
+    python mineru_convert.py --input book.pdf --token-file token.md --patch-pages "212-215,480"
+
+    from patch_pages import patch_pages
+    patch_pages(converter, "book.pdf", "212-215,480")
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from job_manifest import load_page_map
+from merge_markdown import (
+    CHUNK_SEPARATOR_PATTERN, PAGE_ANCHOR_PATTERN, _resolve_image, _splice, build_index,
+    file_digest, find_image_refs, is_local_ref, load_content_list, page_anchor_edits, place_image
+)
+from mineru_convert import coalesce_pages, parse_page_ranges
+
+
+def find_target_markdown(output_dir: Path, stem: str) -> Path:
+    """Return the merged <stem>.md of a split conversion, else full.md."""
+    for name in (f"{stem}.md", "full.md"):
+        candidate = output_dir / name
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(f"No previous conversion of {stem} found in {output_dir}")
+
+
+def _anchor_positions(content: str) -> Dict[int, int]:
+    """{page: position of its anchor line} for every page anchor in content."""
+    return {int(m.group(1)): m.start() for m in PAGE_ANCHOR_PATTERN.finditer(content)}
+
+
+def plan_splices(content: str, runs: List[Tuple[int, int]]) -> List[Tuple[int, int, int, int, bool]]:
+    """Locate the target region of every run of patched pages.
+
+    Runs that cross a chunk separator are split at it so separators survive.
+
+    Returns:
+        List of (first_page, last_page, start, end, ends_at_anchor)
+
+    Raises:
+        ValueError: If a page boundary has no anchor in the target
+    """
+    anchors = _anchor_positions(content)
+    ordered = sorted(anchors.items(), key=lambda item: item[1])
+    separators = [(m.start(), m.end()) for m in CHUNK_SEPARATOR_PATTERN.finditer(content)]
+    regions = []
+
+    for first, last in runs:
+        if first not in anchors:
+            raise ValueError(
+                f"Page {first} has no page anchor in the existing output, so its position is unknown"
+            )
+
+        start, segment_first = anchors[first], first
+        while True:
+            # The region ends at the next page outside the run, a chunk separator or the end
+            next_anchor = next(((p, pos) for p, pos in ordered if pos > start and p > last), None)
+            separator = next(((s, e) for s, e in separators if s > start), None)
+
+            if separator and (next_anchor is None or separator[0] < next_anchor[1]):
+                following = next(((p, pos) for p, pos in ordered if pos >= separator[1]), None)
+                if following and following[0] <= last:
+                    # The run continues in the next chunk
+                    regions.append((segment_first, following[0] - 1, start, separator[0], False))
+                    start, segment_first = following[1], following[0]
+                    continue
+                regions.append((segment_first, last, start, separator[0], False))
+            elif next_anchor is None:
+                regions.append((segment_first, last, start, len(content), False))
+            elif next_anchor[0] == last + 1:
+                regions.append((segment_first, last, start, next_anchor[1], True))
+            else:
+                raise ValueError(
+                    f"Page {last + 1} has no page anchor in the existing output, "
+                    f"so the end of page {last} is unknown"
+                )
+            break
+
+    return regions
+
+
+def _place_patch_images(
+    content: str,
+    result_dir: Path,
+    images_dir: Path,
+    images_subdir: str,
+    tag: str
+) -> str:
+    """Move the re-converted result's images next to the target and rewrite references."""
+    refs = find_image_refs(content)
+    path_map: Dict[str, str] = {}
+
+    for ref in refs:
+        if not is_local_ref(ref.path) or ref.path in path_map:
+            continue
+        src = _resolve_image(result_dir, ref.path)
+        if src is None:
+            continue
+
+        dest = images_dir / src.name
+        if dest.exists() and file_digest(dest) != file_digest(src):
+            dest = images_dir / f"{tag}_{src.name}"
+        if not dest.exists():
+            place_image(src, dest, "move")
+        path_map[ref.path] = f"{images_subdir}/{dest.name}"
+
+    return _splice(content, [(r.start, r.end, path_map[r.path]) for r in refs if r.path in path_map])
+
+
+def patch_pages(
+    converter: Any,
+    input_path: Union[str, Path],
+    patch_ranges: str,
+    output_dir: Optional[Union[str, Path]] = None,
+    convert_options: Optional[Dict[str, Any]] = None,
+    images_subdir: str = "images",
+    verbose: bool = False
+) -> Dict[str, Any]:
+    """Re-convert pages of a document and splice them into its previous output.
+
+    Args:
+        converter: MinerUConverter instance
+        input_path: Source PDF that was converted before
+        patch_ranges: Pages to re-convert (e.g., "212-215,480"), in source page numbers
+        output_dir: Output directory of the previous conversion
+            (default: subfolder named after the input, as convert() uses)
+        convert_options: Extra keyword arguments for converter.convert()
+        images_subdir: Image directory of the previous output
+        verbose: Print progress updates
+
+    Returns:
+        Result dictionary with success, output_file, pages patched and warnings
+    """
+    input_path_obj = Path(input_path).resolve()
+    output_dir_path = Path(output_dir) if output_dir else input_path_obj.parent / input_path_obj.stem
+    target = find_target_markdown(output_dir_path, input_path_obj.stem)
+    pages = parse_page_ranges(patch_ranges)
+
+    with open(target, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if not PAGE_ANCHOR_PATTERN.search(content):
+        # Single-file conversion: anchor its pages from the MinerU content list
+        content_list = load_content_list(target)
+        if not content_list:
+            raise ValueError(f"{target} has no page anchors and no content list to locate pages")
+        page_count = max(b.get("page_idx", 0) for b in content_list) + 1
+        source_pages = load_page_map(target.parent) or list(range(1, page_count + 1))
+        if len(source_pages) < page_count:
+            raise ValueError(
+                f"{target} has {page_count} pages but its page map lists {len(source_pages)}; "
+                "convert the document again instead of patching it"
+            )
+        content = _splice(content, page_anchor_edits(content, content_list, source_pages))
+
+    # Fail before spending quota if any splice point is unknown
+    regions = plan_splices(content, coalesce_pages(pages))
+
+    with tempfile.TemporaryDirectory(prefix="mineru-patch-", dir=output_dir_path) as tmp:
+        if verbose:
+            print(f"Re-converting pages {patch_ranges} ({len(pages)} pages)...")
+
+        result = converter.convert(
+            input_path=str(input_path_obj),
+            output_dir=tmp,
+            page_ranges=patch_ranges,
+            verbose=verbose,
+            **(convert_options or {})
+        )
+        if not result.get("success"):
+            return {
+                "success": False,
+                "output_file": str(target),
+                "error": result.get("error", "Re-conversion failed"),
+                "warnings": result.get("warnings", []),
+            }
+
+        # Anchor the new Markdown with source page numbers, unless it came
+        # back from a split conversion that already did so
+        patch_md = Path(result["output_file"])
+        with open(patch_md, 'r', encoding='utf-8') as f:
+            patched = f.read()
+        if not PAGE_ANCHOR_PATTERN.search(patched):
+            patched = _splice(patched, page_anchor_edits(patched, load_content_list(patch_md), pages))
+
+        images_dir = target.parent / images_subdir
+        images_dir.mkdir(exist_ok=True)
+        patched = _place_patch_images(
+            patched, patch_md.parent, images_dir, images_subdir, f"patch{pages[0]}"
+        )
+
+        patched_anchors = _anchor_positions(patched)
+        edits = []
+        replaced = []
+        for first, last, start, end, ends_at_anchor in regions:
+            if first not in patched_anchors:
+                raise ValueError(
+                    f"Could not locate page {first} in the re-converted output; "
+                    f"patch pages {first}-{last} on their own"
+                )
+            slice_start = patched_anchors[first]
+            slice_end = min(
+                (pos for page, pos in patched_anchors.items() if page > last), default=len(patched)
+            )
+            replacement = CHUNK_SEPARATOR_PATTERN.sub("\n\n", patched[slice_start:slice_end]).strip()
+            edits.append((start, end, replacement + ("\n\n" if ends_at_anchor else "")))
+            replaced.append(content[start:end])
+
+    # Drop images only the replaced pages used
+    new_content = _splice(content, edits)
+    still_used = {ref.path for ref in find_image_refs(new_content)}
+    removed = 0
+    for old_ref in {ref.path for text in replaced for ref in find_image_refs(text)} - still_used:
+        old_image = target.parent / old_ref
+        if is_local_ref(old_ref) and old_image.parent == images_dir and old_image.is_file():
+            old_image.unlink()
+            removed += 1
+
+    tmp_target = target.with_name(target.name + ".tmp")
+    with open(tmp_target, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    os.replace(tmp_target, target)
+
+    output = {
+        "success": True,
+        "output_file": str(target),
+        "pages_patched": len(pages),
+        "regions": [{"start_page": first, "end_page": last} for first, last, *_ in regions],
+        "images_removed": removed,
+        "warnings": result.get("warnings", []),
+    }
+
+    index_file = target.with_name(f"{target.stem}.index.json")
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            old_index = json.load(f)
+        chunk_pages = {
+            c["index"]: (c["start_page"], c["end_page"])
+            for c in old_index.get("chunks", []) if c.get("start_page") is not None
+        }
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(build_index(new_content, target, chunk_pages), f, indent=2, ensure_ascii=False)
+        output["index_file"] = str(index_file)
+
+    return output
@@ -8,12 +8,27 @@ Uses PyMuPDF (fitz) for efficient PDF manipulation.
 Usage:
     from pdf_splitter import split_pdf
     chunks = split_pdf("/path/to/large.pdf", chunk_size=500)
+
+    # Open once, then reuse page count, outline and page weights
+    from pdf_splitter import PDFInspection, plan_chunks_for_pdf
+    with PDFInspection.open("/path/to/large.pdf") as pdf:
+        ranges = plan_chunks_for_pdf(pdf.path, inspection=pdf)
+
+    # Stream chunks as in-memory bytes while later chunks are still being built
+    from pdf_splitter import iter_chunks, plan_chunks
+    for index, pdf_bytes in iter_chunks(path, plan_chunks(1300, 500), in_memory=True):
+        ...
 """
 
+import multiprocessing
 import os
 import tempfile
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Union
+from itertools import accumulate
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
 
 try:
     import fitz  # PyMuPDF
@@ -21,6 +36,112 @@ except ImportError:
     raise ImportError("PyMuPDF is required. Install with: pip install pymupdf")
 
 
+# Chunk planning heuristics
+IMAGE_PAGE_COST = 0.5  # Conversion cost of one image relative to one page
+BOUNDARY_SLACK = 0.15  # How far (fraction of chunk length) a cut may move to hit a chapter start
+
+
+class PDFInspection:
+    """A PDF opened once, with its properties cached for the whole pipeline.
+
+    Opening a large, damaged or encrypted PDF can cost seconds of xref repair,
+    so conversion opens the document once and passes this object through page
+    extraction, size checks and chunk planning instead of reopening the file
+    at each step. Properties are computed on first use.
+    """
+
+    def __init__(
+        self,
+        doc: "fitz.Document",
+        path: Optional[Union[str, Path]] = None,
+        file_size: Optional[int] = None
+    ):
+        """
+        Args:
+            doc: Open PyMuPDF document (owned by this object from now on)
+            path: File the document was read from, if any
+            file_size: Size in bytes (default: size of path, if given)
+        """
+        self.doc = doc
+        self.path = str(path) if path is not None else None
+        if file_size is None and self.path is not None:
+            file_size = os.path.getsize(self.path)
+        self.file_size = file_size
+        self._page_sizes: Optional[List[Tuple[float, float]]] = None
+        self._outline: Optional[List[List[Any]]] = None
+        self._page_weights: Optional[Tuple[List[int], List[int]]] = None
+
+    @classmethod
+    def open(cls, pdf_path: Union[str, Path]) -> "PDFInspection":
+        """Open a PDF file for inspection."""
+        return cls(fitz.open(str(pdf_path)), path=pdf_path)
+
+    def __enter__(self) -> "PDFInspection":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self.doc.is_closed:
+            self.doc.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    @property
+    def is_encrypted(self) -> bool:
+        return bool(self.doc.is_encrypted)
+
+    @property
+    def needs_pass(self) -> bool:
+        return bool(self.doc.needs_pass)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.doc.metadata or {}
+
+    @property
+    def page_sizes(self) -> List[Tuple[float, float]]:
+        """(width, height) of each page in points."""
+        if self._page_sizes is None:
+            self._page_sizes = [(page.rect.width, page.rect.height) for page in self.doc]
+        return self._page_sizes
+
+    @property
+    def outline(self) -> List[List[Any]]:
+        """Table of contents as [level, title, page] entries."""
+        if self._outline is None:
+            self._outline = self.doc.get_toc(simple=True)
+        return self._outline
+
+    @property
+    def chapter_starts(self) -> List[int]:
+        """1-indexed start pages of top-level bookmarks."""
+        return _chapter_starts(self.outline, self.page_count)
+
+    @property
+    def page_weights(self) -> Tuple[List[int], List[int]]:
+        """(page_bytes, page_images) as from estimate_page_weights()."""
+        if self._page_weights is None:
+            self._page_weights = estimate_page_weights(self.doc)
+        return self._page_weights
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary in the get_pdf_info() format."""
+        info: Dict[str, Any] = {
+            "path": self.path,
+            "page_count": self.page_count,
+            "metadata": self.metadata,
+            "is_encrypted": self.is_encrypted,
+            "needs_pass": self.needs_pass,
+        }
+        if self.file_size is not None:
+            info["file_size_mb"] = round(self.file_size / (1024 * 1024), 2)
+        return info
+
+
 def get_page_count(pdf_path: str) -> int:
     """Get the number of pages in a PDF file.
 
@@ -36,11 +157,333 @@ def get_page_count(pdf_path: str) -> int:
     return count
 
 
+def plan_chunks(total_pages: int, chunk_size: int = 500) -> List[Tuple[int, int]]:
+    """Compute chunk page ranges for a document.
+
+    Args:
+        total_pages: Number of pages in the document
+        chunk_size: Maximum pages per chunk
+
+    Returns:
+        List of (start_page, end_page) tuples, 1-indexed and inclusive
+    """
+    return [
+        (start + 1, min(start + chunk_size, total_pages))
+        for start in range(0, total_pages, chunk_size)
+    ]
+
+
+def _stream_length(doc: "fitz.Document", xref: int) -> int:
+    """Return the stored (compressed) length of a stream object, or 0."""
+    try:
+        kind, value = doc.xref_get_key(xref, "Length")
+        if kind == "int":
+            return int(value)
+        if kind == "xref":
+            # Indirect length, e.g. "12 0 R"
+            return int(doc.xref_object(int(value.split()[0])).strip())
+    except Exception:
+        pass
+    return 0
+
+
+def estimate_page_weights(doc: "fitz.Document") -> Tuple[List[int], List[int]]:
+    """Estimate per-page byte size and image count without decoding streams.
+
+    A page's byte estimate is the stored length of its content streams plus
+    the images it is the first page to use, so images shared across pages
+    (logos, backgrounds) are only counted once.
+
+    Args:
+        doc: Open PyMuPDF document
+
+    Returns:
+        Tuple of (page_bytes, page_images), one entry per page
+    """
+    seen_images = set()
+    page_bytes = []
+    page_images = []
+
+    for page in doc:
+        size = sum(_stream_length(doc, xref) for xref in page.get_contents())
+        images = page.get_images(full=True)
+        for image in images:
+            xref = image[0]
+            if xref not in seen_images:
+                seen_images.add(xref)
+                size += _stream_length(doc, xref)
+
+        page_bytes.append(size)
+        page_images.append(len(images))
+
+    return page_bytes, page_images
+
+
+def _chapter_starts(toc: List[List[Any]], page_count: int) -> List[int]:
+    return sorted({
+        page for level, _, page in toc
+        if level == 1 and 1 < page <= page_count
+    })
+
+
+def get_chapter_starts(doc: "fitz.Document") -> List[int]:
+    """Return the 1-indexed start pages of top-level bookmarks (TOC level 1)."""
+    return _chapter_starts(doc.get_toc(simple=True), len(doc))
+
+
+def plan_balanced_chunks(
+    page_bytes: List[int],
+    page_images: List[int],
+    max_pages: int = 500,
+    max_bytes: Optional[int] = None,
+    chapter_starts: Optional[List[int]] = None,
+    image_cost: float = IMAGE_PAGE_COST,
+    boundary_slack: float = BOUNDARY_SLACK
+) -> List[Tuple[int, int]]:
+    """Plan chunks balanced by estimated conversion cost, size and structure.
+
+    The number of chunks is the minimum that keeps every chunk within
+    max_pages and max_bytes. Cuts are then placed so each chunk gets an equal
+    share of the remaining conversion cost (1 per page plus image_cost per
+    image), and moved to the nearest chapter start within boundary_slack of
+    the chunk length when that does not break the limits.
+
+    Args:
+        page_bytes: Estimated bytes per page (see estimate_page_weights)
+        page_images: Image count per page
+        max_pages: Hard limit of pages per chunk
+        max_bytes: Soft limit of estimated bytes per chunk (single pages may exceed it)
+        chapter_starts: 1-indexed pages where top-level chapters start
+        image_cost: Conversion cost of one image, relative to one page
+        boundary_slack: Fraction of the chunk length a cut may move to reach a chapter start
+
+    Returns:
+        List of (start_page, end_page) tuples, 1-indexed and inclusive
+    """
+    total_pages = len(page_bytes)
+    if total_pages == 0:
+        return []
+
+    costs = [1.0 + image_cost * n for n in page_images]
+    cost_prefix = [0.0] + list(accumulate(costs))
+    bytes_prefix = [0] + list(accumulate(page_bytes))
+    boundaries = sorted(p - 1 for p in (chapter_starts or []))  # 0-based page indices
+
+    def hard_end(start: int) -> int:
+        """Furthest exclusive end from start that respects the limits."""
+        end = min(start + max_pages, total_pages)
+        if max_bytes:
+            limit = bytes_prefix[start] + max_bytes
+            end = min(end, bisect_right(bytes_prefix, limit) - 1)
+        return max(end, start + 1)
+
+    def min_chunks(start: int) -> int:
+        """Minimum number of chunks needed for the pages from start on."""
+        count = 0
+        while start < total_pages:
+            start = hard_end(start)
+            count += 1
+        return count
+
+    n_chunks = min_chunks(0)
+
+    chunks = []
+    start = 0
+    while start < total_pages:
+        remaining = n_chunks - len(chunks)
+        limit = hard_end(start)
+
+        if remaining <= 1 or limit >= total_pages:
+            end = limit
+        else:
+            # Cut where this chunk reaches its share of the remaining cost,
+            # as long as the rest still fits in the remaining chunks
+            target = cost_prefix[start] + (cost_prefix[total_pages] - cost_prefix[start]) / remaining
+            end = min(max(bisect_left(cost_prefix, target), start + 1), limit)
+            if min_chunks(end) > remaining - 1:
+                end = limit
+
+            # Snap to the nearest chapter start within the slack window
+            window = max(1, int((end - start) * boundary_slack))
+            lo = bisect_left(boundaries, max(start + 1, end - window))
+            hi = bisect_right(boundaries, min(limit, end + window))
+            candidates = [b for b in boundaries[lo:hi] if min_chunks(b) <= remaining - 1]
+            if candidates:
+                end = min(candidates, key=lambda b: abs(b - end))
+
+        chunks.append((start + 1, end))
+        start = end
+
+    return chunks
+
+
+def plan_chunks_for_pdf(
+    pdf_path: Union[str, Path],
+    max_pages: int = 500,
+    max_bytes: Optional[int] = None,
+    use_toc: bool = True,
+    inspection: Optional[PDFInspection] = None
+) -> List[Tuple[int, int]]:
+    """Plan size- and structure-aware chunks for a PDF file.
+
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Hard limit of pages per chunk
+        max_bytes: Soft limit of estimated bytes per chunk
+        use_toc: Prefer cutting at top-level bookmarks
+        inspection: Already-open PDFInspection of pdf_path (avoids reopening)
+
+    Returns:
+        List of (start_page, end_page) tuples, 1-indexed and inclusive
+    """
+    pdf = inspection or PDFInspection.open(pdf_path)
+    try:
+        page_bytes, page_images = pdf.page_weights
+        chapter_starts = pdf.chapter_starts if use_toc else None
+    finally:
+        if inspection is None:
+            pdf.close()
+
+    return plan_balanced_chunks(
+        page_bytes,
+        page_images,
+        max_pages=max_pages,
+        max_bytes=max_bytes,
+        chapter_starts=chapter_starts
+    )
+
+
+def build_chunk(
+    pdf_path: str,
+    start_page: int,
+    end_page: int,
+    chunk_path: Optional[str] = None,
+    garbage: int = 3,
+    deflate: bool = True
+) -> Union[str, bytes]:
+    """Build a single chunk from a page range of the source PDF.
+
+    Opens the source independently, so it is safe to run in a worker process.
+
+    Args:
+        pdf_path: Path to the source PDF file
+        start_page: First page, 1-indexed
+        end_page: Last page, 1-indexed inclusive
+        chunk_path: Where to save the chunk (default: return bytes)
+        garbage: PyMuPDF garbage collection level (0-4)
+        deflate: Compress uncompressed streams
+
+    Returns:
+        chunk_path if given, otherwise the chunk's PDF bytes
+    """
+    doc = fitz.open(pdf_path)
+    chunk_doc = fitz.open()
+    chunk_doc.insert_pdf(doc, from_page=start_page - 1, to_page=end_page - 1)
+    doc.close()
+
+    try:
+        if chunk_path is None:
+            return chunk_doc.tobytes(garbage=garbage, deflate=deflate)
+
+        chunk_doc.save(chunk_path, garbage=garbage, deflate=deflate)
+        return chunk_path
+    finally:
+        chunk_doc.close()
+
+
+def iter_chunks(
+    pdf_path: Union[str, Path],
+    ranges: List[Tuple[int, int]],
+    output_dir: Optional[Union[str, Path]] = None,
+    prefix: Optional[str] = None,
+    in_memory: bool = False,
+    workers: Optional[int] = None,
+    garbage: int = 3,
+    deflate: bool = True
+) -> Iterator[Tuple[int, Union[str, bytes]]]:
+    """Build chunks in parallel and yield them in order as soon as each is ready.
+
+    Each worker process opens the source PDF independently and builds its own
+    page range. At most ``workers`` chunks are in flight ahead of the
+    consumer, so in-memory chunks do not pile up while earlier ones are
+    still being uploaded.
+
+    Args:
+        pdf_path: Path to the source PDF file
+        ranges: List of (start_page, end_page), 1-indexed inclusive
+        output_dir: Directory to save chunks (default: temp directory)
+        prefix: Prefix for chunk filenames (default: source filename)
+        in_memory: Yield chunk bytes instead of writing files
+        workers: Worker processes (default: min(4, CPU count))
+        garbage: PyMuPDF garbage collection level (0-4)
+        deflate: Compress uncompressed streams
+
+    Yields:
+        (chunk_index, chunk path or bytes), chunk_index is 0-based into ranges
+    """
+    pdf_path_obj = Path(pdf_path)
+
+    if not pdf_path_obj.exists():
+        raise FileNotFoundError(f"PDF file not found: {pdf_path_obj}")
+
+    chunk_paths: List[Optional[str]] = [None] * len(ranges)
+    if not in_memory:
+        if output_dir:
+            output_dir_path = Path(output_dir)
+            output_dir_path.mkdir(parents=True, exist_ok=True)
+        else:
+            output_dir_path = Path(tempfile.mkdtemp(prefix="pdf_chunks_"))
+
+        prefix = prefix or pdf_path_obj.stem
+        chunk_paths = [
+            str(output_dir_path / f"{prefix}_chunk_{i + 1:03d}.pdf")
+            for i in range(len(ranges))
+        ]
+
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    workers = max(1, min(workers, len(ranges)))
+
+    # Not worth a process pool for a single chunk or worker
+    if workers == 1:
+        for i, (start_page, end_page) in enumerate(ranges):
+            yield i, build_chunk(
+                str(pdf_path_obj), start_page, end_page, chunk_paths[i], garbage, deflate
+            )
+        return
+
+    # Spawn, not fork: callers run poller and worker threads, and a forked
+    # child could inherit a lock one of them holds. Workers reopen by path.
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    pending: Deque[Future] = deque()
+    next_index = 0
+
+    try:
+        for i in range(len(ranges)):
+            # Keep the pool busy, but only `workers` chunks ahead of the consumer
+            while next_index < len(ranges) and len(pending) < workers:
+                start_page, end_page = ranges[next_index]
+                pending.append(executor.submit(
+                    build_chunk, str(pdf_path_obj), start_page, end_page,
+                    chunk_paths[next_index], garbage, deflate
+                ))
+                next_index += 1
+
+            yield i, pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def split_pdf(
     pdf_path: Union[str, Path],
     chunk_size: int = 500,
     output_dir: Optional[Union[str, Path]] = None,
-    prefix: Optional[str] = None
+    prefix: Optional[str] = None,
+    workers: Optional[int] = None,
+    balanced: bool = False,
+    max_bytes: Optional[int] = None
 ) -> List[str]:
     """Split a PDF file into chunks of specified size.
 
@@ -49,6 +492,9 @@ def split_pdf(
         chunk_size: Maximum pages per chunk (default: 500)
         output_dir: Directory to save chunks (default: temp directory)
         prefix: Prefix for chunk filenames (default: source filename)
+        workers: Worker processes (default: min(4, CPU count))
+        balanced: Balance chunks by size and image weight, cutting at chapters
+        max_bytes: Soft limit of estimated bytes per chunk (implies balanced)
 
     Returns:
         List of paths to the chunk files
@@ -58,49 +504,33 @@ def split_pdf(
     if not pdf_path_obj.exists():
         raise FileNotFoundError(f"PDF file not found: {pdf_path_obj}")
 
-    # Set up output directory
-    if output_dir:
-        output_dir_path = Path(output_dir)
-        output_dir_path.mkdir(parents=True, exist_ok=True)
-    else:
-        output_dir_path = Path(tempfile.mkdtemp(prefix="pdf_chunks_"))
+    with PDFInspection.open(pdf_path_obj) as pdf:
+        total_pages = pdf.page_count
 
-    # Set up prefix
-    if not prefix:
-        prefix = pdf_path_obj.stem
+        if total_pages <= chunk_size and not max_bytes:
+            # No splitting needed
+            return [str(pdf_path_obj)]
 
-    # Open source PDF
-    doc = fitz.open(str(pdf_path_obj))
-    total_pages = len(doc)
+        if balanced or max_bytes:
+            ranges = plan_chunks_for_pdf(
+                pdf_path_obj, max_pages=chunk_size, max_bytes=max_bytes, inspection=pdf
+            )
+        else:
+            ranges = plan_chunks(total_pages, chunk_size)
 
-    if total_pages <= chunk_size:
-        # No splitting needed
-        doc.close()
+    if len(ranges) <= 1:
         return [str(pdf_path_obj)]
 
-    # Calculate chunks
-    chunks = []
-    chunk_num = 0
-
-    for start_page in range(0, total_pages, chunk_size):
-        end_page = min(start_page + chunk_size, total_pages)
-        chunk_num += 1
-
-        # Create chunk filename
-        chunk_filename = f"{prefix}_chunk_{chunk_num:03d}.pdf"
-        chunk_path = output_dir_path / chunk_filename
-
-        # Create new PDF for this chunk
-        chunk_doc = fitz.open()
-        chunk_doc.insert_pdf(doc, from_page=start_page, to_page=end_page - 1)
-        chunk_doc.save(str(chunk_path))
-        chunk_doc.close()
-
-        chunks.append(str(chunk_path))
-
-    doc.close()
-
-    return chunks
+    return [
+        chunk_path
+        for _, chunk_path in iter_chunks(
+            pdf_path_obj,
+            ranges,
+            output_dir=output_dir,
+            prefix=prefix,
+            workers=workers
+        )
+    ]
 
 
 def merge_pdfs(
@@ -143,23 +573,8 @@ def get_pdf_info(pdf_path: str) -> dict:
     Returns:
         Dictionary with PDF metadata
     """
-    doc = fitz.open(pdf_path)
-
-    info = {
-        "path": pdf_path,
-        "page_count": len(doc),
-        "metadata": doc.metadata,
-        "is_encrypted": doc.is_encrypted,
-        "needs_pass": doc.needs_pass,
-    }
-
-    # Get file size
-    file_size = os.path.getsize(pdf_path)
-    info["file_size_mb"] = round(file_size / (1024 * 1024), 2)
-
-    doc.close()
-
-    return info
+    with PDFInspection.open(pdf_path) as pdf:
+        return pdf.to_dict()
 
 
 if __name__ == "__main__":
@@ -178,6 +593,21 @@ if __name__ == "__main__":
         "--output-dir", "-o",
         help="Output directory for chunks"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        help="Worker processes for splitting (default: min(4, CPU count))"
+    )
+    parser.add_argument(
+        "--balanced",
+        action="store_true",
+        help="Balance chunks by size and image weight, preferring chapter boundaries"
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        help="Target maximum chunk size in MB (implies --balanced)"
+    )
     parser.add_argument(
         "--info-only",
         action="store_true",
@@ -193,7 +623,10 @@ if __name__ == "__main__":
         chunks = split_pdf(
             args.pdf_path,
             chunk_size=args.chunk_size,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            workers=args.workers,
+            balanced=args.balanced,
+            max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb else None
         )
 
         result = {
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter and Quota Accounting
+
+Client-side throttling for the MinerU API, shared by every
+MinerUConverter in the process:
+
+- A token bucket caps API requests per second (burst = one second's worth).
+  A 429 response pauses the bucket for everyone, honouring Retry-After.
+- With a daily page limit configured, a page ledger records pages
+  submitted per quota day (quota resets at midnight UTC+8) in
+  ~/.cache/mineru-pdf-converter/quota.json, so the count survives across
+  runs. A job that would exceed the remaining quota is rejected up front
+  (policy "reject") or held until the quota resets (policy "wait"). Pages
+  whose upload or conversion fails are refunded. Without a limit, no
+  ledger is read or written.
+
+Usage:
+    from rate_limiter import configure_shared_limiter, get_shared_limiter
+    configure_shared_limiter(requests_per_second=2, pages_per_day=2000)
+    limiter = get_shared_limiter()
+    limiter.acquire()            # before each API request
+    limiter.reserve_pages(500)   # before each upload/submission
+    limiter.release_pages(500)   # if that upload/submission or its job failed
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+QUOTA_TIMEZONE = timezone(timedelta(hours=8))  # MinerU quota resets at midnight UTC+8
+DEFAULT_LEDGER_PATH = Path.home() / ".cache" / "mineru-pdf-converter" / "quota.json"
+LEDGER_KEEP_DAYS = 7
+
+POLICY_REJECT = "reject"
+POLICY_WAIT = "wait"
+
+
+class MinerUError(Exception):
+    """Error reported by the MinerU API."""
+
+
+class RateLimitError(MinerUError):
+    """The API kept returning 429 after retries."""
+
+
+class QuotaExceededError(MinerUError):
+    """A job would exceed the configured daily page quota."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst (default: one second's worth, at least 1)
+
+        Raises:
+            ValueError: If rate is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping until they are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self._refill(now)
+
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                else:
+                    delay = (tokens - self.tokens) / self.rate
+
+            self.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while (e.g. after a 429)."""
+        with self.lock:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+
+
+class PageLedger:
+    """Pages submitted per quota day, persisted to a JSON file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_LEDGER_PATH,
+        now: Callable[[], datetime] = lambda: datetime.now(QUOTA_TIMEZONE)
+    ):
+        """
+        Args:
+            path: Ledger JSON file
+            now: Current time (timezone-aware)
+        """
+        self.path = Path(path)
+        self.now = now
+        self.lock = threading.Lock()
+
+    def today(self) -> str:
+        return self.now().astimezone(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+    def seconds_until_reset(self) -> float:
+        now = self.now().astimezone(QUOTA_TIMEZONE)
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (tomorrow - now).total_seconds()
+
+    def _read(self) -> Dict[str, int]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, data: Dict[str, int]) -> None:
+        # Keep only the last few days
+        keep = sorted(data)[-LEDGER_KEEP_DAYS:]
+        data = {day: data[day] for day in keep}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def used_today(self) -> int:
+        with self.lock:
+            return self._read().get(self.today(), 0)
+
+    def try_add(self, pages: int, limit: Optional[int]) -> bool:
+        """Record pages for today unless that would exceed limit."""
+        with self.lock:
+            data = self._read()
+            day = self.today()
+            used = data.get(day, 0)
+            if limit is not None and used + pages > limit:
+                return False
+            data[day] = used + pages
+            self._write(data)
+            return True
+
+    def remove(self, pages: int) -> None:
+        """Take back pages recorded for today (never below zero)."""
+        with self.lock:
+            data = self._read()
+            day = self.today()
+            data[day] = max(0, data.get(day, 0) - pages)
+            self._write(data)
+
+
+class RateLimiter:
+    """Request-rate limiter plus daily page quota for MinerU API calls."""
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        pages_per_day: Optional[int] = None,
+        policy: str = POLICY_REJECT,
+        ledger: Optional[PageLedger] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            requests_per_second: Maximum API requests per second
+            pages_per_day: Daily page limit (None: no limit and no page accounting)
+            policy: "reject" to fail fast, "wait" to hold jobs until the quota resets
+            ledger: Page ledger (default: ~/.cache/mineru-pdf-converter/quota.json)
+        """
+        if policy not in (POLICY_REJECT, POLICY_WAIT):
+            raise ValueError(f"Unknown quota policy: {policy}")
+
+        self.bucket = TokenBucket(requests_per_second, sleep=sleep)
+        self.pages_per_day = pages_per_day
+        self.policy = policy
+        self.ledger = ledger or PageLedger()
+        self.sleep = sleep
+
+    def acquire(self) -> float:
+        """Wait for permission to make one API request."""
+        return self.bucket.acquire()
+
+    def throttled(self, retry_after: float) -> None:
+        """Back off all callers after the server returned 429."""
+        self.bucket.pause(retry_after)
+
+    def remaining_pages(self) -> Optional[int]:
+        if self.pages_per_day is None:
+            return None
+        return max(0, self.pages_per_day - self.ledger.used_today())
+
+    def check_pages(self, pages: int) -> None:
+        """Pre-flight check for a whole job before anything is uploaded.
+
+        Raises:
+            QuotaExceededError: With the "reject" policy, if pages exceed the remaining quota
+        """
+        remaining = self.remaining_pages()
+        if remaining is not None and self.policy == POLICY_REJECT and pages > remaining:
+            raise QuotaExceededError(
+                f"Job needs {pages} pages but only {remaining} of {self.pages_per_day} "
+                f"daily pages remain (resets in {self.ledger.seconds_until_reset() / 3600:.1f} h)"
+            )
+
+    def reserve_pages(self, pages: int) -> None:
+        """Account pages for one upload/submission, enforcing the daily limit.
+
+        Raises:
+            QuotaExceededError: If the pages cannot fit ("reject" policy, or more
+                than a whole day's quota)
+        """
+        if pages <= 0 or self.pages_per_day is None:
+            return
+
+        if pages > self.pages_per_day:
+            raise QuotaExceededError(
+                f"Job needs {pages} pages, more than the daily quota of {self.pages_per_day}"
+            )
+
+        while not self.ledger.try_add(pages, self.pages_per_day):
+            if self.policy == POLICY_REJECT:
+                self.check_pages(pages)
+            else:
+                # Hold the job until the quota day rolls over
+                self.sleep(self.ledger.seconds_until_reset() + 1)
+
+    def release_pages(self, pages: int) -> None:
+        """Refund pages reserved for an upload/submission that failed."""
+        if pages <= 0 or self.pages_per_day is None:
+            return
+        self.ledger.remove(pages)
+
+    def quota_status(self) -> Dict[str, Any]:
+        if self.pages_per_day is None:
+            return {"day": self.ledger.today(), "pages_used": None, "pages_per_day": None, "pages_remaining": None}
+        used = self.ledger.used_today()
+        return {
+            "day": self.ledger.today(),
+            "pages_used": used,
+            "pages_per_day": self.pages_per_day,
+            "pages_remaining": max(0, self.pages_per_day - used),
+        }
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def configure_shared_limiter(**kwargs: Any) -> RateLimiter:
+    """Replace the process-wide limiter (see RateLimiter for arguments)."""
+    global _shared_limiter
+    with _shared_lock:
+        _shared_limiter = RateLimiter(**kwargs)
+        return _shared_limiter
+
+
+def get_shared_limiter() -> RateLimiter:
+    """Return the process-wide limiter, creating one with defaults if needed."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Conversion Tracing
+
+Lightweight timing spans for the conversion pipeline. Every stage
+(extract_pages, split, upload, server queue/convert time, download, unzip,
+merge) records a span with its duration and attributes such as bytes, pages,
+batch_id and API retries. A finished trace can be:
+
+- summarized per stage (count, seconds, bytes, pages) for the JSON result
+- written in Chrome trace-event format, viewable in chrome://tracing or
+  https://ui.perfetto.dev
+
+Spans opened on the same thread nest. Server-side timings, which are
+observed rather than measured locally, are recorded on named lanes (one per
+batch or chunk) so overlapping jobs render side by side.
+
+Usage:
+    from tracing import Tracer
+    tracer = Tracer()
+    with tracer.span("upload", file="doc.pdf") as span:
+        ...
+        span["bytes"] = len(content)
+    tracer.write("trace.json")
+    print(tracer.summary())
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+SUMMED_ATTRIBUTES = ("bytes", "pages")
+
+
+class Tracer:
+    """Thread-safe collector of timed spans and counters."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Monotonic time source (must match JobPoller's clock for
+                server-side spans)
+        """
+        self.clock = clock
+        self.origin = clock()
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._lanes: Dict[str, int] = {}
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block on the current thread.
+
+        Yields the span's attribute dict, so attributes known only at the end
+        (bytes, batch_id) can be added inside the block. An exception is
+        recorded as an "error" attribute and re-raised.
+        """
+        stack = self._stack()
+        stack.append(args)
+        start = self.clock()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            self.record(name, start, self.clock(), **args)
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        lane: Optional[str] = None,
+        **args: Any
+    ) -> None:
+        """Add a span measured elsewhere.
+
+        Args:
+            name: Stage name
+            start, end: Clock times
+            lane: Named track for the span (default: the current thread)
+        """
+        with self.lock:
+            if lane is None:
+                tid = threading.get_ident()
+            else:
+                tid = self._lanes.setdefault(lane, -(len(self._lanes) + 1))
+            self.spans.append({
+                "name": name,
+                "start": start - self.origin,
+                "duration": max(0.0, end - start),
+                "tid": tid,
+                "args": args,
+            })
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increment a trace-wide counter and the innermost open span's attribute."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        stack = self._stack()
+        if stack:
+            stack[-1][name] = stack[-1].get(name, 0) + n
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate spans per stage.
+
+        Returns:
+            {"wall_seconds", "stages": {name: {count, seconds, bytes?, pages?}},
+             "counters"}; nested stages overlap, so stage seconds do not add
+            up to wall_seconds
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        with self.lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        for span in spans:
+            stage = stages.setdefault(span["name"], {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += span["duration"]
+            for key in SUMMED_ATTRIBUTES:
+                value = span["args"].get(key)
+                if isinstance(value, (int, float)):
+                    stage[key] = stage.get(key, 0) + value
+
+        for stage in stages.values():
+            stage["seconds"] = round(stage["seconds"], 3)
+
+        end = max((s["start"] + s["duration"] for s in spans), default=0.0)
+        return {
+            "wall_seconds": round(end, 3),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Return the trace in Chrome trace-event format (complete "X" events)."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+
+        with self.lock:
+            for lane, tid in self._lanes.items():
+                events.append({
+                    "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                    "args": {"name": lane},
+                })
+            for span in self.spans:
+                events.append({
+                    "name": span["name"],
+                    "cat": "mineru",
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6),
+                    "dur": round(span["duration"] * 1e6),
+                    "pid": pid,
+                    "tid": span["tid"],
+                    "args": span["args"],
+                })
+            counters = dict(self.counters)
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at, "counters": counters},
+        }
+
+    def write(self, path: Union[str, Path]) -> None:
+        """Write the Chrome trace JSON to path."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome(), f, ensure_ascii=False, default=str)
+
+
+class NullTracer(Tracer):
+    """Tracer that records nothing (used outside convert())."""
+
+    def record(self, name: str, start: float, end: float, lane: Optional[str] = None, **args: Any) -> None:
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
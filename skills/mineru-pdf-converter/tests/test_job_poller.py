@@ -0,0 +1,163 @@
+"""Tests for job_poller.py (run with: python -m pytest skills/mineru-pdf-converter/tests)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from job_poller import JobPoller  # noqa: E402
+
+
+class FakeClock:
+    """Manual time source; sleeping just advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeConverter:
+    """Replays scripted status responses per job and records when each poll happened."""
+
+    def __init__(self, clock: FakeClock, responses: dict):
+        self.clock = clock
+        self.responses = {job_id: list(items) for job_id, items in responses.items()}
+        self.polls = {job_id: [] for job_id in responses}
+
+    def _next(self, job_id):
+        self.polls[job_id].append(self.clock())
+        item = self.responses[job_id].pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    get_batch_status = _next
+    get_task_status = _next
+
+
+def running(extracted=None, total=None):
+    data = {"state": "running"}
+    if extracted is not None:
+        data["extract_progress"] = {"extracted_pages": extracted, "total_pages": total}
+    return data
+
+
+def make_poller(responses, **kwargs):
+    clock = FakeClock()
+    converter = FakeConverter(clock, responses)
+    poller = JobPoller(converter, clock=clock, sleep=clock.sleep, **kwargs)
+    return poller, converter, clock
+
+
+def test_status_errors_are_retried_then_succeed():
+    poller, converter, _ = make_poller({
+        "b1": [ConnectionError("reset"), ConnectionError("reset"), {"state": "done", "full_zip_url": "z"}],
+    })
+    job = poller.add_batch("b1")
+
+    assert poller.wait(job)["full_zip_url"] == "z"
+    assert job.errors == 0
+    assert converter.polls["b1"] == [0.0, 2.0, 6.0]
+
+
+def test_job_fails_after_max_errors_consecutive_errors():
+    error = ConnectionError("down")
+    poller, converter, _ = make_poller({"b1": [error] * 3}, max_errors=3)
+    job = poller.add_batch("b1")
+
+    finished = list(poller.iter_completed())
+
+    assert finished == [job]
+    assert job.error is error
+    assert job.polls == 3
+    with pytest.raises(ConnectionError):
+        poller.wait(job)
+
+
+def test_success_resets_the_error_count():
+    poller, _, _ = make_poller({
+        "b1": [ConnectionError(), running(), ConnectionError(), {"state": "done"}],
+    }, max_errors=2)
+    job = poller.add_batch("b1")
+
+    assert poller.wait(job) == {"state": "done"}
+    assert job.error is None
+
+
+def test_backoff_without_progress_is_clamped():
+    poller, converter, _ = make_poller(
+        {"t1": [running()] * 6 + [{"state": "done"}]},
+        initial_interval=2, max_interval=10,
+    )
+    poller.wait(poller.add_task("t1"))
+
+    times = converter.polls["t1"]
+    assert [b - a for a, b in zip(times, times[1:])] == [2, 4, 8, 10, 10, 10]
+
+
+def test_next_poll_follows_extraction_eta():
+    poller, converter, _ = make_poller({
+        "b1": [running(0, 100), running(20, 100), {"state": "done"}],
+    }, initial_interval=2, max_interval=30)
+    job = poller.add_batch("b1")
+
+    poller.wait(job)
+
+    # 20 pages in 2 s is 10 pages/s, so the remaining 80 pages take 8 s
+    assert converter.polls["b1"] == [0.0, 2.0, 10.0]
+
+
+def test_running_at_set_once_past_the_queue():
+    poller, _, _ = make_poller({
+        "b1": [{"state": "waiting-file"}, {"state": "pending"}, running(), {"state": "done"}],
+    })
+    job = poller.add_batch("b1")
+
+    poller.wait(job)
+
+    assert job.running_at == 6.0
+    assert job.finished_at == 14.0
+
+
+def test_polling_times_out_at_the_deadline():
+    poller, converter, _ = make_poller({"b1": [running()] * 10})
+    job = poller.add_batch("b1", max_wait=5)
+
+    list(poller.iter_completed())
+
+    assert isinstance(job.error, TimeoutError)
+    assert converter.polls["b1"][-1] == 5.0
+
+
+def test_iter_completed_yields_jobs_in_finishing_order():
+    poller, _, _ = make_poller({
+        "slow": [running()] * 3 + [{"state": "done"}],
+        "failed": [running(), {"state": "failed", "err_msg": "bad pdf"}],
+        "fast": [{"state": "done"}],
+    })
+    slow = poller.add_batch("slow")
+    failed = poller.add_task("failed")
+    fast = poller.add_batch("fast")
+
+    assert list(poller.iter_completed()) == [fast, failed, slow]
+    assert str(failed.error) == "Task failed: bad pdf"
+    assert len(poller) == 0
+
+
+def test_step_without_blocking_returns_nothing_before_due():
+    poller, converter, clock = make_poller({"b1": [running(), {"state": "done"}]})
+    job = poller.add_batch("b1")
+
+    assert poller.step(block=False) == []  # First poll is immediate but not finished
+    assert poller.step(block=False) == []
+    assert clock.now == 0.0
+
+    assert poller.step(block=True) == [job]
+    assert converter.polls["b1"] == [0.0, 2.0]
@@ -0,0 +1,58 @@
+"""Tests for merge_markdown.py (run with: python -m pytest skills/mineru-pdf-converter/tests)."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from merge_markdown import find_image_refs, merge_markdown_files  # noqa: E402
+
+
+def test_find_image_refs_markdown_and_html():
+    content = '![fig](images/a.jpg)\n<td><img src="images/b.jpg" alt="b"></td>'
+    refs = find_image_refs(content)
+    assert [(ref.path, ref.html) for ref in refs] == [("images/a.jpg", False), ("images/b.jpg", True)]
+    assert all(content[ref.start:ref.end] == ref.path for ref in refs)
+
+
+def test_find_image_refs_ignores_data_src():
+    refs = find_image_refs('<img data-src="lazy.jpg" src="images/real.jpg">')
+    assert [ref.path for ref in refs] == ["images/real.jpg"]
+    assert find_image_refs('<img data-src="lazy.jpg">') == []
+
+
+def write_chunk(directory: Path, markdown: str, content_list: list) -> Path:
+    directory.mkdir(parents=True)
+    (directory / "full.md").write_text(markdown, encoding="utf-8")
+    (directory / "doc_content_list.json").write_text(json.dumps(content_list), encoding="utf-8")
+    return directory / "full.md"
+
+
+def test_page_anchors_before_equations(tmp_path):
+    # Both pages of each chunk start with a display equation, so the second
+    # page's equation directly follows the first page's closing $$
+    chunks = []
+    for n, (first, second) in enumerate([("a = b", "c = d"), ("e = f", "g = h")]):
+        markdown = f"$$\n{first}\n$$\n\n$$\n{second}\n$$\n\nText after.\n"
+        content_list = [
+            {"type": "equation", "text": f"$$\n{first}\n$$", "text_format": "latex", "page_idx": 0},
+            {"type": "equation", "text": f"$$\n{second}\n$$", "text_format": "latex", "page_idx": 1},
+            {"type": "text", "text": "Text after.", "page_idx": 1},
+        ]
+        chunks.append(write_chunk(tmp_path / f"chunk_{n}", markdown, content_list))
+
+    output = tmp_path / "out" / "book.md"
+    merge_markdown_files(chunks, output, copy_images=False, page_numbers=[[1, 2], [3, 4]])
+    merged = output.read_text(encoding="utf-8")
+
+    for page, latex in enumerate(["a = b", "c = d", "e = f", "g = h"], start=1):
+        assert f'<a id="page-{page}"></a>\n\n$$\n{latex}\n$$' in merged
+    # No anchor lands inside a $$ block
+    opened = False
+    for line in merged.split("\n"):
+        if line == "$$":
+            opened = not opened
+        else:
+            assert not (opened and line.startswith("<a id=")), merged
+    assert not opened
@@ -0,0 +1,142 @@
+"""Tests for rate_limiter.py (run with: python -m pytest skills/mineru-pdf-converter/tests)."""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from rate_limiter import (  # noqa: E402
+    POLICY_WAIT, PageLedger, QuotaExceededError, RateLimiter, TokenBucket, configure_shared_limiter
+)
+
+
+class FakeClock:
+    """Manual monotonic clock; sleeping just advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeNow:
+    """Manual wall clock for the page ledger."""
+
+    def __init__(self, when: datetime):
+        self.when = when
+
+    def __call__(self) -> datetime:
+        return self.when
+
+    def sleep(self, seconds: float) -> None:
+        self.when += timedelta(seconds=seconds)
+
+
+# 23:59:30 in UTC+8, half a minute before the MinerU quota day rolls over
+BEFORE_RESET = datetime(2026, 10, 19, 15, 59, 30, tzinfo=timezone.utc)
+
+
+def make_limiter(tmp_path, pages_per_day=10, **kwargs):
+    now = FakeNow(BEFORE_RESET)
+    ledger = PageLedger(tmp_path / "quota.json", now=now)
+    limiter = RateLimiter(pages_per_day=pages_per_day, ledger=ledger, sleep=now.sleep, **kwargs)
+    return limiter, now
+
+
+@pytest.mark.parametrize("rate", [0, -1.5])
+def test_token_bucket_rejects_non_positive_rate(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate)
+    with pytest.raises(ValueError):
+        configure_shared_limiter(requests_per_second=rate)
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_token_bucket_pause_blocks_until_it_ends():
+    clock = FakeClock()
+    bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(3)
+
+    assert bucket.acquire() == pytest.approx(3)
+    assert clock.sleeps == [3]
+
+
+def test_reserve_rejects_pages_over_the_remaining_quota(tmp_path):
+    limiter, _ = make_limiter(tmp_path)
+    limiter.reserve_pages(6)
+
+    with pytest.raises(QuotaExceededError):
+        limiter.reserve_pages(5)
+    with pytest.raises(QuotaExceededError):
+        limiter.reserve_pages(11)
+    assert limiter.remaining_pages() == 4
+
+
+def test_release_refunds_reserved_pages(tmp_path):
+    limiter, _ = make_limiter(tmp_path)
+    limiter.reserve_pages(6)
+    limiter.release_pages(6)
+
+    assert limiter.remaining_pages() == 10
+    limiter.reserve_pages(10)
+    assert limiter.quota_status()["pages_used"] == 10
+
+    limiter.release_pages(25)  # Never goes below zero
+    assert limiter.ledger.used_today() == 0
+
+
+def test_no_limit_leaves_the_ledger_alone(tmp_path):
+    limiter, _ = make_limiter(tmp_path, pages_per_day=None)
+
+    limiter.check_pages(10 ** 6)
+    limiter.reserve_pages(500)
+    limiter.release_pages(500)
+
+    assert not (tmp_path / "quota.json").exists()
+    assert limiter.quota_status()["pages_used"] is None
+
+
+def test_quota_day_rolls_over_at_midnight_utc8(tmp_path):
+    limiter, now = make_limiter(tmp_path)
+    limiter.reserve_pages(10)
+
+    assert limiter.ledger.today() == "2026-10-19"
+    assert limiter.ledger.seconds_until_reset() == 30
+
+    now.sleep(30)
+
+    assert limiter.ledger.today() == "2026-10-20"
+    assert limiter.remaining_pages() == 10
+    limiter.reserve_pages(4)
+    data = json.loads((tmp_path / "quota.json").read_text())
+    assert data == {"2026-10-19": 10, "2026-10-20": 4}
+
+
+def test_wait_policy_holds_the_job_until_the_reset(tmp_path):
+    limiter, now = make_limiter(tmp_path, policy=POLICY_WAIT)
+    limiter.reserve_pages(8)
+
+    limiter.reserve_pages(5)
+
+    assert now.when == BEFORE_RESET + timedelta(seconds=31)
+    assert limiter.ledger.used_today() == 5